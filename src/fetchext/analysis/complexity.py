@@ -1,10 +1,95 @@
+import os
+import json
+import hashlib
+import logging
+import sqlite3
 import zipfile
 import concurrent.futures
-import os
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set, Tuple
 from fetchext.core.crx  import CrxDecoder
 from fetchext.interface.console  import console
+from fetchext.security.fingerprints import FingerprintDB
+from fetchext.utils  import is_minified
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached result format changes
+CACHE_VERSION = 1
+
+
+def get_complexity_cache_path() -> Path:
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "fext" / "complexity.db"
+    return Path.home() / ".cache" / "fext" / "complexity.db"
+
+
+class ComplexityCache:
+    """
+    Per-file lizard results keyed by content SHA-256 and lizard version.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or get_complexity_cache_path()
+        self.conn = self._get_connection()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            self._init_db(conn)
+        except (OSError, sqlite3.Error) as e:
+            # Read-only or virtual filesystems: keep working without persistence
+            logger.debug(f"Complexity cache unavailable at {self.db_path}: {e}")
+            conn = sqlite3.connect(":memory:")
+            self._init_db(conn)
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    sha256 TEXT,
+                    version TEXT,
+                    functions TEXT,
+                    PRIMARY KEY (sha256, version)
+                )
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_many(self, digests: List[str], version: str) -> Dict[str, list]:
+        found = {}
+        # Stay below SQLite's bound parameter limit
+        for i in range(0, len(digests), 500):
+            batch = digests[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT sha256, functions FROM results "
+                f"WHERE version = ? AND sha256 IN ({placeholders})",
+                [version, *batch],
+            )
+            for digest, functions in rows:
+                found[digest] = json.loads(functions)
+        return found
+
+    def put_many(self, items: Dict[str, list], version: str):
+        if not items:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (sha256, version, functions) "
+                "VALUES (?, ?, ?)",
+                [(d, version, json.dumps(f)) for d, f in items.items()],
+            )
 
 
 def _analyze_file_content(name: str, content: str) -> List[Dict[str, Any]]:
@@ -26,11 +111,51 @@ def _analyze_file_content(name: str, content: str) -> List[Dict[str, Any]]:
     return results
 
 
-def analyze_complexity(file_path: Path, show_progress: bool = True) -> Dict[str, Any]:
+def _analyze_chunk(items: List[Tuple[str, str, str]]) -> List[Tuple[str, list]]:
+    """Analyzes (digest, name, content) items; runs in a worker process."""
+    results = []
+    for digest, name, content in items:
+        try:
+            results.append((digest, _analyze_file_content(name, content)))
+        except Exception:
+            pass  # Ignore errors in individual files
+    return results
+
+
+def balance_chunks(sizes: Dict[str, int], chunks: int) -> List[List[str]]:
+    """
+    Splits keys into at most `chunks` groups of roughly equal total size.
+
+    Largest first, each into the currently smallest group (LPT scheduling).
+    """
+    groups = [[] for _ in range(max(1, min(chunks, len(sizes))))]
+    loads = [0] * len(groups)
+    for key in sorted(sizes, key=sizes.get, reverse=True):
+        i = loads.index(min(loads))
+        groups[i].append(key)
+        loads[i] += sizes[key]
+    return [g for g in groups if g]
+
+
+def analyze_complexity(
+    file_path: Path,
+    show_progress: bool = True,
+    include_minified: bool = False,
+    fingerprints: Optional[FingerprintDB] = None,
+    cache: Optional[ComplexityCache] = None,
+    skip_paths: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
     """
     Analyzes the cyclomatic complexity of JavaScript files in an extension.
     Uses parallel processing for performance.
+
+    Known vendor libraries (by fingerprint or listed in skip_paths) and,
+    unless include_minified, minified files are skipped and listed under
+    'skipped_files'. Results are cached per file
+    content, so unchanged files are never passed to lizard twice.
     """
+    import lizard
+
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
@@ -42,51 +167,71 @@ def analyze_complexity(file_path: Path, show_progress: bool = True) -> Dict[str,
         # Not a CRX or error parsing, assume ZIP/XPI (offset 0)
         pass
 
-    results = []
+    skip_paths = skip_paths or set()
+    fingerprints = fingerprints if fingerprints is not None else FingerprintDB()
+    version = f"{CACHE_VERSION}:{getattr(lizard, 'version', '')}"
+
+    # digest -> (name, content) for files that need analysis
+    pending = {}
+    # digest -> names sharing that content
+    names_by_digest = {}
+    skipped = []
 
     with open(file_path, "rb") as f:
         f.seek(offset)
         try:
             with zipfile.ZipFile(f) as zf:
-                # Collect JS files
-                js_files = [name for name in zf.namelist() if name.endswith(".js")]
-
-                max_workers = os.cpu_count() or 4
-                with concurrent.futures.ProcessPoolExecutor(
-                    max_workers=max_workers
-                ) as executor:
-                    futures = []
-                    for name in js_files:
-                        with zf.open(name) as js_file:
-                            content = js_file.read().decode("utf-8", errors="ignore")
-                            futures.append(
-                                executor.submit(_analyze_file_content, name, content)
-                            )
-
-                    if show_progress:
-                        with console.create_progress() as progress:
-                            task = progress.add_task(
-                                "Analyzing Complexity", total=len(futures)
-                            )
-                            for future in concurrent.futures.as_completed(futures):
-                                try:
-                                    file_results = future.result()
-                                    results.extend(file_results)
-                                except Exception:
-                                    pass  # Ignore errors in individual files
-                                finally:
-                                    progress.advance(task)
-                    else:
-                        for future in concurrent.futures.as_completed(futures):
-                            try:
-                                file_results = future.result()
-                                results.extend(file_results)
-                            except Exception:
-                                pass  # Ignore errors in individual files
+                for name in zf.namelist():
+                    if not name.endswith(".js"):
+                        continue
+                    if name in skip_paths:
+                        skipped.append({"file": name, "reason": "vendor"})
+                        continue
 
+                    with zf.open(name) as js_file:
+                        raw = js_file.read()
+
+                    digest = hashlib.sha256(raw).hexdigest()
+                    entry = fingerprints.lookup(digest)
+                    if entry:
+                        skipped.append(
+                            {
+                                "file": name,
+                                "reason": f"vendor ({entry['name']} {entry['version']})",
+                            }
+                        )
+                        continue
+                    # Lizard spends seconds on bundles and its numbers are meaningless
+                    if not include_minified and is_minified(raw):
+                        skipped.append({"file": name, "reason": "minified"})
+                        continue
+
+                    names_by_digest.setdefault(digest, []).append(name)
+                    if digest not in pending:
+                        pending[digest] = (name, raw.decode("utf-8", errors="ignore"))
         except zipfile.BadZipFile:
             raise ValueError("Invalid zip/crx file")
 
+    owns_cache = cache is None
+    cache = cache or ComplexityCache()
+    try:
+        functions_by_digest = cache.get_many(list(pending), version)
+        missing = {d: v for d, v in pending.items() if d not in functions_by_digest}
+        computed = _run_lizard(missing, show_progress)
+        cache.put_many(computed, version)
+        functions_by_digest.update(computed)
+    finally:
+        if owns_cache:
+            cache.close()
+
+    results = []
+    for digest, names in names_by_digest.items():
+        for func in functions_by_digest.get(digest, []):
+            for name in names:
+                results.append({**func, "file": name})
+
+    skipped.sort(key=lambda s: s["file"])
+
     # Aggregate stats
     if not results:
         return {
@@ -94,6 +239,7 @@ def analyze_complexity(file_path: Path, show_progress: bool = True) -> Dict[str,
             "max_complexity": 0,
             "high_complexity_functions": [],
             "total_functions": 0,
+            "skipped_files": skipped,
         }
 
     total_complexity = sum(r["complexity"] for r in results)
@@ -109,4 +255,45 @@ def analyze_complexity(file_path: Path, show_progress: bool = True) -> Dict[str,
         "max_complexity": max_complexity,
         "high_complexity_functions": high_complexity,
         "total_functions": len(results),
+        "skipped_files": skipped,
     }
+
+
+def _run_lizard(files: Dict[str, Tuple[str, str]], show_progress: bool):
+    """Runs lizard over files in size-balanced chunks; returns digest -> functions."""
+    computed = {}
+    if not files:
+        return computed
+
+    max_workers = os.cpu_count() or 4
+    # A few chunks per worker keeps them busy when sizes are uneven
+    chunks = balance_chunks(
+        {digest: len(content) for digest, (_, content) in files.items()},
+        max_workers * 4,
+    )
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _analyze_chunk, [(d, files[d][0], files[d][1]) for d in chunk]
+            ): len(chunk)
+            for chunk in chunks
+        }
+
+        progress = console.create_progress() if show_progress else None
+        if progress:
+            progress.start()
+            task = progress.add_task("Analyzing Complexity", total=len(files))
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    computed.update(future.result())
+                except Exception:
+                    pass  # Ignore errors in individual chunks
+                if progress:
+                    progress.advance(task, futures[future])
+        finally:
+            if progress:
+                progress.stop()
+
+    return computed
@@ -1,32 +1,47 @@
 import re
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Set
-from zipfile import ZipFile
+from typing import Dict, Iterable, List, Optional, Set
 from urllib.parse import urlparse
-from fetchext.core.crx import CrxDecoder
+from fetchext.analysis.public_suffix import registrable_domain
 from fetchext.interface.console  import console
+from fetchext.utils  import open_extension_archive
 
 # Regex for finding URLs
-# Matches http, https, ws, wss, ftp
-URL_PATTERN = re.compile(r'(https?|wss?|ftp)://[^\s/$.?#].[^\s"\']*[^\s"\'.]')
+# Matches http, https, ws, wss, ftp. Runs on raw bytes so entries never need
+# to be decoded; only unique hits are decoded and parsed.
+URL_PATTERN = re.compile(rb'(?:https?|wss?|ftp)://[^\s/$.?#].[^\s"\']*[^\s"\'.]')
 
+TARGET_EXTENSIONS = {".js", ".html", ".css", ".json", ".xml", ".txt"}
 
-def extract_domains_from_text(text: str) -> Dict[str, Set[str]]:
+# The regex scan holds the GIL, so large inputs are scanned on a process
+# pool. Below this much uncompressed content, starting workers costs more
+# than the scan itself.
+PROCESS_POOL_MIN_BYTES = 16 * 1024 * 1024
+
+# Uncompressed bytes of entries per pool task
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def extract_urls(data: bytes) -> Set[bytes]:
+    """Returns the unique raw URL hits in data."""
+    return set(URL_PATTERN.findall(data))
+
+
+def parse_urls(raw_urls: Iterable[bytes]) -> Dict[str, Set[str]]:
     """
-    Extract URLs and domains from a string.
+    Decodes and parses unique URL hits into URLs and domains (netlocs).
     """
     urls = set()
     domains = set()
 
-    matches = URL_PATTERN.findall(text)
-    for match in matches:
-        # findall with groups returns the group, but we want the whole match if we didn't group the whole thing.
-        # Actually, the regex above has a group (https?|...), so findall returns just the protocol if we are not careful.
-        # Let's use finditer.
-        pass
-
-    for match in URL_PATTERN.finditer(text):
-        url = match.group(0)
+    for raw in raw_urls:
+        # Try UTF-8, fallback to Latin-1
+        try:
+            url = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            url = raw.decode("latin-1")
         urls.add(url)
 
         try:
@@ -39,107 +54,130 @@ def extract_domains_from_text(text: str) -> Dict[str, Set[str]]:
     return {"urls": urls, "domains": domains}
 
 
+def extract_domains_from_text(text: str) -> Dict[str, Set[str]]:
+    """
+    Extract URLs and domains from a string.
+    """
+    return parse_urls(extract_urls(text.encode("utf-8", errors="surrogatepass")))
+
+
+def group_by_registrable_domain(domains: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Groups domains (netlocs) by registrable domain (eTLD+1).
+    """
+    groups = {}
+    for domain in domains:
+        try:
+            host = urlparse(f"//{domain}").hostname or domain
+        except ValueError:
+            host = domain
+        key = registrable_domain(host) or host
+        groups.setdefault(key, []).append(domain)
+
+    return {key: sorted(groups[key]) for key in sorted(groups)}
+
+
+def _scan_entry(zf, name: str) -> Set[bytes]:
+    try:
+        return extract_urls(zf.read(name))
+    except Exception:
+        # Skip files that can't be read
+        return set()
+
+
+# Archive opened once per worker process by the pool initializer
+_worker_archive = None
+
+
+def _init_worker(file_path: Path):
+    global _worker_archive
+    _worker_archive = open_extension_archive(file_path)
+
+
+def _scan_chunk(names: List[str]) -> Set[bytes]:
+    raw_urls = set()
+    for name in names:
+        raw_urls.update(_scan_entry(_worker_archive, name))
+    return raw_urls
+
+
+def _chunk_entries(infos) -> List[List[str]]:
+    chunks = [[]]
+    chunk_bytes = 0
+    for info in infos:
+        if chunk_bytes >= CHUNK_BYTES:
+            chunks.append([])
+            chunk_bytes = 0
+        chunks[-1].append(info.filename)
+        chunk_bytes += info.file_size
+    return chunks
+
+
 def analyze_domains(
-    file_path: Path, show_progress: bool = True
+    file_path: Path,
+    show_progress: bool = True,
+    max_workers: int = None,
+    skip_paths: Optional[Set[str]] = None,
 ) -> Dict[str, List[str]]:
     """
     Analyze an extension file to extract domains and URLs.
 
+    Entries in skip_paths (e.g. known vendor libraries) are not scanned.
+    Extensions with more than PROCESS_POOL_MIN_BYTES of content to scan are
+    scanned on a process pool; smaller ones in the calling thread.
+
     Returns:
-        Dict with 'domains' and 'urls' lists (sorted).
+        Dict with 'domains' and 'urls' lists (sorted) and 'groups', mapping
+        each registrable domain to the domains under it.
     """
-    all_urls = set()
-    all_domains = set()
-
-    target_extensions = {".js", ".html", ".css", ".json", ".xml", ".txt"}
+    raw_urls = set()
+    skip_paths = skip_paths or set()
 
     try:
-        # Determine offset for CRX
-        offset = 0
-        if file_path.suffix.lower() == ".crx":
-            offset = CrxDecoder.get_zip_offset(file_path)
-
-        f = open(file_path, "rb")
-        if offset > 0:
-            f.seek(offset)
-
-        try:
-            zf = ZipFile(f)
-        except Exception:
-            f.close()
-            if offset == 0:
-                offset = CrxDecoder.get_zip_offset(file_path)
-                if offset > 0:
-                    f = open(file_path, "rb")
-                    f.seek(offset)
-                    try:
-                        zf = ZipFile(f)
-                    except Exception:
-                        f.close()
-                        raise ValueError("Could not open file as ZIP or CRX")
-                else:
-                    raise ValueError("Could not open file as ZIP")
-            else:
-                raise ValueError("Could not open file as CRX")
-
-        with zf:
-            file_list = zf.infolist()
-
-            if show_progress:
-                with console.create_progress() as progress:
-                    task = progress.add_task("Analyzing Domains", total=len(file_list))
-                    for info in file_list:
-                        if info.is_dir():
+        with open_extension_archive(file_path) as zf:
+            infos = [
+                info
+                for info in zf.infolist()
+                if not info.is_dir()
+                and Path(info.filename).suffix.lower() in TARGET_EXTENSIONS
+                and info.filename not in skip_paths
+            ]
+            total_bytes = sum(info.file_size for info in infos)
+
+            progress_context = (
+                console.create_progress() if show_progress else nullcontext()
+            )
+            with progress_context as progress:
+                task = None
+                if progress:
+                    task = progress.add_task("Analyzing Domains", total=len(infos))
+
+                if total_bytes < PROCESS_POOL_MIN_BYTES:
+                    for info in infos:
+                        raw_urls.update(_scan_entry(zf, info.filename))
+                        if progress:
                             progress.advance(task)
-                            continue
-
-                        ext = Path(info.filename).suffix.lower()
-                        if ext in target_extensions:
-                            try:
-                                # Read and decode as text
-                                content_bytes = zf.read(info.filename)
-                                # Try UTF-8, fallback to Latin-1
-                                try:
-                                    text = content_bytes.decode("utf-8")
-                                except UnicodeDecodeError:
-                                    text = content_bytes.decode("latin-1")
-
-                                extracted = extract_domains_from_text(text)
-                                all_urls.update(extracted["urls"])
-                                all_domains.update(extracted["domains"])
-                            except Exception:
-                                # Skip files that can't be read/decoded
-                                pass
-                        progress.advance(task)
-            else:
-                for info in file_list:
-                    if info.is_dir():
-                        continue
-
-                    ext = Path(info.filename).suffix.lower()
-                    if ext in target_extensions:
-                        try:
-                            # Read and decode as text
-                            content_bytes = zf.read(info.filename)
-                            # Try UTF-8, fallback to Latin-1
-                            try:
-                                text = content_bytes.decode("utf-8")
-                            except UnicodeDecodeError:
-                                text = content_bytes.decode("latin-1")
-
-                            extracted = extract_domains_from_text(text)
-                            all_urls.update(extracted["urls"])
-                            all_domains.update(extracted["domains"])
-                        except Exception:
-                            # Skip files that can't be read/decoded
-                            continue
-
-        # Close file if needed (ZipFile context manager closes it if it owns it, but here we passed f)
-        # See previous discussion: ZipFile(f) does not close f automatically in all versions.
-        if "f" in locals() and not f.closed:
-            f.close()
+                else:
+                    with ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        initializer=_init_worker,
+                        initargs=(file_path,),
+                    ) as executor:
+                        futures = {
+                            executor.submit(_scan_chunk, chunk): len(chunk)
+                            for chunk in _chunk_entries(infos)
+                        }
+                        for future in as_completed(futures):
+                            raw_urls.update(future.result())
+                            if progress:
+                                progress.advance(task, futures[future])
 
     except Exception as e:
         raise ValueError(f"Error analyzing domains: {e}")
 
-    return {"domains": sorted(list(all_domains)), "urls": sorted(list(all_urls))}
+    parsed = parse_urls(raw_urls)
+    return {
+        "domains": sorted(parsed["domains"]),
+        "urls": sorted(parsed["urls"]),
+        "groups": group_by_registrable_domain(parsed["domains"]),
+    }
@@ -1,14 +1,54 @@
 import os
 import re
+import mmap
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple
 from fetchext.utils  import open_extension_archive
 
+# Maximum characters of line content reported per match
+MAX_CONTENT = 200
+
+# Lines up to this many bytes are decoded whole; longer (minified) lines are
+# reported as a window around the match.
+MAX_LINE_BYTES = MAX_CONTENT * 4
+
+# Bytes shown before the match in a windowed line
+WINDOW_LEAD = 60
+
+# Small files are batched into one task until either limit is reached
+CHUNK_FILES = 64
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# Chunks queued per worker, bounding memory held by the walk
+PENDING_PER_WORKER = 4
+
 
 class GrepSearcher:
-    def __init__(self, pattern: str, ignore_case: bool = False):
-        flags = re.IGNORECASE if ignore_case else 0
+    """
+    Searches files and archive entries for a regex.
+
+    Each file is searched as a single buffer (mmap for regular files, one
+    inflate per archive entry). Line numbers, content and context are only
+    resolved around matches, and at most one match is reported per line.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        ignore_case: bool = False,
+        max_count: int = None,
+        files_with_matches: bool = False,
+        context: int = 0,
+    ):
+        # MULTILINE keeps ^ and $ anchored to line boundaries as in a per-line search
+        flags = re.MULTILINE
+        if ignore_case:
+            flags |= re.IGNORECASE
         self.pattern = re.compile(pattern.encode("utf-8"), flags)  # Search bytes
+        self.max_count = max_count
+        self.files_with_matches = files_with_matches
+        self.context = context
 
     def search_file(self, file_path: Path):
         results = []
@@ -27,24 +67,14 @@ class GrepSearcher:
         return results
 
     def _search_text_file(self, path: Path):
-        matches = []
         try:
             with open(path, "rb") as f:
-                for i, line in enumerate(f, 1):
-                    if self.pattern.search(line):
-                        try:
-                            decoded = line.decode("utf-8").strip()
-                            # Truncate long lines
-                            if len(decoded) > 200:
-                                decoded = decoded[:200] + "..."
-                            matches.append(
-                                {"file": str(path), "line": i, "content": decoded}
-                            )
-                        except UnicodeDecodeError:
-                            pass  # Skip binary lines
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return self._search_buffer(buf, str(path))
         except Exception:
-            pass
-        return matches
+            return []
 
     def _search_archive(self, path: Path):
         matches = []
@@ -56,53 +86,244 @@ class GrepSearcher:
 
                     try:
                         with zf.open(name) as f:
-                            for i, line in enumerate(f, 1):
-                                if self.pattern.search(line):
-                                    try:
-                                        decoded = line.decode("utf-8").strip()
-                                        if len(decoded) > 200:
-                                            decoded = decoded[:200] + "..."
-                                        matches.append(
-                                            {
-                                                "file": f"{path.name}:{name}",
-                                                "line": i,
-                                                "content": decoded,
-                                            }
-                                        )
-                                    except UnicodeDecodeError:
-                                        pass
+                            data = f.read()
+                        matches.extend(self._search_buffer(data, f"{path.name}:{name}"))
                     except Exception:
                         pass
         except Exception:
             pass
         return matches
 
+    def _search_buffer(self, buf, label: str):
+        matches = []
+        line_number = 1
+        counted_to = 0
+        pos = 0
+        size = len(buf)
 
-def search_directory(
-    directory: Path, pattern: str, ignore_case: bool = False, max_workers: int = None
-):
+        # The last line ends at size; after a trailing newline there is none
+        while pos < size:
+            match = self.pattern.search(buf, pos)
+            if not match:
+                break
+
+            start = match.start()
+            line_start = buf.rfind(b"\n", 0, start) + 1
+            line_end = buf.find(b"\n", start)
+            if line_end == -1:
+                line_end = size
+            # Resume on the next line: one result per matching line
+            pos = line_end + 1
+
+            if match.end() > line_end + 1:
+                # Spans into the next line: retry within this line and its
+                # newline, as a per-line search would
+                match = self.pattern.search(buf, line_start, min(line_end + 1, size))
+                if not match:
+                    continue
+                start = match.start()
+
+            try:
+                content = self._line_content(buf, line_start, line_end, start)
+            except UnicodeDecodeError:
+                continue  # Skip binary lines
+
+            if self.files_with_matches:
+                return [{"file": label}]
+
+            # Slices of disjoint ranges, so the whole buffer is counted at most once
+            line_number += buf[counted_to:line_start].count(b"\n")
+            counted_to = line_start
+
+            result = {"file": label, "line": line_number, "content": content}
+            if self.context:
+                result["before"] = self._context_before(buf, line_start)
+                result["after"] = self._context_after(buf, line_end)
+            matches.append(result)
+
+            if self.max_count and len(matches) >= self.max_count:
+                break
+
+        return matches
+
+    def _line_content(self, buf, line_start: int, line_end: int, match_start: int):
+        if line_end - line_start <= MAX_LINE_BYTES:
+            decoded = buf[line_start:line_end].decode("utf-8").strip()
+            # Truncate long lines
+            if len(decoded) > MAX_CONTENT:
+                decoded = decoded[:MAX_CONTENT] + "..."
+            return decoded
+
+        # Minified code: the head of a megabyte line says nothing about the
+        # match, so show a window around it instead
+        start = max(line_start, match_start - WINDOW_LEAD)
+        end = min(line_end, start + MAX_CONTENT)
+        decoded = buf[start:end].decode("utf-8", errors="ignore").strip()
+        prefix = "..." if start > line_start else ""
+        suffix = "..." if end < line_end else ""
+        return prefix + decoded + suffix
+
+    def _context_line(self, buf, line_start: int, line_end: int):
+        try:
+            return self._line_content(buf, line_start, line_end, line_start)
+        except UnicodeDecodeError:
+            return ""
+
+    def _context_before(self, buf, line_start: int):
+        lines = []
+        end = line_start - 1
+        while end >= 0 and len(lines) < self.context:
+            start = buf.rfind(b"\n", 0, end) + 1
+            lines.append(self._context_line(buf, start, end))
+            end = start - 1
+        lines.reverse()
+        return lines
+
+    def _context_after(self, buf, line_end: int):
+        lines = []
+        size = len(buf)
+        start = line_end + 1
+        while start < size and len(lines) < self.context:
+            end = buf.find(b"\n", start)
+            if end == -1:
+                end = size
+            lines.append(self._context_line(buf, start, end))
+            start = end + 1
+        return lines
+
+
+def iter_files(directory: Path) -> Iterator[Tuple[str, int]]:
+    """
+    Yields (path, size) for regular files under directory.
+
+    Walks with os.scandir so files are produced while the walk is still
+    running. Hidden files and directories (.git etc.) are pruned.
+    """
+    stack = [str(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path, entry.stat().st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+def iter_chunks(
+    files: Iterable[Tuple[str, int]],
+    max_files: int = CHUNK_FILES,
+    max_bytes: int = CHUNK_BYTES,
+) -> Iterator[List[str]]:
+    """Groups small files into chunks so each task carries enough work."""
+    chunk = []
+    chunk_bytes = 0
+    for path, size in files:
+        chunk.append(path)
+        chunk_bytes += size
+        if len(chunk) >= max_files or chunk_bytes >= max_bytes:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+    if chunk:
+        yield chunk
+
+
+# Searcher of the current worker process, set once by the pool initializer
+_worker_searcher = None
+
+
+def _init_worker(searcher: GrepSearcher):
+    global _worker_searcher
+    _worker_searcher = searcher
+
+
+def _search_chunk(paths: List[str]):
+    results = []
+    for path in paths:
+        results.extend(_worker_searcher.search_file(Path(path)))
+    return results
+
+
+def iter_search_directory(
+    directory: Path,
+    pattern: str,
+    ignore_case: bool = False,
+    max_workers: int = None,
+    max_count: int = None,
+    files_with_matches: bool = False,
+    context: int = 0,
+) -> Iterator[dict]:
+    """
+    Searches a directory tree and yields matches as chunks complete.
+
+    Discovery, submission and collection overlap: at most a few chunks per
+    worker are in flight, and the searcher is sent to each worker once.
+    """
     if max_workers is None:
         max_workers = os.cpu_count() or 4
 
-    searcher = GrepSearcher(pattern, ignore_case)
-    results = []
+    searcher = GrepSearcher(
+        pattern,
+        ignore_case,
+        max_count=max_count,
+        files_with_matches=files_with_matches,
+        context=context,
+    )
+    max_pending = max_workers * PENDING_PER_WORKER
 
-    # Only scan files, skip .git and other hidden dirs
-    files = [
-        p
-        for p in directory.rglob("*")
-        if p.is_file() and not any(part.startswith(".") for part in p.parts)
-    ]
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(searcher,)
+    )
+    try:
+        pending = set()
+        for chunk in iter_chunks(iter_files(directory)):
+            pending.add(executor.submit(_search_chunk, chunk))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from _collect(done)
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(searcher.search_file, f): f for f in files}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from _collect(done)
+    finally:
+        # Also reached when the consumer stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
 
-        for future in as_completed(futures):
-            try:
-                res = future.result()
-                if res:
-                    results.extend(res)
-            except Exception:
-                pass
 
-    return results
+def _collect(futures) -> Iterator[dict]:
+    for future in futures:
+        try:
+            yield from future.result()
+        except Exception:
+            pass
+
+
+def search_directory(
+    directory: Path,
+    pattern: str,
+    ignore_case: bool = False,
+    max_workers: int = None,
+    max_count: int = None,
+    files_with_matches: bool = False,
+    context: int = 0,
+):
+    return list(
+        iter_search_directory(
+            directory,
+            pattern,
+            ignore_case,
+            max_workers=max_workers,
+            max_count=max_count,
+            files_with_matches=files_with_matches,
+            context=context,
+        )
+    )
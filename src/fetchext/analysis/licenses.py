@@ -1,43 +1,130 @@
 import re
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional, Set, Tuple
 from zipfile import ZipFile
 from fetchext.core.crx  import CrxDecoder
 
-LICENSE_PATTERNS = {
+# Distinctive phrases of each SPDX license text. Phrases are matched on
+# normalized text (lowercased, punctuation and comment markers dropped,
+# whitespace collapsed), so reflowed or comment-wrapped copies still match.
+LICENSE_FINGERPRINTS = {
     "MIT": [
-        r"Permission is hereby granted, free of charge, to any person obtaining a copy",
-        r"The above copyright notice and this permission notice shall be included in all copies",
+        "Permission is hereby granted, free of charge, to any person obtaining a copy",
+        "The above copyright notice and this permission notice shall be included in all copies",
     ],
     "Apache-2.0": [
-        r"Licensed under the Apache License, Version 2.0",
-        r"http://www.apache.org/licenses/LICENSE-2.0",
+        "Licensed under the Apache License, Version 2.0",
+        "http://www.apache.org/licenses/LICENSE-2.0",
     ],
     "GPL-3.0": [
-        r"GNU General Public License as published by the Free Software Foundation",
-        r"either version 3 of the License, or \(at your option\) any later version",
+        "GNU General Public License as published by the Free Software Foundation",
+        "either version 3 of the License, or (at your option) any later version",
     ],
     "GPL-2.0": [
-        r"GNU General Public License as published by the Free Software Foundation",
-        r"either version 2 of the License, or \(at your option\) any later version",
+        "GNU General Public License as published by the Free Software Foundation",
+        "either version 2 of the License, or (at your option) any later version",
     ],
     "BSD-3-Clause": [
-        r"Redistribution and use in source and binary forms, with or without modification",
-        r"Neither the name of the .* nor the names of its contributors may be used",
+        "Redistribution and use in source and binary forms, with or without modification",
+        "nor the names of its contributors may be used",
     ],
     "BSD-2-Clause": [
-        r"Redistribution and use in source and binary forms, with or without modification",
-        r"Redistributions in binary form must reproduce the above copyright notice",
+        "Redistribution and use in source and binary forms, with or without modification",
+        "Redistributions in binary form must reproduce the above copyright notice",
     ],
     "ISC": [
-        r"Permission to use, copy, modify, and/or distribute this software for any purpose",
+        "Permission to use, copy, modify, and/or distribute this software for any purpose",
     ],
     "MPL-2.0": [
-        r"Mozilla Public License Version 2.0",
+        "Mozilla Public License Version 2.0",
     ],
 }
 
+# Words per shingle
+SHINGLE_SIZE = 4
+
+# Fraction of a phrase's shingles that must occur for the phrase to match
+MIN_CONTAINMENT = 0.8
+
+# Every fingerprint phrase contains one of these; text without them is
+# never normalized
+PREFILTER = re.compile(rb"(?i)licen[cs]|permission|redistribution")
+
+TOKEN = re.compile(rb"[a-z0-9]+")
+
+LICENSE_FILENAMES = {"LICENSE", "LICENSE.TXT", "COPYING", "NOTICE"}
+SOURCE_EXTENSIONS = (".js", ".css", ".html", ".py")
+
+# Bytes of each source file searched for a license header
+HEADER_SIZE = 2048
+
+
+def normalize(data: bytes) -> List[bytes]:
+    """Lowercases data and splits it into alphanumeric tokens."""
+    return TOKEN.findall(data.lower())
+
+
+def shingles(tokens: List[bytes], size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashes of all runs of `size` consecutive tokens."""
+    if len(tokens) < size:
+        return {hash(tuple(tokens))} if tokens else set()
+    return {hash(tuple(tokens[i : i + size])) for i in range(len(tokens) - size + 1)}
+
+
+class LicenseMatcher:
+    """
+    Matches text against license fingerprints in a single pass.
+
+    Each phrase is reduced to a set of token shingle hashes, indexed by hash.
+    A document's shingles are looked up once; a phrase matches when enough of
+    its shingles occur, and the license with the most matching phrases wins.
+    """
+
+    def __init__(self, fingerprints: Dict[str, List[str]] = LICENSE_FINGERPRINTS):
+        self.licenses = list(fingerprints)
+        # (license index, shingle count) per phrase
+        self.phrases: List[Tuple[int, int]] = []
+        # Shingle hash -> phrase indices containing it
+        self.index: Dict[int, List[int]] = {}
+
+        for license_index, name in enumerate(self.licenses):
+            for phrase in fingerprints[name]:
+                phrase_shingles = shingles(normalize(phrase.encode("utf-8")))
+                phrase_index = len(self.phrases)
+                self.phrases.append((license_index, len(phrase_shingles)))
+                for h in phrase_shingles:
+                    self.index.setdefault(h, []).append(phrase_index)
+
+    def match(self, data: bytes) -> Optional[str]:
+        if not PREFILTER.search(data):
+            return None
+
+        hits = [0] * len(self.phrases)
+        for h in shingles(normalize(data)):
+            for phrase_index in self.index.get(h, ()):
+                hits[phrase_index] += 1
+
+        scores = [0] * len(self.licenses)
+        for phrase_index, (license_index, total) in enumerate(self.phrases):
+            if hits[phrase_index] >= total * MIN_CONTAINMENT:
+                scores[license_index] += 1
+
+        best = max(scores)
+        if not best:
+            return None
+        return self.licenses[scores.index(best)]
+
+
+_default_matcher = None
+
+
+def get_license_matcher() -> LicenseMatcher:
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = LicenseMatcher()
+    return _default_matcher
+
 
 def scan_licenses(file_path: Path) -> Dict[str, List[str]]:
     """
@@ -69,34 +156,24 @@ def scan_licenses(file_path: Path) -> Dict[str, List[str]]:
                 except Exception:
                     pass
 
-            # 2. Check LICENSE files
+            matcher = get_license_matcher()
             for filename in zf.namelist():
-                if filename.upper().split("/")[-1] in [
-                    "LICENSE",
-                    "LICENSE.TXT",
-                    "COPYING",
-                    "NOTICE",
-                ]:
+                # 2. Check LICENSE files
+                if filename.upper().split("/")[-1] in LICENSE_FILENAMES:
                     # Read content to guess license
                     try:
-                        content = zf.read(filename).decode("utf-8", errors="ignore")
-                        detected = _detect_license_from_text(content)
-                        if detected:
-                            _add_result(results, detected, filename)
-                        else:
-                            _add_result(results, "Unknown", filename)
+                        detected = matcher.match(zf.read(filename))
+                        _add_result(results, detected or "Unknown", filename)
                     except Exception:
                         pass
 
-                # 3. Check headers of source files (limit to top 20 lines)
-                elif filename.endswith((".js", ".css", ".html", ".py")):
+                # 3. Check headers of source files
+                elif filename.endswith(SOURCE_EXTENSIONS):
                     try:
                         with zf.open(filename) as zf_file:
-                            # Read first 2KB
-                            head = zf_file.read(2048).decode("utf-8", errors="ignore")
-                            detected = _detect_license_from_text(head)
-                            if detected:
-                                _add_result(results, detected, filename)
+                            detected = matcher.match(zf_file.read(HEADER_SIZE))
+                        if detected:
+                            _add_result(results, detected, filename)
                     except Exception:
                         pass
 
@@ -106,12 +183,8 @@ def scan_licenses(file_path: Path) -> Dict[str, List[str]]:
     return results
 
 
-def _detect_license_from_text(text: str) -> str:
-    for license_name, patterns in LICENSE_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return license_name
-    return None
+def _detect_license_from_text(text: str) -> Optional[str]:
+    return get_license_matcher().match(text.encode("utf-8", errors="ignore"))
 
 
 def _add_result(results: Dict, license_name: str, filename: str):
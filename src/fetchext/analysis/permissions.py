@@ -1,18 +1,19 @@
 from pathlib import Path
 from typing import Dict, Set, Any
-from fetchext.security.inspector  import ExtensionInspector
+from fetchext.data.manifest_index  import ManifestIndex
 
 
 class PermissionMatrixGenerator:
     def generate(self, directory: Path) -> Dict[str, Any]:
-        inspector = ExtensionInspector()
         extensions_data = []
         all_permissions: Set[str] = set()
 
         # Find all extension files
         files = []
+        index_dir = directory
         if directory.is_file():
             files = [directory]
+            index_dir = directory.parent
         elif directory.exists():
             files = (
                 list(directory.glob("*.crx"))
@@ -20,29 +21,35 @@ class PermissionMatrixGenerator:
                 + list(directory.glob("*.zip"))
             )
 
-        for file_path in files:
-            try:
-                manifest = inspector.get_manifest(file_path)
-                perms = set(manifest.get("permissions", []))
+        if not files:
+            return {"permissions": [], "extensions": [], "matrix": {}}
 
-                # Add host permissions if present (MV3)
-                if "host_permissions" in manifest:
-                    perms.update(manifest["host_permissions"])
+        with ManifestIndex(index_dir) as index:
+            records = index.refresh(files)
 
-                # Add optional permissions
-                if "optional_permissions" in manifest:
-                    perms.update(manifest["optional_permissions"])
+        for record in records:
+            # Skip invalid files
+            if record.manifest is None:
+                continue
 
-                # Normalize permissions (remove duplicates, sort)
-                perms_list = sorted(list(perms))
-                all_permissions.update(perms_list)
+            manifest = record.manifest
+            perms = set(manifest.get("permissions", []))
 
-                extensions_data.append(
-                    {"filename": file_path.name, "permissions": perms_list}
-                )
-            except Exception:
-                # Skip invalid files or log error
-                continue
+            # Add host permissions if present (MV3)
+            if "host_permissions" in manifest:
+                perms.update(manifest["host_permissions"])
+
+            # Add optional permissions
+            if "optional_permissions" in manifest:
+                perms.update(manifest["optional_permissions"])
+
+            # Normalize permissions (remove duplicates, sort)
+            perms_list = sorted(list(perms))
+            all_permissions.update(perms_list)
+
+            extensions_data.append(
+                {"filename": record.filename, "permissions": perms_list}
+            )
 
         sorted_permissions = sorted(list(all_permissions))
 
@@ -0,0 +1,139 @@
+import ipaddress
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Compact subset of the Public Suffix List (https://publicsuffix.org/).
+# Single-label TLDs need no entry: any unknown last label is treated as a
+# public suffix, as the PSL "*" default rule specifies. Listed here are
+# multi-label suffixes that commonly appear in extension code, plus hosting
+# platforms where every subdomain belongs to a different owner.
+PUBLIC_SUFFIXES = (
+    # Country second-level domains
+    "ac.uk", "co.uk", "gov.uk", "ltd.uk", "me.uk", "net.uk", "org.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au", "id.au",
+    "co.nz", "net.nz", "org.nz", "govt.nz",
+    "co.jp", "ne.jp", "or.jp", "ac.jp", "go.jp", "gr.jp",
+    "co.kr", "ne.kr", "or.kr", "go.kr",
+    "com.br", "net.br", "org.br", "gov.br",
+    "com.cn", "net.cn", "org.cn", "gov.cn", "edu.cn",
+    "com.hk", "net.hk", "org.hk",
+    "com.tw", "net.tw", "org.tw",
+    "com.sg", "net.sg", "org.sg",
+    "co.in", "net.in", "org.in", "gov.in", "ac.in",
+    "co.id", "or.id", "web.id",
+    "co.za", "org.za", "gov.za",
+    "com.mx", "org.mx", "gob.mx",
+    "com.ar", "com.co", "com.pe", "com.ve", "com.ua", "com.ru", "com.tr",
+    "co.il", "org.il", "co.th", "in.th", "com.my", "com.ph", "com.vn",
+    "com.pl", "net.pl", "org.pl",
+    # Hosting platforms (private section)
+    "github.io", "githubusercontent.com", "gitlab.io", "pages.dev",
+    "workers.dev", "netlify.app", "vercel.app", "herokuapp.com",
+    "appspot.com", "firebaseapp.com", "web.app", "blogspot.com",
+    "azurewebsites.net", "cloudfront.net", "s3.amazonaws.com",
+    "*.compute.amazonaws.com", "azureedge.net", "fastly.net",
+    "glitch.me", "repl.co", "ngrok.io", "ngrok-free.app",
+    # Wildcard rules with exceptions
+    "*.ck", "!www.ck",
+    "*.bd", "*.np",
+)  # fmt: skip
+
+
+class PublicSuffixTrie:
+    """
+    Reversed-label trie of public suffix rules.
+
+    Supports the PSL rule syntax: plain rules, "*" wildcard labels and "!"
+    exception rules.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self, rules: Iterable[str] = PUBLIC_SUFFIXES):
+        self.root: Dict[str, dict] = {}
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PublicSuffixTrie":
+        """Builds a trie from a full public_suffix_list.dat file."""
+        with open(path, "r", encoding="utf-8") as f:
+            rules = [
+                line.split()[0]
+                for line in f
+                if line.strip() and not line.startswith("//")
+            ]
+        return cls(rules)
+
+    def add(self, rule: str):
+        exception = rule.startswith("!")
+        labels = rule.lstrip("!").lower().split(".")
+
+        node = self.root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        # "" marks the end of a rule: True for exceptions, False otherwise
+        node[""] = exception
+
+    def suffix_length(self, labels) -> int:
+        """Number of trailing labels forming the public suffix of labels."""
+        # Implicit "*" rule: the last label is always a public suffix
+        length = 1
+        node = self.root
+        for depth, label in enumerate(reversed(labels), 1):
+            child = node.get(label)
+            wildcard = node.get("*")
+            if child is not None and "" in child and child[""]:
+                # Exception rule: the suffix is one label shorter than the rule
+                return depth - 1
+            if child is None:
+                if wildcard is not None and "" in wildcard:
+                    length = max(length, depth)
+                break
+            if "" in child:
+                length = max(length, depth)
+            elif wildcard is not None and "" in wildcard:
+                length = max(length, depth)
+            node = child
+        return length
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """
+        Returns the registrable domain (eTLD+1) of host.
+
+        IP addresses are returned unchanged. Returns None for empty hosts or
+        hosts that are themselves a public suffix.
+        """
+        host = host.strip(".").lower()
+        if not host:
+            return None
+
+        try:
+            ipaddress.ip_address(host.strip("[]"))
+            return host
+        except ValueError:
+            pass
+
+        labels = host.split(".")
+        if len(labels) == 1:
+            # Intranet names such as localhost
+            return host
+
+        suffix = self.suffix_length(labels)
+        if suffix >= len(labels):
+            return None
+        return ".".join(labels[-(suffix + 1) :])
+
+
+_default_trie = None
+
+
+def get_public_suffix_trie() -> PublicSuffixTrie:
+    global _default_trie
+    if _default_trie is None:
+        _default_trie = PublicSuffixTrie()
+    return _default_trie
+
+
+def registrable_domain(host: str) -> Optional[str]:
+    return get_public_suffix_trie().registrable_domain(host)
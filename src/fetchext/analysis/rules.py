@@ -1,10 +1,38 @@
+import io
+import os
 import re
+import json
+import hashlib
+import logging
+import tempfile
 import yaml
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set
 from fetchext.utils  import open_extension_archive
 
+logger = logging.getLogger(__name__)
+
+# The literal prefilter reads patterns with the private regex parser. If it
+# is missing or changes shape, every rule is simply evaluated on every file.
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    sre_parse = sre_constants = None
+
+# Bump when the cached rule format changes
+CACHE_VERSION = 1
+
+# Literals shorter than this match almost every file and are not worth
+# indexing; such rules are always evaluated.
+MIN_LITERAL_LENGTH = 3
+
+_REPEATS = tuple(
+    getattr(sre_constants, name, None)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+)
+
 
 @dataclass
 class RuleMatch:
@@ -16,9 +44,86 @@ class RuleMatch:
     match: str
 
 
+def get_rules_cache_dir() -> Path:
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "fext" / "rules"
+    return Path.home() / ".cache" / "fext" / "rules"
+
+
+def extract_literals(pattern: str) -> Optional[List[str]]:
+    """
+    Returns literals of which at least one occurs in every match of pattern.
+
+    Literals are casefolded to match the engine's case-insensitive search.
+    Returns None when no useful literal can be derived, including when the
+    regex parser is unavailable or fails.
+    """
+    if sre_parse is None:
+        return None
+    try:
+        literals = _sequence_literals(sre_parse.parse(pattern, re.IGNORECASE))
+    except Exception as e:
+        logger.debug(f"No literal prefilter for {pattern!r}: {e}")
+        return None
+
+    if not literals or min(len(lit) for lit in literals) < MIN_LITERAL_LENGTH:
+        return None
+    return sorted({lit.casefold() for lit in literals})
+
+
+def _sequence_literals(items) -> Optional[Set[str]]:
+    best = None
+
+    def consider(candidates):
+        nonlocal best
+        if candidates and (
+            best is None or min(map(len, candidates)) > min(map(len, best))
+        ):
+            best = candidates
+
+    run = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+
+        if run:
+            consider({"".join(run)})
+            run = []
+
+        if op is sre_constants.SUBPATTERN:
+            consider(_sequence_literals(av[-1]))
+        elif op is sre_constants.ATOMIC_GROUP:
+            consider(_sequence_literals(av))
+        elif op is sre_constants.BRANCH:
+            branches = [_sequence_literals(branch) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op in _REPEATS and av[0] >= 1:
+            consider(_sequence_literals(av[2]))
+
+    if run:
+        consider({"".join(run)})
+    return best
+
+
 class RuleEngine:
-    def __init__(self, rules_path: Path = None):
+    """
+    Scans extensions with regex rules loaded from a YAML rule pack.
+
+    Each rule is indexed by the literals its pattern requires, so a file is
+    only matched against rules whose literals occur in it. Parsed rule packs
+    are cached on disk, keyed by the SHA256 of the rules file.
+    """
+
+    def __init__(self, rules_path: Path = None, cache_dir: Optional[Path] = None):
         self.rules = []
+        self.cache_dir = cache_dir or get_rules_cache_dir()
+        # Casefolded literal -> indices of rules requiring it
+        self.literal_index: Dict[str, List[int]] = {}
+        # Rules without a usable literal, evaluated on every file
+        self.unindexed: List[int] = []
         if rules_path:
             self.load_rules(rules_path)
 
@@ -26,52 +131,112 @@ class RuleEngine:
         if not path.exists():
             raise FileNotFoundError(f"Rules file not found: {path}")
 
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        specs = self._load_cached(digest)
+        if specs is None:
+            specs = self._parse_rules(raw)
+            self._store_cached(digest, specs)
+
+        for spec in specs:
+            self._add_rule(spec)
+
+    def _parse_rules(self, raw: bytes) -> List[dict]:
+        data = yaml.safe_load(raw)
 
         if not data or "rules" not in data:
             raise ValueError("Invalid rules file format")
 
+        specs = []
         for rule in data["rules"]:
-            self.rules.append(
+            pattern = rule.get("pattern")
+            # Fail on invalid patterns before anything is cached
+            re.compile(pattern, re.IGNORECASE)
+            specs.append(
                 {
                     "id": rule.get("id"),
                     "description": rule.get("description", ""),
                     "severity": rule.get("severity", "medium"),
-                    "pattern": re.compile(rule.get("pattern"), re.IGNORECASE),
+                    "pattern": pattern,
+                    "literals": extract_literals(pattern),
                 }
             )
+        return specs
 
-    def scan(self, file_path: Path) -> List[RuleMatch]:
-        matches = []
+    def _add_rule(self, spec: dict):
+        index = len(self.rules)
+        self.rules.append(
+            {
+                "id": spec["id"],
+                "description": spec["description"],
+                "severity": spec["severity"],
+                "pattern": re.compile(spec["pattern"], re.IGNORECASE),
+            }
+        )
+
+        if spec["literals"]:
+            for literal in spec["literals"]:
+                self.literal_index.setdefault(literal, []).append(index)
+        else:
+            self.unindexed.append(index)
+
+    def _cache_file(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cached(self, digest: str) -> Optional[List[dict]]:
+        cache_file = self._cache_file(digest)
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != CACHE_VERSION:
+            return None
+        return data.get("rules")
 
-        # Helper to scan content
-        def scan_content(filename, content_lines):
-            for i, line in enumerate(content_lines, 1):
+    def _store_cached(self, digest: str, specs: List[dict]):
+        cache_file = self._cache_file(digest)
+        tmp_name = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # A unique name, so concurrent writers never share a temp file
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.cache_dir, suffix=".tmp", delete=False
+            ) as f:
+                tmp_name = f.name
+                json.dump({"version": CACHE_VERSION, "rules": specs}, f)
+            os.replace(tmp_name, cache_file)
+        except OSError as e:
+            logger.debug(f"Could not cache compiled rules at {cache_file}: {e}")
+            if tmp_name:
                 try:
-                    line_str = line.decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
-
-                for rule in self.rules:
-                    if rule["pattern"].search(line_str):
-                        matches.append(
-                            RuleMatch(
-                                rule_id=rule["id"],
-                                description=rule["description"],
-                                severity=rule["severity"],
-                                file=filename,
-                                line=i,
-                                match=line_str.strip()[:100],  # Truncate
-                            )
-                        )
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    def candidate_rules(self, text: str) -> List[dict]:
+        """Returns the rules whose required literals occur in text."""
+        folded = text.casefold()
+        selected = set(self.unindexed)
+        for literal, indices in self.literal_index.items():
+            if literal in folded:
+                selected.update(indices)
+        return [self.rules[i] for i in sorted(selected)]
+
+    def scan(self, file_path: Path) -> List[RuleMatch]:
+        matches = []
 
         if file_path.is_dir():
             for p in file_path.rglob("*"):
                 if p.is_file():
                     try:
                         with open(p, "rb") as f:
-                            scan_content(str(p.relative_to(file_path)), f)
+                            data = f.read()
+                        matches.extend(
+                            self._scan_content(str(p.relative_to(file_path)), data)
+                        )
                     except Exception:
                         pass
         else:
@@ -83,10 +248,34 @@ class RuleEngine:
                             continue
                         try:
                             with zf.open(name) as f:
-                                scan_content(name, f)
+                                data = f.read()
+                            matches.extend(self._scan_content(name, data))
                         except Exception:
                             pass
             except Exception:
                 pass
 
         return matches
+
+    def _scan_content(self, filename: str, data: bytes) -> List[RuleMatch]:
+        text = data.decode("utf-8", errors="ignore")
+        rules = self.candidate_rules(text)
+        if not rules:
+            return []
+
+        return list(self._match_lines(filename, io.StringIO(text, newline="\n"), rules))
+
+    def _match_lines(
+        self, filename: str, lines: Iterable[str], rules: List[dict]
+    ) -> Iterable[RuleMatch]:
+        for i, line_str in enumerate(lines, 1):
+            for rule in rules:
+                if rule["pattern"].search(line_str):
+                    yield RuleMatch(
+                        rule_id=rule["id"],
+                        description=rule["description"],
+                        severity=rule["severity"],
+                        file=filename,
+                        line=i,
+                        match=line_str.strip()[:100],  # Truncate
+                    )
@@ -0,0 +1,236 @@
+import re
+from bisect import bisect_left
+from typing import Iterator, List, Sequence, Tuple
+
+# (tag, i1, i2, j1, j2) with difflib's tags: a[i1:i2] -> b[j1:j2]
+Opcode = Tuple[str, int, int, int, int]
+
+# Edit distance at which the Myers search gives up and reports the region as
+# replaced. Bounds the fallback to O((N + M) * MAX_EDIT_COST) time.
+MAX_EDIT_COST = 1000
+
+# Words, whitespace runs and single punctuation characters
+TOKEN_PATTERN = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into tokens for diffing single-line (minified) files."""
+    return TOKEN_PATTERN.findall(text)
+
+
+def diff_sequences(
+    a: Sequence, b: Sequence, max_cost: int = MAX_EDIT_COST
+) -> List[Opcode]:
+    """
+    Diffs two sequences of hashable items with patience semantics.
+
+    Lines unique to both sides anchor the diff; the gaps between anchors are
+    diffed recursively, and gaps without unique lines fall back to a
+    cost-bounded Myers search. Returns difflib-style opcodes.
+    """
+    raw = []
+    # Work stack of ranges (alo, ahi, blo, bhi), processed in order
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        # Common prefix and suffix
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            raw.append(("equal", start, alo, blo - (alo - start), blo))
+
+        suffix = 0
+        while (
+            alo < ahi - suffix
+            and blo < bhi - suffix
+            and a[ahi - suffix - 1] == b[bhi - suffix - 1]
+        ):
+            suffix += 1
+        ahi -= suffix
+        bhi -= suffix
+
+        if alo < ahi or blo < bhi:
+            anchors = _patience_anchors(a, alo, ahi, b, blo, bhi)
+            if anchors:
+                tasks = []
+                i, j = alo, blo
+                for ai, bj in anchors:
+                    tasks.append((i, ai, j, bj))
+                    tasks.append((ai, ai + 1, bj, bj + 1))
+                    i, j = ai + 1, bj + 1
+                tasks.append((i, ahi, j, bhi))
+                if suffix:
+                    tasks.append((ahi, ahi + suffix, bhi, bhi + suffix))
+                stack.extend(reversed(tasks))
+                continue
+
+            ops = _myers(a, alo, ahi, b, blo, bhi, max_cost)
+            raw.extend(ops if ops is not None else [("replace", alo, ahi, blo, bhi)])
+
+        if suffix:
+            raw.append(("equal", ahi, ahi + suffix, bhi, bhi + suffix))
+
+    return _merge(raw)
+
+
+def _patience_anchors(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines occurring exactly once on each side."""
+    # Item -> index of its only occurrence, or -1 if repeated
+    unique_a = {}
+    for i in range(alo, ahi):
+        unique_a[a[i]] = -1 if a[i] in unique_a else i
+    unique_b = {}
+    for j in range(blo, bhi):
+        unique_b[b[j]] = -1 if b[j] in unique_b else j
+
+    pairs = [
+        (i, unique_b[item])
+        for item, i in unique_a.items()
+        if i >= 0 and unique_b.get(item, -1) >= 0
+    ]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting on the b indices
+    tails = []  # b index at the top of each pile
+    tops = []  # pair index at the top of each pile
+    back = [-1] * len(pairs)
+    for n, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile:
+            back[n] = tops[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tops.append(n)
+        else:
+            tails[pile] = j
+            tops[pile] = n
+
+    anchors = []
+    n = tops[-1]
+    while n >= 0:
+        anchors.append(pairs[n])
+        n = back[n]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(a, alo, ahi, b, blo, bhi, max_cost):
+    """Myers O(ND) diff of a range; None if the edit cost exceeds max_cost."""
+    n = ahi - alo
+    m = bhi - blo
+    max_d = min(n + m, max_cost)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    # trace[d][k + d]: furthest x on diagonal k after d - 1 edits
+    trace = []
+
+    for d in range(max_d + 1):
+        trace.append(v[offset - d : offset + d + 1])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, d, n, m, alo, blo)
+    return None
+
+
+def _backtrack(trace, cost, x, y, alo, blo) -> List[Opcode]:
+    ops = []
+    for d in range(cost, 0, -1):
+        previous = trace[d]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d] < previous[k + 1 + d]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = previous[prev_k + d]
+        prev_y = prev_x - prev_k
+
+        # Point right after the edit; a snake of equal items follows it
+        mid_x, mid_y = (prev_x, prev_y + 1) if prev_k == k + 1 else (prev_x + 1, prev_y)
+        if x > mid_x:
+            ops.append(("equal", alo + mid_x, alo + x, blo + mid_y, blo + y))
+        if prev_k == k + 1:
+            ops.append(
+                ("insert", alo + prev_x, alo + prev_x, blo + prev_y, blo + mid_y)
+            )
+        else:
+            ops.append(
+                ("delete", alo + prev_x, alo + mid_x, blo + prev_y, blo + prev_y)
+            )
+        x, y = prev_x, prev_y
+
+    if x:
+        ops.append(("equal", alo, alo + x, blo, blo + y))
+    ops.reverse()
+    return ops
+
+
+def _merge(raw: List[Opcode]) -> List[Opcode]:
+    """Joins adjacent equal runs and adjacent edits into single opcodes."""
+    merged = []
+    for tag, i1, i2, j1, j2 in raw:
+        if i1 == i2 and j1 == j2:
+            continue
+        edit = tag != "equal"
+        if merged:
+            ptag, pi1, _, pj1, _ = merged[-1]
+            if (ptag != "equal") == edit and (edit or ptag == tag):
+                merged[-1] = (ptag, pi1, i2, pj1, j2)
+                continue
+        merged.append((tag, i1, i2, j1, j2))
+
+    return [
+        (_edit_tag(i1, i2, j1, j2) if tag != "equal" else tag, i1, i2, j1, j2)
+        for tag, i1, i2, j1, j2 in merged
+    ]
+
+
+def _edit_tag(i1, i2, j1, j2) -> str:
+    if i1 == i2:
+        return "insert"
+    if j1 == j2:
+        return "delete"
+    return "replace"
+
+
+def group_opcodes(opcodes: List[Opcode], context: int = 3) -> Iterator[List[Opcode]]:
+    """
+    Yields hunks: runs of changes with up to `context` equal items around
+    them, as difflib.SequenceMatcher.get_grouped_opcodes does.
+    """
+    codes = list(opcodes)
+    if not codes or all(code[0] == "equal" for code in codes):
+        return
+
+    tag, i1, i2, j1, j2 = codes[0]
+    if tag == "equal":
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    tag, i1, i2, j1, j2 = codes[-1]
+    if tag == "equal":
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # Split at equal runs too long to be shown as context
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
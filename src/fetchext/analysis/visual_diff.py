@@ -1,11 +1,19 @@
+import re
+import html
 import base64
-import difflib
 import mimetypes
 from pathlib import Path
+from typing import Iterator, List
+from fetchext.analysis.text_diff import (
+    MAX_EDIT_COST,
+    diff_sequences,
+    group_opcodes,
+    tokenize,
+)
 from fetchext.workflow.diff  import DiffReport
-from fetchext.utils  import open_extension_archive
+from fetchext.utils  import is_minified, open_extension_archive
 
-HTML_TEMPLATE = """
+HTML_HEADER = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -40,6 +48,11 @@ HTML_TEMPLATE = """
         .diff_add {{ background-color: #ccffd8; }}
         .diff_chg {{ background-color: #fff5b1; }}
         .diff_sub {{ background-color: #ffdce0; }}
+        .diff_hunk {{ background-color: #f1f8ff; color: #586069; }}
+        .diff-tokens {{ font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, monospace; font-size: 12px; white-space: pre-wrap; word-break: break-all; margin: 0 0 10px; }}
+        .diff-tokens del {{ background-color: #ffdce0; text-decoration: none; }}
+        .diff-tokens ins {{ background-color: #ccffd8; text-decoration: none; }}
+        .diff-note {{ color: #777; font-style: italic; }}
     </style>
 </head>
 <body>
@@ -70,63 +83,160 @@ HTML_TEMPLATE = """
         </div>
 
         <h2>Modified Files</h2>
-        {content}
+"""
+
+HTML_FOOTER = """
     </div>
 </body>
 </html>
 """
 
 
+# Lines of context around each change
+DEFAULT_CONTEXT = 3
+
+# Tokens of context around each change in minified files
+TOKEN_CONTEXT = 20
+
+# Rendered HTML budgets. Diffs beyond them are truncated rather than
+# producing reports no browser can open.
+MAX_FILE_DIFF_SIZE = 512 * 1024
+MAX_REPORT_SIZE = 32 * 1024 * 1024
+
+# Files larger than this (either side) skip the token diff and get a line
+# diff whose edit search is scaled to about LARGE_DIFF_BUDGET steps
+MAX_DIFF_INPUT = 4 * 1024 * 1024
+LARGE_DIFF_BUDGET = 20_000_000
+
+# Large minified files are split after statements to get lines to diff
+STATEMENT_END = re.compile(r"(?<=[;}])")
+
+# Streamed diffs open a wrapper in their first part and close it in the last
+TEXT_DIFF_OPEN = "<div class='diff-content'><table class='diff'>"
+TEXT_DIFF_CLOSE = "</table></div>"
+TOKEN_DIFF_OPEN = "<div class='diff-content'>"
+TOKEN_DIFF_CLOSE = "</div>"
+CLOSING_TAGS = {TEXT_DIFF_OPEN: TEXT_DIFF_CLOSE, TOKEN_DIFF_OPEN: TOKEN_DIFF_CLOSE}
+
+
 class VisualDiffGenerator:
+    """
+    Writes an HTML diff report incrementally to disk.
+
+    Text files are diffed with patience/Myers semantics and rendered as
+    hunks with `context` lines around each change; minified files are diffed
+    token by token. Each file's rendering is capped at `max_file_size`
+    characters and the whole report at `max_report_size`.
+    """
+
+    def __init__(
+        self,
+        context: int = DEFAULT_CONTEXT,
+        max_file_size: int = MAX_FILE_DIFF_SIZE,
+        max_report_size: int = MAX_REPORT_SIZE,
+    ):
+        self.context = context
+        self.max_file_size = max_file_size
+        self.max_report_size = max_report_size
+
     def generate(
         self, report: DiffReport, old_path: Path, new_path: Path, output_path: Path
     ):
-        content_parts = []
+        omitted = []
 
         with (
             open_extension_archive(old_path) as old_zf,
             open_extension_archive(new_path) as new_zf,
+            open(output_path, "w", encoding="utf-8") as out,
         ):
+            out.write(
+                HTML_HEADER.format(
+                    old_version=html.escape(str(report.old_version)),
+                    new_version=html.escape(str(report.new_version)),
+                    added_count=len(report.added_files),
+                    removed_count=len(report.removed_files),
+                    modified_count=len(report.modified_files),
+                )
+            )
+            written = 0
+
             for filename in report.modified_files:
+                budget = min(self.max_file_size, self.max_report_size - written)
+                if budget <= 0:
+                    omitted.append(filename)
+                    continue
+
+                out.write(
+                    f'<div class="file-diff">\n'
+                    f'<div class="file-header">{html.escape(filename)}</div>\n'
+                )
                 try:
                     old_bytes = old_zf.read(filename)
                     new_bytes = new_zf.read(filename)
-
-                    if self._is_image(filename):
-                        diff_html = self._generate_image_diff(
-                            filename, old_bytes, new_bytes
-                        )
-                    elif self._is_text(filename):
-                        diff_html = self._generate_text_diff(
-                            filename, old_bytes, new_bytes
-                        )
-                    else:
-                        diff_html = f"<div class='diff-content'><p>Binary file modified (size: {len(old_bytes)} -> {len(new_bytes)} bytes)</p></div>"
-
-                    content_parts.append(f"""
-                    <div class="file-diff">
-                        <div class="file-header">{filename}</div>
-                        {diff_html}
-                    </div>
-                    """)
+                    parts = self._iter_file_diff(filename, old_bytes, new_bytes)
+                    written += self._write_limited(out, parts, budget)
                 except Exception as e:
-                    content_parts.append(f"""
-                    <div class="file-diff">
-                        <div class="file-header">{filename}</div>
-                        <div class="diff-content">Error generating diff: {str(e)}</div>
-                    </div>
-                    """)
-
-        html = HTML_TEMPLATE.format(
-            old_version=report.old_version,
-            new_version=report.new_version,
-            added_count=len(report.added_files),
-            removed_count=len(report.removed_files),
-            modified_count=len(report.modified_files),
-            content="\n".join(content_parts),
-        )
+                    out.write(
+                        f"<div class='diff-content'>Error generating diff: "
+                        f"{html.escape(str(e))}</div>"
+                    )
+                out.write("</div>\n")
+
+            if omitted:
+                out.write(
+                    f"<p class='diff-note'>{len(omitted)} more modified files omitted "
+                    "(report size limit reached):</p>\n<ul>"
+                )
+                for filename in omitted:
+                    out.write(f"<li>{html.escape(filename)}</li>")
+                out.write("</ul>\n")
 
-        output_path.write_text(html, encoding="utf-8")
+            out.write(HTML_FOOTER)
+
+    def _write_limited(self, out, parts: Iterator[str], budget: int) -> int:
+        """
+        Writes parts until budget characters. Returns the budget used; a
+        truncated file uses all of it. A wrapper left open by truncation or
+        an error is closed, so the rest of the report stays well-formed.
+        """
+        written = 0
+        closing = ""
+        try:
+            for part in parts:
+                if written + len(part) > budget:
+                    out.write(closing)
+                    out.write(
+                        "<div class='diff-content diff-note'>Diff truncated "
+                        "(size limit reached).</div>"
+                    )
+                    return budget
+                out.write(part)
+                written += len(part)
+                if part in CLOSING_TAGS:
+                    closing = CLOSING_TAGS[part]
+                elif part == closing:
+                    closing = ""
+        except Exception:
+            out.write(closing)
+            raise
+        return written
+
+    def _iter_file_diff(
+        self, filename: str, old_bytes: bytes, new_bytes: bytes
+    ) -> Iterator[str]:
+        if self._is_image(filename):
+            yield self._generate_image_diff(filename, old_bytes, new_bytes)
+        elif not self._is_text(filename):
+            yield (
+                f"<div class='diff-content'><p>Binary file modified (size: "
+                f"{len(old_bytes)} -> {len(new_bytes)} bytes)</p></div>"
+            )
+        elif max(len(old_bytes), len(new_bytes)) > MAX_DIFF_INPUT:
+            yield from self._iter_large_diff(old_bytes, new_bytes)
+        elif is_minified(old_bytes) or is_minified(new_bytes):
+            yield from self._iter_token_diff(old_bytes, new_bytes)
+        else:
+            yield from self._iter_text_diff(old_bytes, new_bytes)
 
     def _is_image(self, filename: str) -> bool:
         mime, _ = mimetypes.guess_type(filename)
@@ -180,21 +290,97 @@ class VisualDiffGenerator:
         </div>
         """
 
-    def _generate_text_diff(
-        self, filename: str, old_bytes: bytes, new_bytes: bytes
+    def _iter_text_diff(self, old_bytes: bytes, new_bytes: bytes) -> Iterator[str]:
+        old_lines = old_bytes.decode("utf-8", errors="replace").splitlines()
+        new_lines = new_bytes.decode("utf-8", errors="replace").splitlines()
+        yield from self._iter_line_diff(old_lines, new_lines)
+
+    def _iter_large_diff(self, old_bytes: bytes, new_bytes: bytes) -> Iterator[str]:
+        """
+        Line diff for inputs over MAX_DIFF_INPUT. Token lists of that size
+        are too costly, so minified text is split into statements instead,
+        and the Myers fallback gets a smaller edit cost the more lines there
+        are.
+        """
+        split = str.splitlines
+        if is_minified(old_bytes) or is_minified(new_bytes):
+            split = STATEMENT_END.split
+        old_lines = split(old_bytes.decode("utf-8", errors="replace"))
+        new_lines = split(new_bytes.decode("utf-8", errors="replace"))
+
+        total = len(old_lines) + len(new_lines) or 1
+        max_cost = max(1, min(MAX_EDIT_COST, LARGE_DIFF_BUDGET // total))
+        yield from self._iter_line_diff(old_lines, new_lines, max_cost)
+
+    def _iter_line_diff(
+        self,
+        old_lines: List[str],
+        new_lines: List[str],
+        max_cost: int = MAX_EDIT_COST,
+    ) -> Iterator[str]:
+        """Yields a table of hunks, one chunk of HTML per hunk."""
+        yield TEXT_DIFF_OPEN
+        opcodes = diff_sequences(old_lines, new_lines, max_cost)
+        for hunk in group_opcodes(opcodes, self.context):
+            yield self._render_hunk(hunk, old_lines, new_lines)
+        yield TEXT_DIFF_CLOSE
+
+    def _render_hunk(
+        self, hunk: List[tuple], old_lines: List[str], new_lines: List[str]
     ) -> str:
-        try:
-            old_text = old_bytes.decode("utf-8", errors="replace").splitlines()
-            new_text = new_bytes.decode("utf-8", errors="replace").splitlines()
-
-            diff = difflib.HtmlDiff(wrapcolumn=80).make_table(
-                old_text,
-                new_text,
-                fromdesc="Old",
-                todesc="New",
-                context=True,
-                numlines=5,
-            )
-            return f"<div class='diff-content'>{diff}</div>"
-        except Exception as e:
-            return f"<div class='diff-content'>Error decoding text: {str(e)}</div>"
+        first, last = hunk[0], hunk[-1]
+        rows = [
+            f"<tr><td class='diff_hunk' colspan='4'>@@ -{first[1] + 1},"
+            f"{last[2] - first[1]} +{first[3] + 1},{last[4] - first[3]} @@</td></tr>"
+        ]
+        for tag, i1, i2, j1, j2 in hunk:
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    rows.append(
+                        self._row(
+                            i1 + offset + 1,
+                            j1 + offset + 1,
+                            " ",
+                            old_lines[i1 + offset],
+                        )
+                    )
+                continue
+            for i in range(i1, i2):
+                rows.append(self._row(i + 1, "", "-", old_lines[i], "diff_sub"))
+            for j in range(j1, j2):
+                rows.append(self._row("", j + 1, "+", new_lines[j], "diff_add"))
+        return "\n".join(rows)
+
+    def _row(self, old_no, new_no, marker: str, line: str, css: str = "") -> str:
+        return (
+            f"<tr class='{css}'><td class='diff_header'>{old_no}</td>"
+            f"<td class='diff_header'>{new_no}</td><td>{marker}</td>"
+            f"<td>{html.escape(line)}</td></tr>"
+        )
+
+    def _iter_token_diff(self, old_bytes: bytes, new_bytes: bytes) -> Iterator[str]:
+        """Yields inline token-level hunks for minified (long-line) files."""
+        old_tokens = tokenize(old_bytes.decode("utf-8", errors="replace"))
+        new_tokens = tokenize(new_bytes.decode("utf-8", errors="replace"))
+
+        yield TOKEN_DIFF_OPEN
+        opcodes = diff_sequences(old_tokens, new_tokens)
+        for hunk in group_opcodes(opcodes, TOKEN_CONTEXT):
+            parts = [
+                f"<div class='diff_hunk'>@@ token {hunk[0][1] + 1} -> "
+                f"{hunk[0][3] + 1} @@</div><pre class='diff-tokens'>"
+            ]
+            for tag, i1, i2, j1, j2 in hunk:
+                old_text = html.escape("".join(old_tokens[i1:i2]))
+                if tag == "equal":
+                    parts.append(old_text)
+                    continue
+                if i2 > i1:
+                    parts.append(f"<del>{old_text}</del>")
+                if j2 > j1:
+                    parts.append(
+                        f"<ins>{html.escape(''.join(new_tokens[j1:j2]))}</ins>"
+                    )
+            parts.append("</pre>")
+            yield "".join(parts)
+        yield TOKEN_DIFF_CLOSE
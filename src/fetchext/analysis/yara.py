@@ -1,16 +1,26 @@
+import hashlib
 import logging
-import tempfile
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from zipfile import ZipFile
 from fetchext.core.crx import CrxDecoder
 
 logger = logging.getLogger(__name__)
 
+# Entries above this size are inflated into an anonymous memory map
+LARGE_ENTRY_SIZE = 10 * 1024 * 1024  # 10MB
+CHUNK_SIZE = 1024 * 1024
+
+# libyara refuses scans beyond YR_MAX_THREADS concurrent ones
+YARA_MAX_THREADS = 32
+
 
 class YaraScanner:
-    def __init__(self, rules_path: Path):
+    def __init__(self, rules_path: Path, max_workers: Optional[int] = None):
+        self.max_workers = min(YARA_MAX_THREADS, max_workers or os.cpu_count() or 4)
         try:
             import yara
         except ImportError:
@@ -42,15 +52,55 @@ class YaraScanner:
                         f"No .yar or .yara files found in directory: {rules_path}"
                     )
 
-                self.rules = yara.compile(filepaths=filepaths)
+                self.rules = self._load_rules(
+                    yara, filepaths, lambda: yara.compile(filepaths=filepaths)
+                )
             else:
-                self.rules = yara.compile(filepath=str(rules_path))
+                self.rules = self._load_rules(
+                    yara,
+                    {"": str(rules_path)},
+                    lambda: yara.compile(filepath=str(rules_path)),
+                )
         except yara.Error as e:
             logger.error(f"Failed to compile YARA rules: {e}")
             raise
 
+    def _load_rules(self, yara, filepaths: Dict[str, str], compile_rules):
+        """
+        Loads compiled rules from the cache, compiling and saving on a miss.
+
+        The cache key covers the namespaces, the rule sources and the yara
+        version, since compiled rules are tied to the libyara that wrote them.
+        """
+        digest = _rules_digest(filepaths, getattr(yara, "__version__", ""))
+        if digest is None:
+            return compile_rules()
+
+        cache_file = get_yara_cache_dir() / f"{digest}.yarc"
+        if os.path.isfile(cache_file):
+            try:
+                return yara.load(filepath=str(cache_file))
+            except yara.Error as e:
+                logger.debug(f"Ignoring unreadable compiled rules {cache_file}: {e}")
+
+        rules = compile_rules()
+
+        tmp_file = cache_file.with_suffix(".tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            rules.save(str(tmp_file))
+            os.replace(tmp_file, cache_file)
+        except (OSError, yara.Error) as e:
+            logger.debug(f"Could not cache compiled rules at {cache_file}: {e}")
+
+        return rules
+
     def scan_content(self, content: bytes, filename: str = "") -> List[Dict[str, Any]]:
-        """Scan bytes content against compiled rules."""
+        """
+        Scan bytes content (or a bytes-like buffer) against compiled rules.
+
+        Scan errors are raised rather than reported as no match.
+        """
         matches = []
         try:
             yara_matches = self.rules.match(data=content)
@@ -66,6 +116,7 @@ class YaraScanner:
                 )
         except Exception as e:
             logger.error(f"Error scanning content for {filename}: {e}")
+            raise
 
         return matches
 
@@ -126,46 +177,13 @@ class YaraScanner:
                     raise
 
             with zf:
-                for info in zf.infolist():
-                    if info.is_dir():
-                        continue
-
-                    # Memory optimization: For large files (>10MB), extract to temp file
-                    # instead of reading into memory.
-                    if info.file_size > 10 * 1024 * 1024:  # 10MB
-                        tmp_name = None
-                        try:
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                                tmp_name = tmp.name
-                                # Stream copy from zip to temp file
-                                with zf.open(info.filename) as source:
-                                    while True:
-                                        chunk = source.read(8192)
-                                        if not chunk:
-                                            break
-                                        tmp.write(chunk)
-
-                            # Scan file on disk (file is closed now)
-                            matches = self.scan_file(Path(tmp_name))
-                            # Fix filename in matches
-                            for m in matches:
-                                m["filename"] = info.filename
-
-                            if matches:
-                                results[info.filename] = matches
-                        finally:
-                            if tmp_name and os.path.exists(tmp_name):
-                                try:
-                                    os.unlink(tmp_name)
-                                except OSError:
-                                    pass
-                    else:
-                        # Read file content
-                        content = zf.read(info.filename)
-
-                        # Scan content
-                        matches = self.scan_content(content, filename=info.filename)
+                infos = [info for info in zf.infolist() if not info.is_dir()]
 
+                # yara-python releases the GIL while matching, so entries are
+                # inflated and scanned concurrently
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    scanned = executor.map(lambda i: self._scan_entry(zf, i), infos)
+                    for info, matches in zip(infos, scanned):
                         if matches:
                             results[info.filename] = matches
 
@@ -177,3 +195,41 @@ class YaraScanner:
                 f.close()
 
         return results
+
+    def _scan_entry(self, zf: ZipFile, info) -> List[Dict[str, Any]]:
+        # Memory optimization: Large entries are inflated into an anonymous
+        # memory map instead of a bytes object or a temp file on disk
+        if info.file_size > LARGE_ENTRY_SIZE:
+            with zf.open(info.filename) as source:
+                with mmap.mmap(-1, info.file_size) as buf:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        buf.write(chunk)
+                    return self.scan_content(buf, filename=info.filename)
+
+        # Read file content
+        content = zf.read(info.filename)
+        return self.scan_content(content, filename=info.filename)
+
+
+def get_yara_cache_dir() -> Path:
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "fext" / "yara"
+    return Path.home() / ".cache" / "fext" / "yara"
+
+
+def _rules_digest(filepaths: Dict[str, str], version: str) -> Optional[str]:
+    """Hashes rule sources with their namespaces; None if any is unreadable."""
+    sha = hashlib.sha256(str(version).encode("utf-8"))
+    try:
+        for namespace in sorted(filepaths):
+            sha.update(namespace.encode("utf-8") + b"\0")
+            with open(filepaths[namespace], "rb") as f:
+                sha.update(f.read())
+            sha.update(b"\0")
+    except OSError:
+        return None
+    return sha.hexdigest()
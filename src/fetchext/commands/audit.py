@@ -57,6 +57,11 @@ def register(subparsers):
     complexity_parser.add_argument(
         "--json", action="store_true", help="Output results as JSON"
     )
+    complexity_parser.add_argument(
+        "--include-minified",
+        action="store_true",
+        help="Analyze minified files instead of skipping them",
+    )
 
     # Entropy
     entropy_parser = analyze_subparsers.add_parser("entropy", help="Calculate entropy")
@@ -280,7 +285,11 @@ def handle_analyze(args, show_progress=True):
         from fetchext.analysis .complexity import analyze_complexity
         from rich.table import Table
 
-        results = analyze_complexity(Path(args.file), show_progress=show_progress)
+        results = analyze_complexity(
+            Path(args.file),
+            show_progress=show_progress,
+            include_minified=args.include_minified,
+        )
 
         if args.json:
             console.print_json(data=results)
@@ -289,6 +298,11 @@ def handle_analyze(args, show_progress=True):
             console.print(f"Average Complexity: {results['average_complexity']:.2f}")
             console.print(f"Max Complexity: {results['max_complexity']}")
             console.print(f"Total Functions: {results['total_functions']}")
+            if results.get("skipped_files"):
+                console.print(
+                    f"Skipped Files: {len(results['skipped_files'])} "
+                    "(minified or vendor, see --json)"
+                )
 
             if results["high_complexity_functions"]:
                 console.print("\n[bold red]High Complexity Functions (>15):[/bold red]")
@@ -370,6 +384,14 @@ def handle_analyze(args, show_progress=True):
             else:
                 console.print("  [yellow]No domains found.[/yellow]")
 
+            groups = results.get("groups", {})
+            if groups:
+                console.print(
+                    f"\n[bold cyan]Registrable Domains ({len(groups)}):[/bold cyan]"
+                )
+                for registrable, members in groups.items():
+                    console.print(f"  - {registrable} ({len(members)})")
+
             console.print(f"\n[bold cyan]URLs ({len(results['urls'])}):[/bold cyan]")
             if results["urls"]:
                 # Show top 50 URLs to avoid spamming
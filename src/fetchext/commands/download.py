@@ -72,6 +72,11 @@ def register(subparsers):
         default=default_workers,
         help=f"Number of parallel workers (default: {default_workers})",
     )
+    batch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip items recorded as done by a previous run",
+    )
     batch_parser.set_defaults(func=handle_batch)
 
 
@@ -89,5 +94,9 @@ def handle_download(args, show_progress=True):
 
 def handle_batch(args, show_progress=True):
     core.batch_download(
-        args.file, args.output_dir, workers=args.workers, show_progress=show_progress
+        args.file,
+        args.output_dir,
+        workers=args.workers,
+        show_progress=show_progress,
+        resume=args.resume,
     )
@@ -1,6 +1,6 @@
 from pathlib import Path
 from fetchext.interface.console  import console
-from fetchext.analysis .grep import search_directory
+from fetchext.analysis .grep import iter_search_directory
 from fetchext.data.config  import load_config
 
 
@@ -18,6 +18,26 @@ def register(subparsers):
     grep_parser.add_argument(
         "-i", "--ignore-case", action="store_true", help="Ignore case"
     )
+    grep_parser.add_argument(
+        "-m",
+        "--max-count",
+        type=int,
+        default=None,
+        help="Stop searching a file after this many matching lines",
+    )
+    grep_parser.add_argument(
+        "-l",
+        "--files-with-matches",
+        action="store_true",
+        help="Only list files containing a match",
+    )
+    grep_parser.add_argument(
+        "-C",
+        "--context",
+        type=int,
+        default=0,
+        help="Show this many lines of context around each match",
+    )
     grep_parser.add_argument(
         "--json", action="store_true", help="Output results as JSON"
     )
@@ -37,7 +57,26 @@ def handle_grep(args, show_progress=True):
     if show_progress:
         console.print(f"Searching for '{args.pattern}' in {directory}...")
 
-    results = search_directory(directory, args.pattern, args.ignore_case)
+    matches = iter_search_directory(
+        directory,
+        args.pattern,
+        args.ignore_case,
+        max_count=args.max_count,
+        files_with_matches=args.files_with_matches,
+        context=args.context,
+    )
+
+    if args.files_with_matches and not args.json:
+        # Print files as they are found instead of waiting for the full walk
+        found = False
+        for match in matches:
+            console.print(match["file"], markup=False, highlight=False)
+            found = True
+        if not found:
+            console.print("[yellow]No matches found.[/yellow]")
+        return
+
+    results = list(matches)
 
     if args.json:
         console.print_json(data=results)
@@ -47,6 +86,7 @@ def handle_grep(args, show_progress=True):
             return
 
         from rich.table import Table
+        from rich.markup import escape
 
         table = Table(show_header=True, header_style="bold magenta")
         table.add_column("File")
@@ -57,7 +97,12 @@ def handle_grep(args, show_progress=True):
         # Let's list for now, maybe limit output
 
         for match in results[:100]:  # Limit to 100 matches to avoid spam
-            table.add_row(match["file"], str(match["line"]), match["content"])
+            content = escape(match["content"])
+            if args.context:
+                before = [f"[dim]{escape(line)}[/dim]" for line in match["before"]]
+                after = [f"[dim]{escape(line)}[/dim]" for line in match["after"]]
+                content = "\n".join(before + [content] + after)
+            table.add_row(match["file"], str(match["line"]), content)
 
         console.print(table)
 
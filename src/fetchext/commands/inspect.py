@@ -24,8 +24,12 @@ def register(subparsers):
 
     # Diff subcommand
     diff_parser = subparsers.add_parser("diff", help="Compare two extension versions")
-    diff_parser.add_argument("old_file", help="Path to the old .crx or .xpi file")
-    diff_parser.add_argument("new_file", help="Path to the new .crx or .xpi file")
+    diff_parser.add_argument(
+        "old_file", nargs="?", help="Path to the old .crx or .xpi file"
+    )
+    diff_parser.add_argument(
+        "new_file", nargs="?", help="Path to the new .crx or .xpi file"
+    )
     diff_parser.add_argument(
         "--json", action="store_true", help="Output results as JSON"
     )
@@ -48,6 +52,20 @@ def register(subparsers):
         type=Path,
         help="Output path for the visual report (default: diff_report.html)",
     )
+    diff_parser.add_argument(
+        "-U",
+        "--context",
+        type=int,
+        default=3,
+        help="Lines of context around changes in the visual report (default: 3)",
+    )
+    diff_parser.add_argument(
+        "--timeline",
+        nargs="+",
+        metavar="FILE",
+        help="Show when files and manifest keys changed across versions "
+        "(oldest first)",
+    )
     diff_parser.set_defaults(func=handle_diff)
 
     # Verify subcommand
@@ -78,6 +96,16 @@ def handle_preview(args, show_progress=True):
 
 
 def handle_diff(args, show_progress=True):
+    if args.timeline:
+        # Positional files, if any, come first in the timeline
+        files = [f for f in (args.old_file, args.new_file) if f] + args.timeline
+        core.diff_timeline(files, json_output=args.json)
+        return
+
+    if not (args.old_file and args.new_file):
+        console.print_error("diff requires an old and a new file, or --timeline")
+        sys.exit(1)
+
     core.diff_extensions(
         args.old_file,
         args.new_file,
@@ -86,6 +114,7 @@ def handle_diff(args, show_progress=True):
         ast_diff=args.ast,
         visual=args.visual,
         output_path=args.output,
+        context=args.context,
     )
 
 
@@ -1,9 +1,15 @@
 import sys
 import csv
+import json
+from itertools import islice
 from fetchext.data.history  import HistoryManager
 from fetchext.interface.console  import console
 from rich.table import Table
 
+# Rows rendered per Rich table, so the first page appears without waiting
+# for the whole result set.
+TABLE_PAGE_SIZE = 500
+
 
 def register(subparsers):
     parser = subparsers.add_parser(
@@ -11,43 +17,99 @@ def register(subparsers):
     )
     parser.add_argument("sql", help="SQL query to execute")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument(
+        "--jsonl", action="store_true", help="Output as JSON Lines (one row per line)"
+    )
     parser.add_argument("--csv", action="store_true", help="Output as CSV")
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Maximum number of rows to return"
+    )
+    parser.add_argument(
+        "--offset", type=int, default=0, help="Number of rows to skip (default: 0)"
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="Open the database read-write to allow modifying statements",
+    )
     parser.set_defaults(func=handle_query)
 
 
 def handle_query(args, show_progress=True):
     history = HistoryManager()
     try:
-        results = history.execute_query(args.sql)
-
-        if not results:
-            if not args.json and not args.csv:
-                console.print("No results or query executed successfully.")
-            return
+        columns, rows = history.stream_query(
+            args.sql, limit=args.limit, offset=args.offset, read_only=not args.write
+        )
 
         if args.json:
-            console.print_json(data=results)
+            _write_json(columns, rows)
+        elif args.jsonl:
+            _write_jsonl(columns, rows)
         elif args.csv:
-            writer = csv.writer(sys.stdout)
-            if results:
-                header = results[0].keys()
-                writer.writerow(header)
-                for row in results:
-                    writer.writerow(row.values())
+            _write_csv(columns, rows)
         else:
-            # Rich Table
-            table = Table(show_header=True, header_style="bold magenta")
-            if results:
-                columns = results[0].keys()
-                for col in columns:
-                    table.add_column(col)
-
-                for row in results:
-                    table.add_row(*[str(v) for v in row.values()])
-
-            console.print(table)
-            console.print(f"\n[dim]{len(results)} rows returned[/dim]")
+            _print_tables(columns, rows)
 
     except Exception as e:
         console.print_error(f"Query failed: {e}")
         sys.exit(1)
+
+
+def _write_json(columns, rows):
+    # Stream a JSON array row by row instead of building it in memory
+    out = sys.stdout
+    out.write("[")
+    count = 0
+    for row in rows:
+        out.write(",\n  " if count else "\n  ")
+        out.write(json.dumps(dict(zip(columns, row)), default=str))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    out.flush()
+
+
+def _write_jsonl(columns, rows):
+    out = sys.stdout
+    for row in rows:
+        out.write(json.dumps(dict(zip(columns, row)), default=str))
+        out.write("\n")
+    out.flush()
+
+
+def _write_csv(columns, rows):
+    if not columns:
+        return
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    sys.stdout.flush()
+
+
+def _print_tables(columns, rows):
+    if not columns:
+        console.print("No results or query executed successfully.")
+        return
+
+    total = 0
+    while True:
+        page = list(islice(rows, TABLE_PAGE_SIZE))
+        if not page:
+            break
+
+        # Rich Table
+        table = Table(show_header=True, header_style="bold magenta")
+        for col in columns:
+            table.add_column(col)
+
+        for row in page:
+            table.add_row(*[str(v) for v in row])
+
+        console.print(table)
+        total += len(page)
+
+    if not total:
+        console.print("No results or query executed successfully.")
+        return
+
+    console.print(f"\n[dim]{total} rows returned[/dim]")
@@ -17,12 +17,53 @@ def register(subparsers):
         "--dir", type=Path, help="Local directory to sync to (overrides config)"
     )
 
+    # Fingerprint command
+    fingerprint_parser = rules_subparsers.add_parser(
+        "fingerprint",
+        help="Add known library files to the local fingerprint database",
+    )
+    fingerprint_parser.add_argument(
+        "files", nargs="+", type=Path, help="Unmodified library files to fingerprint"
+    )
+    fingerprint_parser.add_argument("--name", required=True, help="Library name")
+    fingerprint_parser.add_argument("--version", required=True, help="Library version")
+    fingerprint_parser.add_argument(
+        "--advisory",
+        action="append",
+        default=[],
+        help="Known advisory for this version (repeatable)",
+    )
+
     parser.set_defaults(func=handle_rules)
 
 
 def handle_rules(args, show_progress=True):
     if args.rules_command == "sync":
         handle_sync(args)
+    elif args.rules_command == "fingerprint":
+        handle_fingerprint(args)
+
+
+def handle_fingerprint(args):
+    from fetchext.security.fingerprints import add_fingerprints
+    from fetchext.utils import compute_file_hash
+
+    entries = {}
+    for file_path in args.files:
+        if not file_path.is_file():
+            console.print(f"[red]File not found: {file_path}[/red]")
+            raise SystemExit(ExitCode.IO)
+
+        entry = {"name": args.name, "version": args.version, "file": file_path.name}
+        if args.advisory:
+            entry["advisories"] = args.advisory
+        entries[compute_file_hash(file_path)] = entry
+
+    path = add_fingerprints(entries)
+    console.print(
+        f"[green]Added {len(entries)} fingerprint(s) for {args.name} "
+        f"{args.version} to {path}[/green]"
+    )
 
 
 def handle_sync(args):
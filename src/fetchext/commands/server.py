@@ -67,6 +67,12 @@ def register(subparsers):
         default=default_workers,
         help=f"Number of parallel workers (default: {default_workers})",
     )
+    mirror_parser.add_argument(
+        "--max-age",
+        type=int,
+        default=0,
+        help="Skip extensions checked within the last N seconds (default: 0)",
+    )
     mirror_parser.set_defaults(func=handle_mirror)
 
 
@@ -92,4 +98,5 @@ def handle_mirror(args, show_progress=True):
         prune=args.prune,
         workers=args.workers,
         show_progress=show_progress,
+        max_age=args.max_age,
     )
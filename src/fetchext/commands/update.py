@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from fetchext.interface.console  import console
@@ -19,6 +20,12 @@ def register(subparsers):
     parser.add_argument(
         "--dry-run", action="store_true", help="Check for updates without downloading"
     )
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=0,
+        help="Skip extensions checked within the last N seconds (default: 0)",
+    )
     parser.set_defaults(func=handle_update)
 
 
@@ -30,26 +37,21 @@ def handle_update(args, show_progress=True):
         raise SystemExit(ExitCode.USAGE)
 
     history = HistoryManager()
-    entries = history.get_entries()
-
-    # Deduplicate by ID and Browser
-    unique_extensions = {}
-    for entry in entries:
-        # Use .get() for safe access
-        action = entry.get("action")
-        ext_id = entry.get("id")
-        browser = entry.get("browser")
-
-        if action == "download" and ext_id and browser:
-            key = (browser, ext_id)
-            # Keep the most recent entry for version comparison
-            if key not in unique_extensions:
-                unique_extensions[key] = entry
-            else:
-                # If current entry is newer (higher timestamp), replace
-                # Assuming entries are sorted or we trust the order.
-                # HistoryManager appends, so last is newest.
-                unique_extensions[key] = entry
+
+    # One indexed query against the tracked registry, optionally skipping
+    # extensions that were checked recently
+    checked_before = None
+    if args.max_age:
+        checked_before = (
+            datetime.now(timezone.utc) - timedelta(seconds=args.max_age)
+        ).isoformat()
+    tracked = history.get_tracked_extensions(checked_before=checked_before)
+
+    unique_extensions = {
+        (entry["browser"], entry["id"]): entry
+        for entry in tracked
+        if entry.get("id") and entry.get("browser")
+    }
 
     if not unique_extensions:
         console.print("[yellow]No download history found.[/yellow]")
@@ -64,6 +66,7 @@ def handle_update(args, show_progress=True):
     download_dir = Path(config.get("general", {}).get("download_dir", "."))
 
     updates_found = []
+    checked = []
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_ext = {
@@ -79,6 +82,7 @@ def handle_update(args, show_progress=True):
             browser, ext_id, entry = future_to_ext[future]
             try:
                 latest_version = future.result()
+                checked.append((browser, ext_id))
                 current_version = entry.get("version")
                 if latest_version and latest_version != current_version:
                     updates_found.append(
@@ -87,14 +91,15 @@ def handle_update(args, show_progress=True):
                             "id": ext_id,
                             "old_version": current_version,
                             "new_version": latest_version,
-                            "source": entry.get(
-                                "source"
-                            ),  # Note: 'source' might not be in history entry based on history.py
+                            "source": entry.get("source"),
                         }
                     )
             except Exception as e:
                 logger.warning(f"Failed to check update for {ext_id} ({browser}): {e}")
 
+    if checked:
+        history.mark_checked(checked)
+
     if not updates_found:
         console.print("[green]All extensions are up to date.[/green]")
         return
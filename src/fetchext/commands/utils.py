@@ -37,6 +37,14 @@ def register(subparsers):
     optimize_parser.add_argument(
         "--json", action="store_true", help="Output results as JSON"
     )
+    optimize_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate savings from a sample of each image without modifying files",
+    )
+    optimize_parser.add_argument(
+        "-w", "--workers", type=int, help="Number of worker processes"
+    )
     optimize_parser.set_defaults(func=handle_optimize)
 
     # Clean subcommand
@@ -77,6 +85,14 @@ def register(subparsers):
         "--to", choices=["zip"], default="zip", help="Target format (default: zip)"
     )
     convert_parser.add_argument("-o", "--output", type=Path, help="Output file path")
+    convert_parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Convert every CRX in the input directory (-o is then a directory)",
+    )
+    convert_parser.add_argument(
+        "-w", "--workers", type=int, help="Number of parallel workers"
+    )
     convert_parser.set_defaults(func=handle_convert)
 
 
@@ -97,14 +113,22 @@ def handle_optimize(args, show_progress=True):
     from fetchext.interface.console  import console
     import json
 
-    results = optimize_extension(args.directory, quality=args.quality)
+    results = optimize_extension(
+        args.directory,
+        quality=args.quality,
+        dry_run=args.dry_run,
+        workers=args.workers,
+    )
 
     if args.json:
         print(json.dumps(results, indent=2))
     else:
-        console.print(f"[bold]Optimization Results for {args.directory}[/bold]")
+        title = "Estimated Savings" if args.dry_run else "Optimization Results"
+        console.print(f"[bold]{title} for {args.directory}[/bold]")
         console.print(f"Total Files: {results['total_files']}")
         console.print(f"Optimized Files: {results['optimized_files']}")
+        if not args.dry_run:
+            console.print(f"Cached Files: {results['cached_files']}")
         console.print(f"Original Size: {results['original_size'] / 1024:.2f} KB")
         console.print(f"New Size: {results['new_size'] / 1024:.2f} KB")
         console.print(
@@ -161,4 +185,10 @@ def handle_schema(args, show_progress=True):
 def handle_convert(args, show_progress=True):
     from fetchext.core.core  import convert_extension
 
-    convert_extension(args.input, args.output, to_format=args.to)
+    convert_extension(
+        args.input,
+        args.output,
+        to_format=args.to,
+        batch=args.batch,
+        workers=args.workers,
+    )
@@ -1,7 +1,13 @@
 from fetchext.workflow.watcher  import DirectoryWatcher
+from fetchext.data.config  import load_config
 
 
 def register(subparsers):
+    config = load_config()
+    watch_config = config.get("watch", {})
+    default_workers = watch_config.get("workers", 2)
+    default_settle = watch_config.get("settle", 1.0)
+
     parser = subparsers.add_parser(
         "watch", help="Monitor a directory for new extensions."
     )
@@ -15,6 +21,22 @@ def register(subparsers):
     parser.add_argument(
         "--scan", action="store_true", help="Automatically scan for vulnerabilities."
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=default_workers,
+        help=f"Number of files processed in parallel (default: {default_workers})",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=default_settle,
+        help=(
+            "Seconds a file must stay unchanged before it is processed when no "
+            f"close-write event is seen (default: {default_settle})"
+        ),
+    )
     parser.set_defaults(func=handle_watch)
 
 
@@ -30,5 +52,7 @@ def handle_watch(args, show_progress=True):
     if args.scan:
         actions.append("scan")
 
-    watcher = DirectoryWatcher(args.directory, actions=actions)
+    watcher = DirectoryWatcher(
+        args.directory, actions=actions, workers=args.workers, settle=args.settle
+    )
     watcher.start()
@@ -7,6 +7,7 @@ from .core import (
     preview_extension,
     audit_extension,
     diff_extensions,
+    diff_timeline,
     analyze_risk,
     verify_signature,
     extract_extension,
@@ -43,6 +44,7 @@ __all__ = [
     "preview_extension",
     "audit_extension",
     "diff_extensions",
+    "diff_timeline",
     "analyze_risk",
     "verify_signature",
     "extract_extension",
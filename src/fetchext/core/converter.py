@@ -1,11 +1,36 @@
+import os
+import time
+import zlib
+import struct
 import logging
 import shutil
 import zipfile
+import concurrent.futures
+from collections import deque
 from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
 from fetchext.core.crx  import CrxDecoder
+from fetchext.core.exceptions  import ExtensionError
 
 logger = logging.getLogger(__name__)
 
+# Below this a plain buffered copy is as fast as a kernel copy
+ZERO_COPY_MIN_SIZE = 64 * 1024
+
+# Files queued for compression per worker when packing a directory
+PARALLEL_WINDOW = 4
+
+# Bytes of file content held by queued compressions at once
+PARALLEL_WINDOW_BYTES = 64 * 1024 * 1024
+
+# Files above this size are deflated in chunks straight into the archive
+STREAM_MIN_SIZE = 16 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Beyond these limits the archive needs ZIP64; left to zipfile
+ZIP_MAX_SIZE = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
 
 class FormatConverter:
     """
@@ -13,7 +38,7 @@ class FormatConverter:
     """
 
     @staticmethod
-    def convert_to_zip(input_path: Path, output_path: Path = None):
+    def convert_to_zip(input_path: Path, output_path: Path = None, workers=None):
         """
         Convert a CRX file or Directory to a ZIP file.
         """
@@ -27,7 +52,7 @@ class FormatConverter:
             output_path = input_path.with_suffix(".zip")
 
         if input_path.is_dir():
-            FormatConverter._dir_to_zip(input_path, output_path)
+            FormatConverter._dir_to_zip(input_path, output_path, workers)
         elif input_path.is_file():
             FormatConverter._crx_to_zip(input_path, output_path)
         else:
@@ -35,6 +60,55 @@ class FormatConverter:
 
         return output_path
 
+    @staticmethod
+    def convert_directory(
+        input_dir: Path, output_dir: Path = None, workers=None
+    ) -> List[Path]:
+        """
+        Convert every CRX file in input_dir to a ZIP file in output_dir
+        (default: input_dir). Returns the paths written.
+
+        Every file is attempted; if any conversion fails, an ExtensionError
+        naming the failed files is raised once the batch has finished.
+        """
+        input_dir = Path(input_dir)
+        if not input_dir.is_dir():
+            raise FileNotFoundError(f"Directory not found: {input_dir}")
+
+        output_dir = Path(output_dir) if output_dir else input_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        crx_files = sorted(p for p in input_dir.glob("*.crx") if p.is_file())
+        logger.info(f"Converting {len(crx_files)} CRX files to {output_dir}...")
+
+        written = []
+        failed = []
+        # Copies are dominated by syscalls, which release the GIL
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    FormatConverter._crx_to_zip,
+                    crx_path,
+                    output_dir / crx_path.with_suffix(".zip").name,
+                ): crx_path
+                for crx_path in crx_files
+            }
+            for future in concurrent.futures.as_completed(futures):
+                crx_path = futures[future]
+                try:
+                    future.result()
+                    written.append(output_dir / crx_path.with_suffix(".zip").name)
+                except Exception as e:
+                    logger.error(f"Failed to convert {crx_path.name}: {e}")
+                    failed.append(crx_path.name)
+
+        if failed:
+            raise ExtensionError(
+                f"{len(failed)} of {len(crx_files)} conversions failed: "
+                f"{', '.join(sorted(failed))}"
+            )
+        return sorted(written)
+
     @staticmethod
     def _crx_to_zip(input_path: Path, output_path: Path):
         """
@@ -45,24 +119,292 @@ class FormatConverter:
         logger.info(f"Converting CRX to ZIP (Offset: {offset})...")
 
         with input_path.open("rb") as fin:
-            fin.seek(offset)
+            count = os.fstat(fin.fileno()).st_size - offset
             with output_path.open("wb") as fout:
-                shutil.copyfileobj(fin, fout)
+                _copy_range(fin, fout, offset, count)
 
         logger.info(f"Saved to {output_path}")
 
     @staticmethod
-    def _dir_to_zip(input_path: Path, output_path: Path):
+    def _dir_to_zip(input_path: Path, output_path: Path, workers=None):
         """
         Pack directory into ZIP.
+
+        Entries are deflated in parallel threads (zlib releases the GIL)
+        and written in order as they complete.
         """
         logger.info(f"Packing directory {input_path} to {output_path}...")
 
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            for file in input_path.rglob("*"):
-                if file.is_file():
-                    # Archive name should be relative to input_path
-                    arcname = file.relative_to(input_path)
-                    zf.write(file, arcname)
+        files = []
+        total_size = 0
+        for root, dirs, names in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(names):
+                path = Path(root) / name
+                if path.is_file():
+                    files.append(path)
+                    total_size += path.stat().st_size
+
+        if total_size >= ZIP_MAX_SIZE or len(files) >= ZIP_MAX_ENTRIES:
+            _write_zipfile(input_path, files, output_path)
+        else:
+            try:
+                with output_path.open("wb") as f:
+                    _write_parallel_zip(input_path, files, f, workers)
+            except zipfile.LargeZipFile as e:
+                # Headers, names or grown files pushed an offset past 4GB
+                logger.debug(f"Repacking with ZIP64: {e}")
+                _write_zipfile(input_path, files, output_path)
 
         logger.info(f"Saved to {output_path}")
+
+
+def _write_zipfile(base_dir: Path, files: List[Path], output_path: Path):
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for file in files:
+            # Archive name should be relative to base_dir
+            zf.write(file, file.relative_to(base_dir))
+
+
+def _copy_range(fin: BinaryIO, fout: BinaryIO, offset: int, count: int):
+    """
+    Copies count bytes from offset in fin to the current position of fout.
+
+    Uses copy_file_range (which reflinks on filesystems that support it) or
+    sendfile, so the data never passes through Python, and falls back to a
+    buffered copy where neither is available.
+    """
+    start = fout.tell()
+    copied = 0
+    if count >= ZERO_COPY_MIN_SIZE:
+        fout.flush()
+        out_fd = fout.fileno()
+        for copy in (_copy_file_range, _sendfile):
+            try:
+                copy(fin.fileno(), out_fd, offset + copied, count - copied)
+            except (OSError, AttributeError) as e:
+                logger.debug(f"{copy.__name__} unavailable: {e}")
+            # Both advance the output position; resume from wherever they stopped
+            copied = os.lseek(out_fd, 0, os.SEEK_CUR) - start
+            if copied >= count:
+                fout.seek(start + copied)
+                return
+        fout.seek(start + copied)
+
+    fin.seek(offset + copied)
+    shutil.copyfileobj(fin, fout)
+
+
+def _copy_file_range(in_fd: int, out_fd: int, offset: int, count: int):
+    copied = 0
+    while copied < count:
+        n = os.copy_file_range(in_fd, out_fd, count - copied, offset + copied)
+        if n == 0:
+            break
+        copied += n
+
+
+def _sendfile(in_fd: int, out_fd: int, offset: int, count: int):
+    copied = 0
+    while copied < count:
+        n = os.sendfile(out_fd, in_fd, offset + copied, count - copied)
+        if n == 0:
+            break
+        copied += n
+
+
+def _deflate_file(path: Path) -> Tuple[int, int, int, bytes]:
+    """Returns (method, crc, size, data) for a file; runs in a worker thread."""
+    data = path.read_bytes()
+    crc = zlib.crc32(data)
+    if data:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data):
+            return zipfile.ZIP_DEFLATED, crc, len(data), compressed
+    return zipfile.ZIP_STORED, crc, len(data), data
+
+
+def _deflate_stream(path: Path, f: BinaryIO) -> Tuple[int, int, int]:
+    """Deflates a file into f chunk by chunk; returns (crc, size, csize)."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    crc = size = csize = 0
+    with path.open("rb") as src:
+        while True:
+            chunk = src.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data = compressor.compress(chunk)
+            f.write(data)
+            csize += len(data)
+    data = compressor.flush()
+    f.write(data)
+    return crc, size, csize + len(data)
+
+
+def _check_zip32(value: int, what: str):
+    if value > ZIP_MAX_SIZE:
+        raise zipfile.LargeZipFile(f"{what} exceeds the ZIP limit: {value}")
+
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    # DOS timestamps start in 1980, as in zipfile with strict_timestamps=False
+    year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    return dos_time, dos_date
+
+
+def _write_parallel_zip(
+    base_dir: Path, files: List[Path], f: BinaryIO, workers: Optional[int] = None
+):
+    """
+    Writes files as a ZIP archive (without ZIP64) to f, which must be
+    seekable.
+
+    Compression runs on a thread pool with a window bounded by file count
+    and by bytes in flight; entries are written in the order given. Files
+    above STREAM_MIN_SIZE are deflated in chunks on the writing thread.
+    Raises zipfile.LargeZipFile if an offset or size needs ZIP64.
+    """
+    workers = workers or os.cpu_count() or 4
+    central = []
+    offset = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        queue = deque()
+        pending = deque(files)
+        in_flight = 0
+
+        def fill():
+            nonlocal in_flight
+            while pending and len(queue) < workers * PARALLEL_WINDOW:
+                path = pending[0]
+                st = path.stat()
+                if st.st_size > STREAM_MIN_SIZE:
+                    # Streamed when its turn comes, never held in memory
+                    queue.append((path, st, None))
+                elif in_flight and in_flight + st.st_size > PARALLEL_WINDOW_BYTES:
+                    return
+                else:
+                    queue.append((path, st, executor.submit(_deflate_file, path)))
+                    in_flight += st.st_size
+                pending.popleft()
+
+        fill()
+        while queue:
+            path, st, future = queue.popleft()
+            if future is not None:
+                method, crc, size, data = future.result()
+                in_flight -= st.st_size
+            fill()
+
+            _check_zip32(offset, "Local header offset")
+            name = path.relative_to(base_dir).as_posix()
+            try:
+                name_bytes = name.encode("ascii")
+                flags = 0
+            except UnicodeEncodeError:
+                name_bytes = name.encode("utf-8")
+                flags = 0x800
+            dos_time, dos_date = _dos_datetime(st.st_mtime)
+
+            entry = {
+                "flags": flags,
+                "method": zipfile.ZIP_DEFLATED,
+                "time": dos_time,
+                "date": dos_date,
+                "crc": 0,
+                "csize": 0,
+                "size": 0,
+                "name": name_bytes,
+                "mode": st.st_mode & 0xFFFF,
+                "offset": offset,
+            }
+            if future is None:
+                header_pos = f.tell()
+                f.write(_local_header(entry))
+                f.write(name_bytes)
+                crc, size, csize = _deflate_stream(path, f)
+                _check_zip32(size, f"Size of {name}")
+                _check_zip32(csize, f"Compressed size of {name}")
+                entry.update(crc=crc, csize=csize, size=size)
+                # Fill in the header now that the sizes are known
+                end = f.tell()
+                f.seek(header_pos)
+                f.write(_local_header(entry))
+                f.seek(end)
+            else:
+                entry.update(method=method, crc=crc, csize=len(data), size=size)
+                f.write(_local_header(entry))
+                f.write(name_bytes)
+                f.write(data)
+            offset += 30 + len(name_bytes) + entry["csize"]
+            central.append(entry)
+
+    _check_zip32(offset, "Central directory offset")
+    cd_offset = offset
+    cd_size = 0
+    for entry in central:
+        record = _central_header(entry) + entry["name"]
+        f.write(record)
+        cd_size += len(record)
+    _check_zip32(cd_offset + cd_size, "Archive size")
+
+    f.write(
+        struct.pack(
+            "<IHHHHIIH",
+            0x06054B50,
+            0,
+            0,
+            len(central),
+            len(central),
+            cd_size,
+            cd_offset,
+            0,
+        )
+    )
+
+
+def _local_header(entry: Dict) -> bytes:
+    return struct.pack(
+        "<IHHHHHIIIHH",
+        0x04034B50,
+        20,
+        entry["flags"],
+        entry["method"],
+        entry["time"],
+        entry["date"],
+        entry["crc"],
+        entry["csize"],
+        entry["size"],
+        len(entry["name"]),
+        0,
+    )
+
+
+def _central_header(entry: Dict) -> bytes:
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII",
+        0x02014B50,
+        (3 << 8) | 20,  # Made by Unix, ZIP 2.0
+        20,
+        entry["flags"],
+        entry["method"],
+        entry["time"],
+        entry["date"],
+        entry["crc"],
+        entry["csize"],
+        entry["size"],
+        len(entry["name"]),
+        0,
+        0,
+        0,
+        0,
+        entry["mode"] << 16,
+        entry["offset"],
+    )
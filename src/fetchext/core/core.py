@@ -2,15 +2,16 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime, timezone
+from rich.markup import escape
 from fetchext.downloaders  import ChromeDownloader, EdgeDownloader, FirefoxDownloader
 from fetchext.security.inspector  import ExtensionInspector
 from fetchext.workflow.batch  import BatchProcessor
-from fetchext.utils  import open_extension_archive, verify_file_hash, check_disk_space
+from fetchext.utils  import open_extension_archive, verify_file_hash, compute_file_hash, check_disk_space
 from fetchext.interface.console  import console, print_manifest_table, print_search_results_table
 from fetchext.interface.theme  import Theme
 from fetchext.workflow.preview  import build_file_tree
 from fetchext.security.auditor  import ExtensionAuditor
-from fetchext.workflow.diff  import ExtensionDiffer
+from fetchext.workflow.diff  import ExtensionDiffer, TimelineEvent
 from fetchext.security.risk  import RiskAnalyzer
 from fetchext.core.verifier  import CrxVerifier, XpiVerifier
 from fetchext.plugins.hooks  import HookManager, HookContext
@@ -146,6 +147,23 @@ def download_extension(
             status="success",
             path=str(output_path),
         )
+
+        # Keep the tracked extensions registry current for update/mirror
+        if not version:
+            version = ExtensionInspector().get_manifest(output_path).get("version")
+        validators = getattr(downloader.client, "last_validators", None)
+        if not isinstance(validators, dict):
+            validators = {}
+        history.track_extension(
+            extension_id=extension_id,
+            browser=browser,
+            version=version,
+            sha256=compute_file_hash(output_path),
+            etag=validators.get("etag"),
+            last_modified=validators.get("last_modified"),
+            source_url=url,
+            path=str(output_path),
+        )
     except Exception as e:
         logger.warning(f"Failed to update history: {e}")
 
@@ -458,6 +476,7 @@ def diff_extensions(
     ast_diff=False,
     visual=False,
     output_path=None,
+    context=3,
 ):
     """
     Compare two extension archives.
@@ -482,7 +501,7 @@ def diff_extensions(
             if output_path is None:
                 output_path = Path("diff_report.html")
 
-            generator = VisualDiffGenerator()
+            generator = VisualDiffGenerator(context=context)
             generator.generate(report, old_path, new_path, output_path)
             console.print_success(f"Visual diff report generated at {output_path}")
             return report
@@ -542,6 +561,71 @@ def diff_extensions(
         raise
 
 
+def diff_timeline(paths, json_output=False):
+    """
+    Show when files and manifest keys changed across several versions.
+    """
+    paths = [Path(p) for p in paths]
+    if len(paths) < 2:
+        raise ExtensionError("A timeline needs at least two versions")
+    for path in paths:
+        if not path.exists():
+            raise ExtensionError(f"File not found: {path}")
+
+    try:
+        report = ExtensionDiffer().timeline(paths)
+    except Exception as e:
+        logger.error(f"Timeline failed: {e}")
+        raise
+
+    if json_output:
+        from dataclasses import asdict
+
+        console.print_json(data=asdict(report))
+        return report
+
+    console.print(f"[bold]Timeline of {len(report.versions)} versions[/bold]")
+    console.print(" -> ".join(escape(v) for v in report.versions))
+
+    # The version key changes every step and is already shown above
+    manifest = {k: v for k, v in report.manifest.items() if k != "version"}
+    if manifest:
+        console.print("\n[bold]Manifest Changes:[/bold]")
+        for key, events in manifest.items():
+            console.print(f"  [{Theme.COLOR_WARNING}]{escape(key)}[/]")
+            for event in events:
+                console.print(
+                    f"    {escape(event.version)}: "
+                    f"{escape(str(event.old))} -> {escape(str(event.new))}"
+                )
+
+    symbols = {
+        "added": f"[{Theme.COLOR_SUCCESS}]+",
+        "modified": f"[{Theme.COLOR_INFO}]~",
+        "removed": f"[{Theme.COLOR_ERROR}]-",
+    }
+    first = report.versions[0]
+    changed = {
+        name: events
+        for name, events in report.files.items()
+        if events != [TimelineEvent(first, "added")]
+    }
+    if changed:
+        console.print(f"\n[bold]File Changes ({len(changed)}):[/bold]")
+        for name, events in changed.items():
+            history = "  ".join(
+                f"{symbols[event.change]}{escape(event.version)}[/]"
+                for event in events
+            )
+            console.print(f"  {escape(name)}: {history}")
+
+    unchanged = len(report.files) - len(changed)
+    if unchanged:
+        console.print(f"\n{unchanged} files unchanged across all versions.")
+
+    return report
+
+
 def analyze_risk(file_path, json_output=False):
     """
     Analyze the privacy risk of an extension.
@@ -746,13 +830,17 @@ def extract_extension(file_path, output_dir=None, show_progress=True):
         raise ExtensionError(f"Extraction failed: {e}", original_exception=e)
 
 
-def batch_download(file_path, output_dir, workers=4, show_progress=True):
+def batch_download(file_path, output_dir, workers=4, show_progress=True, resume=False):
     """
     Process a batch file of extension URLs.
     """
     processor = BatchProcessor()
     processor.process(
-        file_path, output_dir, max_workers=workers, show_progress=show_progress
+        file_path,
+        output_dir,
+        max_workers=workers,
+        show_progress=show_progress,
+        resume=resume,
     )
     if show_progress:
         console.print_success("Batch processing finished successfully.")
@@ -848,9 +936,14 @@ def generate_report(file_path, output_path=None):
         raise ExtensionError(f"Report generation failed: {e}", original_exception=e)
 
 
-def convert_extension(input_path, output_path=None, to_format="zip"):
+def convert_extension(
+    input_path, output_path=None, to_format="zip", batch=False, workers=None
+):
     """
     Convert extension format.
+
+    With batch=True, input_path is a directory of CRX files and output_path
+    the directory the ZIP files are written to.
     """
     from fetchext.core.converter  import FormatConverter
 
@@ -860,7 +953,11 @@ def convert_extension(input_path, output_path=None, to_format="zip"):
         )
 
     try:
-        return FormatConverter.convert_to_zip(input_path, output_path)
+        if batch:
+            return FormatConverter.convert_directory(
+                input_path, output_path, workers=workers
+            )
+        return FormatConverter.convert_to_zip(input_path, output_path, workers=workers)
     except Exception as e:
         logger.error(f"Conversion failed: {e}")
         raise ExtensionError(f"Conversion failed: {e}", original_exception=e)
@@ -899,6 +996,7 @@ def generate_unified_report(file_path, yara_rules=None):
     from fetchext.analysis .entropy import analyze_entropy
     from fetchext.analysis .domains import analyze_domains
     from fetchext.security.secrets  import SecretScanner
+    from fetchext.security.scanner  import DependencyScanner
     from fetchext.analysis .yara import YaraScanner
     from dataclasses import asdict
     import hashlib
@@ -957,20 +1055,31 @@ def generate_unified_report(file_path, yara_rules=None):
     risk_report = risk_analyzer.analyze(file_path)
     report["risk_analysis"] = asdict(risk_report)
 
+    # Known libraries. Unmodified vendor files are skipped by the
+    # content analyzers below.
+    try:
+        dependency_report = DependencyScanner().scan(file_path)
+        report["libraries"] = [asdict(lib) for lib in dependency_report.libraries]
+        vendor_paths = dependency_report.vendor_paths
+    except Exception as e:
+        logger.debug(f"Dependency scan failed: {e}")
+        report["libraries"] = []
+        vendor_paths = set()
+
     # 4. Complexity
-    report["complexity"] = analyze_complexity(file_path)
+    report["complexity"] = analyze_complexity(file_path, skip_paths=vendor_paths)
 
     # 5. Entropy
     report["entropy"] = analyze_entropy(file_path)
 
     # 6. Domains
-    domain_report = analyze_domains(file_path)
+    domain_report = analyze_domains(file_path, skip_paths=vendor_paths)
     report["domains"] = domain_report["domains"]
     report["urls"] = domain_report["urls"]
 
     # 7. Secrets
     secret_scanner = SecretScanner()
-    secrets = secret_scanner.scan_extension(file_path)
+    secrets = secret_scanner.scan_extension(file_path, skip_paths=vendor_paths)
     report["secrets"] = [asdict(s) for s in secrets]
 
     # 8. YARA (Optional)
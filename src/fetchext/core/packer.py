@@ -1,10 +1,11 @@
+import os
 import struct
-import shutil
 import hashlib
 import logging
+import zipfile
 from pathlib import Path
-from typing import Optional
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from typing import BinaryIO, Optional
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, utils
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.backends import default_backend
 from fetchext.core.protobuf  import SimpleProtobuf
@@ -14,6 +15,8 @@ from fetchext.data.config  import get_config_path, load_config
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1024 * 1024
+
 
 class ExtensionPacker:
     """
@@ -106,22 +109,7 @@ class ExtensionPacker:
             else:
                 private_key = self.generate_key(key_path)
 
-        # 1. Create ZIP
-        zip_path = output_path.with_suffix(".zip.tmp")
-        try:
-            shutil.make_archive(str(zip_path.with_suffix("")), "zip", source_dir)
-            # make_archive adds .zip extension
-            real_zip_path = zip_path.with_suffix(".zip")
-            if real_zip_path.exists():
-                real_zip_path.rename(zip_path)
-
-            with open(zip_path, "rb") as f:
-                zip_data = f.read()
-        finally:
-            if zip_path.exists():
-                zip_path.unlink()
-
-        # 2. Prepare Public Key
+        # 1. Prepare Public Key
         public_key = private_key.public_key()
         pub_bytes = public_key.public_bytes(
             encoding=serialization.Encoding.DER,
@@ -137,44 +125,115 @@ class ExtensionPacker:
         trans_map = str.maketrans("0123456789abcdef", "abcdefghijklmnop")
         ctx.extension_id = hex_str.translate(trans_map)
 
-        # 3. Create SignedData
+        # 2. Create SignedData
         # Field 1: crx_id (16 bytes)
         signed_data = SimpleProtobuf.encode({1: [crx_id]})
 
-        # 4. Sign
-        # Signature = Sign( "CRX3 SignedData\x00" + len(signed_data) + signed_data + zip_data )
-        prefix = b"CRX3 SignedData\x00"
-        len_bytes = struct.pack("<I", len(signed_data))
+        # The signature length only depends on the key size, so the header
+        # length is known before signing and the ZIP can be written in place
+        placeholder = b"\0" * (private_key.key_size // 8)
+        header_len = len(self._build_header(pub_bytes, placeholder, signed_data))
+        zip_offset = 12 + header_len
+
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w+b") as f:
+                # 3. Write the ZIP after the space reserved for the header
+                f.seek(zip_offset)
+                self._write_zip(source_dir, f)
+
+                # 4. Sign
+                # Signature = Sign( "CRX3 SignedData\x00" + len(signed_data) + signed_data + zip_data )
+                hasher = hashes.Hash(hashes.SHA256())
+                hasher.update(b"CRX3 SignedData\x00")
+                hasher.update(struct.pack("<I", len(signed_data)))
+                hasher.update(signed_data)
+                f.seek(zip_offset)
+                while chunk := f.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+
+                signature = private_key.sign(
+                    hasher.finalize(),
+                    padding.PKCS1v15(),
+                    utils.Prehashed(hashes.SHA256()),
+                )
+                header = self._build_header(pub_bytes, signature, signed_data)
+                if len(header) != header_len:
+                    raise ExtensionError("Unexpected CRX header size")
+
+                # 5. Write CRX header in front of the ZIP
+                f.seek(0)
+                f.write(self.CRX_MAGIC)
+                f.write(struct.pack("<I", self.CRX_VERSION))
+                f.write(struct.pack("<I", header_len))
+                f.write(header)
+
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        logger.info(f"Packed extension to {output_path}")
 
-        data_to_sign = prefix + len_bytes + signed_data + zip_data
+        # Run post-pack hook
+        ctx.file_path = output_path
+        hook_manager.run_hook("post_pack", ctx)
 
-        signature = private_key.sign(data_to_sign, padding.PKCS1v15(), hashes.SHA256())
+        return output_path
 
-        # 5. Create AsymmetricKeyProof
+    @staticmethod
+    def _build_header(pub_bytes: bytes, signature: bytes, signed_data: bytes) -> bytes:
+        # AsymmetricKeyProof
         # Field 1: public_key
         # Field 2: signature
         proof = SimpleProtobuf.encode({1: [pub_bytes], 2: [signature]})
 
-        # 6. Create CrxFileHeader
+        # CrxFileHeader
         # Field 10000: sha256_with_rsa (repeated) -> [proof]
         # Field 10001: signed_header_data -> signed_data
-        header = SimpleProtobuf.encode({10000: [proof], 10001: [signed_data]})
+        return SimpleProtobuf.encode({10000: [proof], 10001: [signed_data]})
 
-        # 7. Write CRX
-        with open(output_path, "wb") as f:
-            f.write(self.CRX_MAGIC)
-            f.write(struct.pack("<I", self.CRX_VERSION))
-            f.write(struct.pack("<I", len(header)))
-            f.write(header)
-            f.write(zip_data)
+    @staticmethod
+    def _write_zip(source_dir: Path, f: BinaryIO):
+        """
+        Writes source_dir as a ZIP at the current position of f.
 
-        logger.info(f"Packed extension to {output_path}")
+        Files are compressed from disk in chunks. zipfile records offsets
+        from the start of the file it is given, so it writes through a view
+        that starts at the current position; the payload is then a valid
+        standalone ZIP behind the CRX header.
+        """
+        with zipfile.ZipFile(_OffsetFile(f), "w", zipfile.ZIP_DEFLATED) as zf:
+            for root, dirs, files in os.walk(source_dir):
+                dirs.sort()
+                for name in sorted(files):
+                    path = Path(root) / name
+                    zf.write(path, path.relative_to(source_dir).as_posix())
 
-        # Run post-pack hook
-        ctx.file_path = output_path
-        hook_manager.run_hook("post_pack", ctx)
 
-        return output_path
+class _OffsetFile:
+    """A seekable view of f whose position 0 is f's position at creation."""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._start = f.tell()
+
+    def tell(self) -> int:
+        return self._f.tell() - self._start
+
+    def seek(self, pos: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            pos += self._start
+        return self._f.seek(pos, whence) - self._start
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
 
 
 def pack_extension(source_dir, output_path=None, key_path=None):
@@ -1,4 +1,7 @@
+import copy
 import os
+import threading
+
 try:
     import tomllib
 except ImportError:
@@ -38,6 +41,15 @@ SCHEMA = {
         "github_token": (str, None),
         "public": (bool, False),
     },
+    "hooks": {
+        "background": (list, None),
+        "workers": (int, 2),
+        "timeout": ((int, float), 30.0),
+    },
+    "watch": {
+        "workers": (int, 2),
+        "settle": ((int, float), 1.0),
+    },
     "rules": {
         "repo_url": (str, "https://github.com/fetchext/community-rules.git"),
         "repo_dir": (str, None),
@@ -88,15 +100,54 @@ def get_config_path() -> Path:
     return base_dir / "fext" / "config.toml"
 
 
-def load_config() -> Dict[str, Any]:
+# Process-wide snapshot of the parsed config: ((path, mtime_ns, size), config)
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def load_config(reload: bool = False) -> Dict[str, Any]:
     """
     Loads the configuration from the config file.
     Returns a dictionary with the configuration.
+
+    The parsed and validated file is cached per process and only re-read when
+    its modification time or size changes, or when reload is True. Each caller
+    gets its own copy, so the cached snapshot is never mutated.
     """
+    global _snapshot
+
     config_path = get_config_path()
     if not config_path.exists():
         return {}
 
+    st = config_path.stat()
+    key = (config_path, st.st_mtime_ns, st.st_size)
+    with _snapshot_lock:
+        if reload or _snapshot is None or _snapshot[0] != key:
+            _snapshot = (key, _read_config(config_path))
+        config = _snapshot[1]
+
+    return copy.deepcopy(config)
+
+
+def reload_config() -> Dict[str, Any]:
+    """
+    Forces the config file to be re-read, e.g. in long-running modes.
+    """
+    return load_config(reload=True)
+
+
+def clear_config_cache() -> None:
+    """
+    Drops the cached config snapshot.
+    """
+    global _snapshot
+
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def _read_config(config_path: Path) -> Dict[str, Any]:
     try:
         with open(config_path, "rb") as f:
             config = tomllib.load(f)
@@ -121,6 +172,8 @@ def save_config(config: Dict[str, Any]) -> None:
     with open(config_path, "wb") as f:
         tomli_w.dump(config, f)
 
+    clear_config_cache()
+
 
 def get_config_value(config: Dict[str, Any], key_path: str) -> Any:
     """
@@ -3,7 +3,7 @@ import os
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 class HistoryManager:
@@ -31,6 +31,12 @@ class HistoryManager:
         conn.execute("PRAGMA foreign_keys=ON;")
         return conn
 
+    def _get_readonly_connection(self) -> sqlite3.Connection:
+        """Get a read-only SQLite connection for ad-hoc queries and exports."""
+        return sqlite3.connect(
+            f"{self.db_path.as_uri()}?mode=ro", uri=True, timeout=5.0
+        )
+
     def _init_db(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         with self._get_connection() as conn:
@@ -53,6 +59,47 @@ class HistoryManager:
                 "CREATE INDEX IF NOT EXISTS idx_ext_id ON history(extension_id)"
             )
 
+            # Registry of tracked extensions, one row per (browser, id).
+            # Maintained on download so update/mirror don't scan the history log.
+            tracked_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'tracked_extensions'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tracked_extensions (
+                    browser TEXT NOT NULL,
+                    extension_id TEXT NOT NULL,
+                    latest_version TEXT,
+                    sha256 TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    source_url TEXT,
+                    path TEXT,
+                    last_downloaded TEXT,
+                    last_checked TEXT,
+                    PRIMARY KEY (browser, extension_id)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tracked_last_checked "
+                "ON tracked_extensions(last_checked)"
+            )
+            if not tracked_exists:
+                self._backfill_tracked(conn)
+
+    def _backfill_tracked(self, conn: sqlite3.Connection):
+        """Seed the tracked registry from existing download history."""
+        # SQLite returns the bare columns from the row holding MAX(timestamp)
+        conn.execute("""
+            INSERT OR IGNORE INTO tracked_extensions
+                (browser, extension_id, latest_version, path, last_downloaded)
+            SELECT browser, extension_id, version, path, MAX(timestamp)
+            FROM history
+            WHERE action = 'download' AND status = 'success'
+                AND extension_id IS NOT NULL AND browser IS NOT NULL
+            GROUP BY browser, extension_id
+        """)
+
     def _migrate_json(self):
         if self.json_path.exists():
             try:
@@ -80,6 +127,8 @@ class HistoryManager:
                                         entry.get("path"),
                                     ),
                                 )
+                            # The registry was created (and backfilled) empty
+                            self._backfill_tracked(conn)
 
                 # Rename JSON file to indicate migration done
                 self.json_path.rename(self.json_path.with_suffix(".json.bak"))
@@ -129,14 +178,20 @@ class HistoryManager:
 
     def get_all_entries(self) -> List[Dict[str, Any]]:
         """Get all entries for bulk operations."""
-        with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT timestamp, action, extension_id as id, browser, version, status, path
-                FROM history
-                ORDER BY timestamp DESC
-            """)
-            return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_all_entries())
+
+    def iter_all_entries(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream all entries, newest first, without loading the table into memory."""
+        columns, rows = self.stream_query(
+            """
+            SELECT timestamp, action, extension_id as id, browser, version, status, path
+            FROM history
+            ORDER BY timestamp DESC
+            """,
+            batch_size=batch_size,
+        )
+        for row in rows:
+            yield dict(zip(columns, row))
 
     def execute_query(self, sql: str) -> List[Dict[str, Any]]:
         """Execute a raw SQL query."""
@@ -151,6 +206,155 @@ class HistoryManager:
         except sqlite3.Error as e:
             raise e
 
+    def stream_query(
+        self,
+        sql: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        read_only: bool = True,
+        batch_size: int = 1000,
+    ) -> Tuple[List[str], Iterator[tuple]]:
+        """
+        Execute a raw SQL query and stream its rows.
+
+        Returns the column names and an iterator of row tuples fetched in
+        batches of `batch_size`. The connection stays open until the iterator
+        is exhausted or closed. With `limit`/`offset` the query is wrapped in a
+        paginating sub-select, so only SELECT statements can be paginated.
+        """
+        if limit is not None or offset:
+            sql = sql.strip().rstrip(";")
+            limit = -1 if limit is None else int(limit)
+            sql = f"SELECT * FROM ({sql}) LIMIT {limit} OFFSET {int(offset)}"
+
+        if read_only:
+            conn = self._get_readonly_connection()
+        else:
+            conn = self._get_connection()
+
+        try:
+            cursor = conn.execute(sql)
+            if not cursor.description:
+                # Statement without a result set (only possible in write mode)
+                conn.commit()
+                conn.close()
+                return [], iter(())
+        except Exception:
+            conn.close()
+            raise
+
+        columns = [col[0] for col in cursor.description]
+        return columns, self._iter_rows(conn, cursor, batch_size, commit=not read_only)
+
+    @staticmethod
+    def _iter_rows(
+        conn: sqlite3.Connection,
+        cursor: sqlite3.Cursor,
+        batch_size: int,
+        commit: bool = False,
+    ) -> Iterator[tuple]:
+        # Statements with RETURNING change data and yield rows, so write
+        # mode commits once iteration ends (also when closed early)
+        failed = False
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception:
+            failed = True
+            raise
+        finally:
+            try:
+                if commit and not failed:
+                    conn.commit()
+            finally:
+                conn.close()
+
+    def track_extension(
+        self,
+        extension_id: str,
+        browser: str,
+        version: Optional[str] = None,
+        sha256: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        source_url: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """Record a successful download in the tracked extensions registry."""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO tracked_extensions (
+                    browser, extension_id, latest_version, sha256, etag,
+                    last_modified, source_url, path, last_downloaded, last_checked
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (browser, extension_id) DO UPDATE SET
+                    latest_version = COALESCE(excluded.latest_version, latest_version),
+                    sha256 = COALESCE(excluded.sha256, sha256),
+                    etag = COALESCE(excluded.etag, etag),
+                    last_modified = COALESCE(excluded.last_modified, last_modified),
+                    source_url = COALESCE(excluded.source_url, source_url),
+                    path = COALESCE(excluded.path, path),
+                    last_downloaded = excluded.last_downloaded,
+                    last_checked = excluded.last_checked
+            """,
+                (
+                    browser,
+                    extension_id,
+                    version,
+                    sha256,
+                    etag,
+                    last_modified,
+                    source_url,
+                    str(path) if path else None,
+                    timestamp,
+                    timestamp,
+                ),
+            )
+
+    def mark_checked(self, keys: List[Tuple[str, str]]) -> None:
+        """Update last_checked for the given (browser, extension_id) pairs."""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                UPDATE tracked_extensions SET last_checked = ?
+                WHERE browser = ? AND extension_id = ?
+            """,
+                [(timestamp, browser, ext_id) for browser, ext_id in keys],
+            )
+
+    def get_tracked_extensions(
+        self, checked_before: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get tracked extensions, least recently checked first.
+        If checked_before (ISO timestamp) is given, only extensions not checked
+        since then are returned.
+        """
+        sql = """
+            SELECT browser, extension_id as id, latest_version as version,
+                sha256, etag, last_modified, source_url as source, path,
+                last_downloaded, last_checked
+            FROM tracked_extensions
+        """
+        params: tuple = ()
+        if checked_before:
+            sql += " WHERE last_checked IS NULL OR last_checked < ?"
+            params = (checked_before,)
+        sql += " ORDER BY last_checked"
+
+        with self._get_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+
     def clear(self) -> None:
         with self._get_connection() as conn:
             conn.execute("DELETE FROM history")
+            conn.execute("DELETE FROM tracked_extensions")
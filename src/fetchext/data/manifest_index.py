@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from fetchext.core.crx  import CrxDecoder
+from fetchext.security.inspector  import ExtensionInspector
+from fetchext.utils  import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".fext-index.db"
+
+# Manifest keys kept in the index. Repository-wide commands only need these,
+# so we avoid storing large content_scripts/locales blobs for every archive.
+MANIFEST_FIELDS = (
+    "name",
+    "version",
+    "manifest_version",
+    "permissions",
+    "host_permissions",
+    "optional_permissions",
+    "browser_specific_settings",
+)
+
+
+@dataclass
+class ManifestRecord:
+    filename: str
+    size: int
+    mtime_ns: int
+    manifest: Optional[Dict[str, Any]] = field(default=None)
+    crx_id: Optional[str] = None
+    sha256: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ManifestIndex:
+    """
+    Persistent index of extension manifests for a repository directory.
+
+    Records are keyed by filename and invalidated by size and mtime, so only
+    archives that changed since the last run are opened again.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.db_path = self.directory / INDEX_FILENAME
+        self.inspector = ExtensionInspector()
+        self.conn = self._get_connection()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            self._init_db(conn)
+        except sqlite3.Error as e:
+            # Read-only or virtual directories: keep working without persistence
+            logger.debug(f"Manifest index unavailable at {self.db_path}: {e}")
+            conn = sqlite3.connect(":memory:")
+            self._init_db(conn)
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS manifests (
+                    filename TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    manifest TEXT,
+                    crx_id TEXT,
+                    sha256 TEXT,
+                    error TEXT
+                )
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self, files: Iterable[Path]) -> List[ManifestRecord]:
+        """
+        Returns records for the given files, re-reading only changed archives.
+        """
+        cached = {
+            row[0]: row
+            for row in self.conn.execute(
+                "SELECT filename, size, mtime_ns, manifest, crx_id, sha256, error "
+                "FROM manifests"
+            )
+        }
+
+        records = []
+        changed = []
+        for file_path in files:
+            st = file_path.stat()
+            row = cached.get(file_path.name)
+            if row and row[1] == st.st_size and row[2] == st.st_mtime_ns:
+                records.append(self._from_row(row))
+                continue
+
+            record = self._read_record(file_path, st)
+            records.append(record)
+            changed.append(record)
+
+        if changed:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO manifests "
+                    "(filename, size, mtime_ns, manifest, crx_id, sha256, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._to_row(r) for r in changed],
+                )
+
+        self.prune(cached.keys())
+        return records
+
+    def prune(self, filenames: Iterable[str]):
+        """Drops records for files that no longer exist in the directory."""
+        try:
+            present = set(os.listdir(self.directory))
+        except OSError:
+            return
+
+        missing = [(name,) for name in filenames if name not in present]
+        if missing:
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM manifests WHERE filename = ?", missing
+                )
+
+    def _read_record(self, file_path: Path, st: os.stat_result) -> ManifestRecord:
+        record = ManifestRecord(
+            filename=file_path.name,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            sha256=compute_file_hash(file_path),
+        )
+
+        try:
+            manifest = self.inspector.get_manifest(file_path)
+            record.manifest = {k: manifest[k] for k in MANIFEST_FIELDS if k in manifest}
+        except Exception as e:
+            record.error = str(e)
+
+        if file_path.suffix == ".crx":
+            try:
+                record.crx_id = CrxDecoder.get_id(file_path)
+            except Exception as e:
+                logger.debug(f"Could not extract ID from CRX {file_path.name}: {e}")
+
+        return record
+
+    @staticmethod
+    def _to_row(record: ManifestRecord) -> tuple:
+        return (
+            record.filename,
+            record.size,
+            record.mtime_ns,
+            json.dumps(record.manifest) if record.manifest is not None else None,
+            record.crx_id,
+            record.sha256,
+            record.error,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> ManifestRecord:
+        return ManifestRecord(
+            filename=row[0],
+            size=row[1],
+            mtime_ns=row[2],
+            manifest=json.loads(row[3]) if row[3] is not None else None,
+            crx_id=row[4],
+            sha256=row[5],
+            error=row[6],
+        )
@@ -0,0 +1,129 @@
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".fext-mirror.db"
+
+
+@dataclass
+class SyncRecord:
+    browser: str
+    extension_id: str
+    filename: str
+    version: Optional[str] = None
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
+    last_checked: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.browser, self.extension_id)
+
+    def is_fresh(self, max_age: int) -> bool:
+        """True if the item was checked within the last max_age seconds."""
+        if not max_age or not self.last_checked:
+            return False
+        try:
+            checked = datetime.fromisoformat(self.last_checked)
+        except ValueError:
+            return False
+        return checked > datetime.now(timezone.utc) - timedelta(seconds=max_age)
+
+
+class MirrorState:
+    """
+    Persistent sync state of a mirror directory, one record per
+    (browser, extension_id).
+
+    Records the real filename of every mirrored archive with its version and
+    hash, so a sync decides what to fetch without opening local archives.
+
+    Kept in the mirror directory rather than in the per-user
+    tracked_extensions registry: the same extension can be mirrored into
+    several directories with different files, and the state must follow the
+    directory when it is moved or shared.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.db_path = self.directory / STATE_FILENAME
+        self.conn = self._get_connection()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            self._init_db(conn)
+        except sqlite3.Error as e:
+            # Read-only or virtual directories: keep working without persistence
+            logger.debug(f"Mirror state unavailable at {self.db_path}: {e}")
+            conn = sqlite3.connect(":memory:")
+            self._init_db(conn)
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    browser TEXT NOT NULL,
+                    extension_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    version TEXT,
+                    sha256 TEXT,
+                    etag TEXT,
+                    last_checked TEXT,
+                    PRIMARY KEY (browser, extension_id)
+                )
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self) -> Dict[Tuple[str, str], SyncRecord]:
+        rows = self.conn.execute(
+            "SELECT browser, extension_id, filename, version, sha256, etag, "
+            "last_checked FROM items"
+        )
+        return {(row[0], row[1]): SyncRecord(*row) for row in rows}
+
+    def save(self, records: Iterable[SyncRecord]):
+        rows = [
+            (
+                r.browser,
+                r.extension_id,
+                r.filename,
+                r.version,
+                r.sha256,
+                r.etag,
+                r.last_checked,
+            )
+            for r in records
+        ]
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO items "
+                "(browser, extension_id, filename, version, sha256, etag, last_checked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def remove(self, keys: Iterable[Tuple[str, str]]):
+        keys = list(keys)
+        if not keys:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM items WHERE browser = ? AND extension_id = ?", keys
+            )
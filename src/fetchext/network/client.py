@@ -84,6 +84,8 @@ class NetworkClient:
         self.delay = float(self.network_config.get("rate_limit_delay", 0.0))
         self.proxies = self.network_config.get("proxies", {})
         self.session = self._create_session()
+        # ETag / Last-Modified of the last completed download_file
+        self.last_validators = {}
 
     def _create_session(self) -> requests.Session:
         session = RateLimitedSession(delay=self.delay)
@@ -165,6 +167,10 @@ class NetworkClient:
                 )
 
             response.raise_for_status()
+            self.last_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
 
             # Check if server accepted the range
             is_resumed = response.status_code == 206
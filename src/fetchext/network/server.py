@@ -6,8 +6,7 @@ import socketserver
 import functools
 from pathlib import Path
 from typing import List, Dict, Optional
-from fetchext.security.inspector  import ExtensionInspector
-from fetchext.core.crx  import CrxDecoder
+from fetchext.data.manifest_index  import ManifestIndex
 
 logger = logging.getLogger(__name__)
 
@@ -25,60 +24,53 @@ def generate_update_manifest(
     base_url = base_url.rstrip("/")
 
     extensions = []
-    inspector = ExtensionInspector()
 
-    # Scan for files
-    for file_path in directory.iterdir():
-        if file_path.suffix not in [".crx", ".xpi"]:
+    # Scan for files; manifests and CRX IDs come from the manifest index
+    files = [p for p in directory.iterdir() if p.suffix in [".crx", ".xpi"]]
+    with ManifestIndex(directory) as index:
+        records = index.refresh(files)
+
+    for file_path, record in zip(files, records):
+        if record.manifest is None:
+            logger.warning(f"Error processing {file_path.name}: {record.error}")
             continue
 
-        try:
-            # Get Version from manifest
-            manifest = inspector.get_manifest(file_path)
-            version = manifest.get("version")
-            if not version:
-                logger.warning(f"Skipping {file_path.name}: No version in manifest")
-                continue
-
-            # Get ID
-            ext_id = None
-            if file_path.suffix == ".crx":
-                try:
-                    ext_id = CrxDecoder.get_id(file_path)
-                except Exception as e:
-                    logger.warning(
-                        f"Could not extract ID from CRX {file_path.name}: {e}"
-                    )
-
-            # Fallback ID from manifest (common for Firefox)
-            if not ext_id:
-                bss = manifest.get("browser_specific_settings", {}).get("gecko", {})
-                ext_id = bss.get("id")
-
-            if not ext_id:
-                # Fallback to filename if it looks like an ID
-                if len(file_path.stem) == 32:
-                    ext_id = file_path.stem
-                elif "@" in file_path.stem:  # Firefox ID style
-                    ext_id = file_path.stem
-
-            if not ext_id:
-                logger.warning(
-                    f"Skipping {file_path.name}: Could not determine Extension ID"
-                )
-                continue
-
-            extensions.append(
-                {
-                    "id": ext_id,
-                    "version": version,
-                    "file": file_path.name,
-                    "type": "crx" if file_path.suffix == ".crx" else "xpi",
-                }
+        # Get Version from manifest
+        manifest = record.manifest
+        version = manifest.get("version")
+        if not version:
+            logger.warning(f"Skipping {file_path.name}: No version in manifest")
+            continue
+
+        # Get ID
+        ext_id = record.crx_id
+
+        # Fallback ID from manifest (common for Firefox)
+        if not ext_id:
+            bss = manifest.get("browser_specific_settings", {}).get("gecko", {})
+            ext_id = bss.get("id")
+
+        if not ext_id:
+            # Fallback to filename if it looks like an ID
+            if len(file_path.stem) == 32:
+                ext_id = file_path.stem
+            elif "@" in file_path.stem:  # Firefox ID style
+                ext_id = file_path.stem
+
+        if not ext_id:
+            logger.warning(
+                f"Skipping {file_path.name}: Could not determine Extension ID"
             )
+            continue
 
-        except Exception as e:
-            logger.warning(f"Error processing {file_path.name}: {e}")
+        extensions.append(
+            {
+                "id": ext_id,
+                "version": version,
+                "file": file_path.name,
+                "type": "crx" if file_path.suffix == ".crx" else "xpi",
+            }
+        )
 
     if not extensions:
         logger.warning("No valid extensions found.")
@@ -1,12 +1,23 @@
+import atexit
 import importlib.util
 import logging
+import queue
 import sys
+import threading
+import time
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from fetchext.data.config  import load_config
 
 logger = logging.getLogger(__name__)
 
+# Process-wide registry of imported hook modules:
+# file path -> ((mtime_ns, size), module)
+_loaded_modules: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+_loaded_modules_lock = threading.Lock()
+
 
 @dataclass
 class HookContext:
@@ -23,10 +34,173 @@ class HookContext:
     result: Any = None
 
 
+class BackgroundHookRunner:
+    """
+    Runs post_* hooks on a fixed pool of daemon worker threads.
+
+    Submissions block once max_pending hooks are queued. A watchdog abandons
+    hooks still running after `timeout` seconds and starts a replacement
+    worker. Threads cannot be killed, so an abandoned hook keeps running until
+    it returns or the process exits; at most max_abandoned of them may be
+    alive at once, and new hooks are skipped while that many are. Pending
+    hooks are given up to `timeout` seconds when the process exits.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 30.0,
+        max_pending: int = 64,
+        max_abandoned: Optional[int] = None,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_abandoned = workers if max_abandoned is None else max_abandoned
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._pending = 0
+        self._cond = threading.Condition()
+        # Names of hooks queued but not started
+        self._queued: Counter = Counter()
+        # Worker thread -> (hook name, start time) of the hook it runs
+        self._running: Dict[threading.Thread, Tuple[str, float]] = {}
+        self._abandoned: Set[threading.Thread] = set()
+        self._worker_count = 0
+
+        for _ in range(workers):
+            self._start_worker()
+        threading.Thread(
+            target=self._watchdog, name="fext-hooks-watchdog", daemon=True
+        ).start()
+
+    def submit(
+        self, hook_name: str, funcs: List[Callable], context: "HookContext"
+    ) -> bool:
+        """Queues a hook. Returns False if it was skipped."""
+        with self._cond:
+            if len(self._abandoned) >= self.max_abandoned:
+                logger.warning(
+                    f"Skipping background hook {hook_name}: "
+                    f"{len(self._abandoned)} timed-out hook(s) still running."
+                )
+                return False
+            self._pending += 1
+            self._queued[hook_name] += 1
+        self._queue.put((hook_name, funcs, context))
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for queued hooks. Returns False if they did not finish in time."""
+        with self._cond:
+            done = self._cond.wait_for(lambda: self._pending == 0, timeout)
+            if not done:
+                running = [
+                    name
+                    for thread, (name, _) in self._running.items()
+                    if thread not in self._abandoned
+                ]
+                logger.warning(
+                    f"{self._pending} background hook(s) still pending after "
+                    f"{timeout}s, abandoning. Running: {', '.join(running) or '-'}; "
+                    f"not started: {', '.join(self._queued.elements()) or '-'}"
+                )
+            return done
+
+    def _start_worker(self):
+        thread = threading.Thread(
+            target=self._worker, name=f"fext-hooks-{self._worker_count}", daemon=True
+        )
+        self._worker_count += 1
+        thread.start()
+
+    def _worker(self):
+        me = threading.current_thread()
+        while True:
+            hook_name, funcs, context = self._queue.get()
+            with self._cond:
+                self._queued[hook_name] -= 1
+                if not self._queued[hook_name]:
+                    del self._queued[hook_name]
+                self._running[me] = (hook_name, time.monotonic())
+            try:
+                _call_hooks(hook_name, funcs, context)
+            finally:
+                with self._cond:
+                    del self._running[me]
+                    if me in self._abandoned:
+                        # Already counted as done and replaced
+                        self._abandoned.discard(me)
+                        return
+                    self._pending -= 1
+                    self._cond.notify_all()
+
+    def _watchdog(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for thread, (name, started) in list(self._running.items()):
+                    if thread in self._abandoned or now - started <= self.timeout:
+                        continue
+                    if len(self._abandoned) >= self.max_abandoned:
+                        break
+                    logger.warning(
+                        f"Background hook {name} still running after "
+                        f"{self.timeout}s, abandoning."
+                    )
+                    self._abandoned.add(thread)
+                    self._pending -= 1
+                    self._start_worker()
+                    self._cond.notify_all()
+                self._cond.wait(min(self.timeout, 1.0))
+
+
+_background_runner: Optional[BackgroundHookRunner] = None
+_background_runner_lock = threading.Lock()
+
+
+def get_background_runner(
+    workers: int = 2, timeout: float = 30.0
+) -> BackgroundHookRunner:
+    """
+    Returns the process-wide background hook runner, creating it on first use.
+    workers and timeout are fixed by the first call; later values are ignored.
+    """
+    global _background_runner
+
+    with _background_runner_lock:
+        if _background_runner is None:
+            _background_runner = BackgroundHookRunner(workers=workers, timeout=timeout)
+            atexit.register(_background_runner.wait, timeout)
+        elif (workers, timeout) != (
+            _background_runner.workers,
+            _background_runner.timeout,
+        ):
+            logger.debug(
+                "Background hook runner already started with "
+                f"workers={_background_runner.workers}, "
+                f"timeout={_background_runner.timeout}; ignoring new settings."
+            )
+        return _background_runner
+
+
+def _call_hooks(hook_name: str, funcs: List[Callable], context: "HookContext"):
+    for func in funcs:
+        try:
+            func(context)
+            if context.cancel:
+                logger.info(f"Hook {hook_name} requested cancellation.")
+                break
+        except Exception as e:
+            logger.error(f"Error in hook {hook_name}: {e}")
+
+
 class HookManager:
     """Manages loading and execution of plugin hooks."""
 
-    def __init__(self, hooks_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        hooks_dir: Optional[Path] = None,
+        background_hooks: Optional[List[str]] = None,
+    ):
         self.hooks_dir = hooks_dir
         self.hooks: Dict[str, List[Callable[[HookContext], None]]] = {
             "pre_download": [],
@@ -39,9 +213,22 @@ class HookManager:
             "pre_migrate": [],
             "post_migrate": [],
         }
+        self.hooks_config = self._load_hooks_config()
+        if background_hooks is None:
+            background_hooks = self.hooks_config.get("background", [])
+        # Only post_* hooks may leave the critical path
+        self.background_hooks = {
+            name for name in background_hooks if name.startswith("post_")
+        }
         if self.hooks_dir and self.hooks_dir.exists():
             self._load_hooks()
 
+    def _load_hooks_config(self) -> Dict[str, Any]:
+        try:
+            return load_config().get("hooks", {})
+        except Exception:
+            return {}
+
     def _load_hooks(self):
         """Load python scripts from the hooks directory."""
         logger.debug(f"Loading hooks from {self.hooks_dir}")
@@ -55,15 +242,28 @@ class HookManager:
                 logger.error(f"Failed to load hook {hook_file}: {e}")
 
     def _load_module(self, file_path: Path):
-        """Import a python file as a module and register its hooks."""
-        module_name = f"fetchext_hook_{file_path.stem}"
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        if not spec or not spec.loader:
-            return
+        """
+        Import a python file as a module and register its hooks.
+        Modules are imported once per process and only re-imported when the
+        file changes on disk.
+        """
+        st = file_path.stat()
+        key = (st.st_mtime_ns, st.st_size)
 
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
+        with _loaded_modules_lock:
+            cached = _loaded_modules.get(file_path)
+            if cached and cached[0] == key:
+                module = cached[1]
+            else:
+                module_name = f"fetchext_hook_{file_path.stem}"
+                spec = importlib.util.spec_from_file_location(module_name, file_path)
+                if not spec or not spec.loader:
+                    return
+
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                spec.loader.exec_module(module)
+                _loaded_modules[file_path] = (key, module)
 
         # Register functions that match hook names
         for hook_name in self.hooks:
@@ -74,17 +274,25 @@ class HookManager:
                     logger.debug(f"Registered {hook_name} from {file_path.name}")
 
     def run_hook(self, hook_name: str, context: HookContext) -> HookContext:
-        """Execute all registered functions for a given hook."""
+        """
+        Execute all registered functions for a given hook.
+        Hooks listed in `hooks.background` are queued on the background runner
+        and return immediately; their changes to the context are not awaited.
+        """
         if hook_name not in self.hooks:
             return context
 
-        for func in self.hooks[hook_name]:
-            try:
-                func(context)
-                if context.cancel:
-                    logger.info(f"Hook {hook_name} requested cancellation.")
-                    break
-            except Exception as e:
-                logger.error(f"Error in hook {hook_name}: {e}")
+        funcs = self.hooks[hook_name]
+        if not funcs:
+            return context
+
+        if hook_name in self.background_hooks:
+            runner = get_background_runner(
+                workers=self.hooks_config.get("workers", 2),
+                timeout=self.hooks_config.get("timeout", 30.0),
+            )
+            runner.submit(hook_name, list(funcs), context)
+            return context
 
+        _call_hooks(hook_name, funcs, context)
         return context
@@ -3,8 +3,38 @@ import json
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from pathlib import Path
+from fetchext.analysis.api_usage import iter_api_calls
 from fetchext.utils  import open_extension_archive
 
+# chrome.<api> prefixes flagged by the code scan
+DEPRECATED_APIS = {
+    "browserAction": (
+        "warning",
+        "chrome.browserAction is deprecated in MV3. Use chrome.action.",
+    ),
+    "pageAction": (
+        "warning",
+        "chrome.pageAction is deprecated in MV3. Use chrome.action.",
+    ),
+    "webRequest": (
+        "info",
+        "chrome.webRequest blocking is limited in MV3. Consider declarativeNetRequest.",
+    ),
+}
+
+
+def _deprecated_api(api: str) -> Optional[str]:
+    """
+    Returns the DEPRECATED_APIS key that api starts with, if any. Prefixes
+    match so relatives such as chrome.webRequestBlocking are flagged too.
+    """
+    if api in DEPRECATED_APIS:
+        return api
+    for name in DEPRECATED_APIS:
+        if api.startswith(name):
+            return name
+    return None
+
 
 @dataclass
 class AuditIssue:
@@ -164,38 +194,23 @@ class ExtensionAuditor:
             )
 
     def _scan_code(self, zf, report: AuditReport):
-        # Simple regex scan for JS files
+        # One scan per JS file; line numbers are resolved only for hits
         js_files = [f for f in zf.namelist() if f.endswith(".js")]
 
-        patterns = [
-            (
-                r"chrome\.browserAction",
-                "warning",
-                "chrome.browserAction is deprecated in MV3. Use chrome.action.",
-            ),
-            (
-                r"chrome\.pageAction",
-                "warning",
-                "chrome.pageAction is deprecated in MV3. Use chrome.action.",
-            ),
-            (
-                r"chrome\.webRequest",
-                "info",
-                "chrome.webRequest blocking is limited in MV3. Consider declarativeNetRequest.",
-            ),
-        ]
-
         for filename in js_files:
             try:
-                # Limit read size to avoid memory issues with massive JS files?
-                # For now, read full.
-                content = zf.read(filename).decode("utf-8", errors="ignore")
-                lines = content.splitlines()
-                for i, line in enumerate(lines):
-                    for pattern, severity, msg in patterns:
-                        if re.search(pattern, line):
-                            report.issues.append(
-                                AuditIssue(severity, msg, filename, i + 1)
-                            )
+                content = zf.read(filename)
             except Exception:
-                pass  # Ignore read errors
+                continue  # Ignore read errors
+
+            seen = set()
+            for line, namespace, api, _ in iter_api_calls(content):
+                if namespace != "chrome":
+                    continue
+                deprecated = _deprecated_api(api)
+                # One issue per API per line
+                if deprecated is None or (line, deprecated) in seen:
+                    continue
+                seen.add((line, deprecated))
+                severity, msg = DEPRECATED_APIS[deprecated]
+                report.issues.append(AuditIssue(severity, msg, filename, line))
@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINTS_FILENAME = "fingerprints.json"
+
+# SHA-256 of unmodified upstream library builds, as served by the vendor's
+# CDN (verified against the published SRI hashes). Further fingerprints are
+# loaded from the community rules repository and the local database.
+BUILTIN_FINGERPRINTS = {
+    "ff1523fb7389539c84c65aba19260648793bb4f5e29329d2ee8804bc37a3fe6e": {
+        "name": "jquery",
+        "version": "3.6.0",
+        "file": "jquery.min.js",
+    },
+    "82f64f62bb03c1bc1824b0f9c9e05f70dba33e146818e63cdf5c306c8cf3dedd": {
+        "name": "bootstrap",
+        "version": "5.3.2",
+        "file": "bootstrap.bundle.min.js",
+    },
+}
+
+
+def get_data_dir() -> Path:
+    xdg_data_home = os.environ.get("XDG_DATA_HOME")
+    if xdg_data_home:
+        return Path(xdg_data_home) / "fext"
+    return Path.home() / ".local" / "share" / "fext"
+
+
+def get_fingerprints_path() -> Path:
+    """Local database written by `fext rules fingerprint`."""
+    return get_data_dir() / FINGERPRINTS_FILENAME
+
+
+def default_sources() -> List[Path]:
+    # Community rules synced by `fext rules sync`, then local additions
+    data_dir = get_data_dir()
+    return [data_dir / "rules" / FINGERPRINTS_FILENAME, get_fingerprints_path()]
+
+
+class FingerprintDB:
+    """
+    Maps SHA-256 hashes of known library files to name, version and
+    advisories.
+
+    Files are JSON objects of the form
+    {"fingerprints": {"<sha256>": {"name": ..., "version": ...,
+    "advisories": [...]}}}. Later sources override earlier ones.
+    """
+
+    def __init__(self, sources: Optional[Iterable[Path]] = None):
+        self.entries: Dict[str, dict] = dict(BUILTIN_FINGERPRINTS)
+        for source in default_sources() if sources is None else sources:
+            self.load(source)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, path: Path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring invalid fingerprint database {path}: {e}")
+            return
+
+        for digest, entry in data.get("fingerprints", {}).items():
+            if isinstance(entry, dict) and "name" in entry and "version" in entry:
+                self.entries[digest.lower()] = entry
+
+    def lookup(self, sha256: str) -> Optional[dict]:
+        return self.entries.get(sha256)
+
+    def lookup_content(self, content: bytes) -> Optional[dict]:
+        return self.lookup(hashlib.sha256(content).hexdigest())
+
+
+def add_fingerprints(entries: Dict[str, dict], path: Optional[Path] = None) -> Path:
+    """Adds entries to the local fingerprint database and returns its path."""
+    path = path or get_fingerprints_path()
+
+    data = {"fingerprints": {}}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data.setdefault("fingerprints", {})
+
+    data["fingerprints"].update(entries)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    return path
@@ -2,7 +2,8 @@ import re
 import logging
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Set
+from fetchext.security.fingerprints import FingerprintDB
 from fetchext.utils  import open_extension_archive
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,8 @@ class DetectedLibrary:
     path: str
     vulnerable: bool = False
     advisory: Optional[str] = None
+    # True when the file is a byte-identical copy of a known library build
+    known_vendor: bool = False
 
 
 @dataclass
@@ -22,6 +25,11 @@ class ScanReport:
     file: str
     libraries: List[DetectedLibrary] = field(default_factory=list)
 
+    @property
+    def vendor_paths(self) -> Set[str]:
+        """Paths of unmodified vendor files that other analyzers can skip."""
+        return {lib.path for lib in self.libraries if lib.known_vendor}
+
 
 class DependencyScanner:
     # Regex patterns to detect libraries in file content (header comments)
@@ -45,6 +53,11 @@ class DependencyScanner:
         "angularjs": ("1.8.0", "XSS in < 1.8.0"),
     }
 
+    def __init__(self, fingerprints: Optional[FingerprintDB] = None):
+        self.fingerprints = (
+            fingerprints if fingerprints is not None else FingerprintDB()
+        )
+
     def scan(self, file_path: Path) -> ScanReport:
         file_path = Path(file_path)
         if not file_path.exists():
@@ -58,11 +71,19 @@ class DependencyScanner:
                     if not filename.endswith(".js"):
                         continue
 
-                    # Read first 1KB for header detection
                     with zf.open(filename) as f:
                         try:
-                            head = f.read(1024).decode("utf-8", errors="ignore")
-                            lib = self._detect_library(filename, head)
+                            content = f.read()
+
+                            # 1. Exact fingerprint match, also covers minified
+                            # and bannerless copies
+                            lib = self._lookup_fingerprint(filename, content)
+
+                            # 2. First 1KB for header detection
+                            if not lib:
+                                head = content[:1024].decode("utf-8", errors="ignore")
+                                lib = self._detect_library(filename, head)
+
                             if lib:
                                 lib.path = filename
                                 report.libraries.append(lib)
@@ -74,6 +95,21 @@ class DependencyScanner:
 
         return report
 
+    def _lookup_fingerprint(
+        self, filename: str, content: bytes
+    ) -> Optional[DetectedLibrary]:
+        entry = self.fingerprints.lookup_content(content)
+        if not entry:
+            return None
+
+        lib = self._create_library(entry["name"], entry["version"], filename)
+        advisories = entry.get("advisories")
+        if advisories:
+            lib.vulnerable = True
+            lib.advisory = "; ".join(advisories)
+        lib.known_vendor = True
+        return lib
+
     def _detect_library(
         self, filename: str, content_head: str
     ) -> Optional[DetectedLibrary]:
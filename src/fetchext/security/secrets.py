@@ -1,7 +1,8 @@
 import re
 import math
 from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from typing import Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 from fetchext.utils  import open_extension_archive
 
@@ -14,9 +15,13 @@ class SecretFinding:
     match: str  # Masked
 
 
+GENERIC_TYPE = "Generic API Key"
+
+
 class SecretScanner:
     # Regex patterns for common secrets
     # Order matters! More specific patterns should come first.
+    # Patterns are matched against raw bytes and must not span lines.
     PATTERNS = [
         ("AWS Access Key", r"AKIA[0-9A-Z]{16}"),
         ("Google API Key", r"AIza[0-9A-Za-z\-_]{35}"),
@@ -25,11 +30,18 @@ class SecretScanner:
         ("Private Key", r"-----BEGIN [A-Z]+ PRIVATE KEY-----"),
         # Generic API Key is very broad, so it should be last.
         (
-            "Generic API Key",
-            r"(?i)(api_key|apikey|secret|token)\s*[:=]\s*['\"]([a-zA-Z0-9_\-]{20,})['\"]",
+            GENERIC_TYPE,
+            r"(?i:api_key|apikey|secret|token)[^\S\n]*[:=][^\S\n]*['\"](?P<value>[a-zA-Z0-9_\-]{20,})['\"]",
         ),
     ]
 
+    # Literal every match of the pattern at the same index must contain.
+    # Entries without one of these are never handed to the regex engine.
+    LITERALS = [b"AKIA", b"AIza", b"xox", b"sk_live_", b"-----BEGIN"]
+
+    # Lowercase keywords for the case-insensitive generic pattern
+    GENERIC_KEYWORDS = (b"api_key", b"apikey", b"secret", b"token")
+
     # Known false positives for generic matches
     FALSE_POSITIVES = {
         "YOUR_API_KEY",
@@ -53,41 +65,45 @@ class SecretScanner:
         "bigint",
     }
 
-    def scan_extension(self, file_path: Path) -> List[SecretFinding]:
+    SKIP_EXTENSIONS = (
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".ico",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".eot",
+        ".mp3",
+        ".mp4",
+        ".wav",
+    )
+
+    def scan_extension(
+        self, file_path: Path, skip_paths: Optional[Set[str]] = None
+    ) -> List[SecretFinding]:
+        """
+        Scans all text entries of an extension.
+
+        skip_paths lists entries to leave out, such as unmodified vendor
+        libraries identified by DependencyScanner.
+        """
         findings = []
+        skip_paths = skip_paths or set()
         with open_extension_archive(file_path) as zf:
             for filename in zf.namelist():
-                if filename.endswith(("/", "\\")):
+                if filename.endswith(("/", "\\")) or filename in skip_paths:
                     continue
 
                 # Skip binary files based on extension
-                if filename.lower().endswith(
-                    (
-                        ".png",
-                        ".jpg",
-                        ".jpeg",
-                        ".gif",
-                        ".ico",
-                        ".woff",
-                        ".woff2",
-                        ".ttf",
-                        ".eot",
-                        ".mp3",
-                        ".mp4",
-                        ".wav",
-                    )
-                ):
+                if filename.lower().endswith(self.SKIP_EXTENSIONS):
                     continue
 
                 try:
-                    # Use streaming to avoid loading entire file into memory
                     with zf.open(filename) as f:
-                        for i, line_bytes in enumerate(f):
-                            try:
-                                line = line_bytes.decode("utf-8", errors="ignore")
-                                findings.extend(self._scan_line(line, filename, i + 1))
-                            except Exception:
-                                pass
+                        data = f.read()
+                    findings.extend(self._scan_buffer(data, filename))
                 except Exception:
                     pass  # Ignore read errors
         return findings
@@ -104,79 +120,123 @@ class SecretScanner:
     def _scan_line(
         self, line: str, filename: str, line_number: int
     ) -> List[SecretFinding]:
-        findings = []
-        # Use a set to track matched ranges in this line to avoid overlapping matches
-        matched_ranges = set()
-
-        # Collect all matches first
-        all_matches = []
-        for name, pattern in self.PATTERNS:
-            for match in re.finditer(pattern, line):
-                all_matches.append((name, match))
-
-        # Prioritize specific types
-        type_priority = {
-            "AWS Access Key": 10,
-            "Google API Key": 10,
-            "Slack Token": 10,
-            "Stripe Secret Key": 10,
-            "Private Key": 10,
-            "Generic API Key": 1,
-        }
-
-        # Sort by priority (descending) then by start position
-        all_matches.sort(key=lambda x: (-type_priority.get(x[0], 0), x[1].start()))
-
-        for name, match in all_matches:
-            start, end = match.span()
-
-            # Check for overlap
-            is_overlap = False
-            for r_start, r_end in matched_ranges:
-                if start < r_end and end > r_start:
-                    is_overlap = True
-                    break
-
-            if is_overlap:
-                continue
+        return self._scan_buffer(
+            line.encode("utf-8", errors="ignore"), filename, first_line=line_number
+        )
 
-            full_match = match.group(0)
-
-            # False Positive Reduction for Generic API Key
-            if name == "Generic API Key":
-                secret_value = match.group(2)
+    def _scan_buffer(
+        self, data: bytes, filename: str, first_line: int = 1
+    ) -> List[SecretFinding]:
+        """
+        Scans a whole file buffer with a single combined regex.
 
-                # 1. Check against known false positives
-                if any(fp in secret_value.upper() for fp in self.FALSE_POSITIVES):
-                    continue
+        Line numbers are only computed for matches, by counting newlines
+        since the previous hit.
+        """
+        active = self._active_patterns(data)
+        if not active:
+            return []
 
-                # 2. Check entropy (randomness)
-                # A real API key usually has high entropy (> 3.0 for ~20 chars)
-                # Simple words or repeated chars have low entropy.
-                entropy = self._calculate_entropy(secret_value)
-                if entropy < 3.0:
-                    continue
+        findings = []
+        line_number = first_line
+        last_pos = 0
+        for index, match in self._iter_matches(data, active):
+            start = match.start()
+            line_number += data.count(b"\n", last_pos, start)
+            last_pos = start
+
+            finding = self._to_finding(index, match, filename, line_number)
+            if finding:
+                findings.append(finding)
+        return findings
 
-                # 3. Check if it looks like a URL or path
-                if secret_value.startswith(("http", "//", "/", "./", "../")):
-                    continue
+    def _active_patterns(self, data: bytes) -> Tuple[int, ...]:
+        """Indices of patterns whose required literal occurs in data."""
+        active = [i for i, literal in enumerate(self.LITERALS) if literal in data]
+
+        lowered = data.lower()
+        if any(keyword in lowered for keyword in self.GENERIC_KEYWORDS):
+            active.append(len(self.PATTERNS) - 1)
+        return tuple(active)
+
+    def _iter_matches(
+        self, data: bytes, active: Tuple[int, ...]
+    ) -> Iterator[Tuple[int, "re.Match"]]:
+        generic_index = len(self.PATTERNS) - 1
+        regex = _compile(tuple(self.PATTERNS), active)
+
+        for match in regex.finditer(data):
+            index = int(match.lastgroup[1:])
+            if index != generic_index:
+                yield index, match
+                continue
 
-                # Re-implement masking to be simpler and consistent
-                if len(full_match) > 12:
-                    masked = (
-                        full_match[:8] + "*" * (len(full_match) - 12) + full_match[-4:]
+            # Specific patterns win over a generic match that contains them,
+            # e.g. token = "AKIA...". The alternation alone would report the
+            # generic match because it starts further left.
+            specific = tuple(i for i in active if i != generic_index)
+            inner = []
+            if specific:
+                inner = list(
+                    _compile(tuple(self.PATTERNS), specific).finditer(
+                        data, match.start(), match.end()
                     )
-                else:
-                    masked = "*" * len(full_match)
+                )
+            if inner:
+                for m in inner:
+                    yield int(m.lastgroup[1:]), m
             else:
-                # Standard masking
-                if len(full_match) > 8:
-                    masked = full_match[:4] + "*" * (len(full_match) - 4)
-                else:
-                    masked = "*" * len(full_match)
-
-            matched_ranges.add((start, end))
-            findings.append(
-                SecretFinding(type=name, file=filename, line=line_number, match=masked)
-            )
-        return findings
+                yield index, match
+
+    def _to_finding(
+        self, index: int, match: "re.Match", filename: str, line_number: int
+    ):
+        name = self.PATTERNS[index][0]
+        full_match = match.group(0).decode("ascii", errors="replace")
+
+        # False Positive Reduction for Generic API Key
+        if name == GENERIC_TYPE:
+            secret_value = match.group("value").decode("ascii", errors="replace")
+
+            # 1. Check against known false positives
+            if any(fp in secret_value.upper() for fp in self.FALSE_POSITIVES):
+                return None
+
+            # 2. Check entropy (randomness)
+            # A real API key usually has high entropy (> 3.0 for ~20 chars)
+            # Simple words or repeated chars have low entropy.
+            entropy = self._calculate_entropy(secret_value)
+            if entropy < 3.0:
+                return None
+
+            # 3. Check if it looks like a URL or path
+            if secret_value.startswith(("http", "//", "/", "./", "../")):
+                return None
+
+            # Re-implement masking to be simpler and consistent
+            if len(full_match) > 12:
+                masked = full_match[:8] + "*" * (len(full_match) - 12) + full_match[-4:]
+            else:
+                masked = "*" * len(full_match)
+        else:
+            # Standard masking
+            if len(full_match) > 8:
+                masked = full_match[:4] + "*" * (len(full_match) - 4)
+            else:
+                masked = "*" * len(full_match)
+
+        return SecretFinding(type=name, file=filename, line=line_number, match=masked)
+
+
+@lru_cache(maxsize=None)
+def _compile(patterns: tuple, indices: Tuple[int, ...]) -> "re.Pattern":
+    """
+    Compiles the selected patterns into one bytes alternation.
+
+    Each pattern gets a named group p<index> so the match type can be read
+    from Match.lastgroup. Earlier patterns win when several match at the
+    same position.
+    """
+    return re.compile(
+        b"|".join(b"(?P<p%d>%s)" % (i, patterns[i][1].encode("ascii")) for i in indices)
+    )
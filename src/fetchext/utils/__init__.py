@@ -1,10 +1,13 @@
 from .fs import sanitize_filename, check_disk_space
-from .crypto import verify_file_hash
+from .crypto import compute_file_hash, verify_file_hash
 from .archive import open_extension_archive
+from .text import is_minified
 
 __all__ = [
     "sanitize_filename",
     "check_disk_space",
+    "compute_file_hash",
     "verify_file_hash",
     "open_extension_archive",
+    "is_minified",
 ]
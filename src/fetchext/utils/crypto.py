@@ -3,16 +3,10 @@ from pathlib import Path
 from fetchext.core.exceptions  import IntegrityError
 
 
-def verify_file_hash(
-    file_path: Path, expected_hash: str, algorithm: str = "sha256"
-) -> bool:
+def compute_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
     """
-    Verifies that the file at file_path matches the expected hash.
-    Raises IntegrityError if the hash does not match.
+    Computes the hex digest of a file, reading it in chunks.
     """
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-
     hash_func = getattr(hashlib, algorithm, None)
     if not hash_func:
         raise ValueError(f"Unsupported hash algorithm: {algorithm}")
@@ -23,7 +17,20 @@ def verify_file_hash(
         for chunk in iter(lambda: f.read(65536), b""):
             hasher.update(chunk)
 
-    calculated_hash = hasher.hexdigest().lower()
+    return hasher.hexdigest().lower()
+
+
+def verify_file_hash(
+    file_path: Path, expected_hash: str, algorithm: str = "sha256"
+) -> bool:
+    """
+    Verifies that the file at file_path matches the expected hash.
+    Raises IntegrityError if the hash does not match.
+    """
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    calculated_hash = compute_file_hash(file_path, algorithm)
     expected_hash = expected_hash.lower()
 
     if calculated_hash != expected_hash:
@@ -0,0 +1,21 @@
+# Minified code heuristic: long average lines with little whitespace
+MINIFIED_MIN_SIZE = 4 * 1024
+MINIFIED_LINE_LENGTH = 300
+MINIFIED_WHITESPACE_RATIO = 0.08
+MINIFIED_SAMPLE_SIZE = 64 * 1024
+
+
+def is_minified(content: bytes) -> bool:
+    """
+    Returns True if content looks like minified JavaScript.
+    """
+    if len(content) < MINIFIED_MIN_SIZE:
+        return False
+
+    lines = content.count(b"\n") + 1
+    if len(content) / lines < MINIFIED_LINE_LENGTH:
+        return False
+
+    sample = content[:MINIFIED_SAMPLE_SIZE]
+    whitespace = sum(sample.count(c) for c in (b" ", b"\t", b"\n", b"\r"))
+    return whitespace / len(sample) < MINIFIED_WHITESPACE_RATIO
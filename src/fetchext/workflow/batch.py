@@ -1,15 +1,98 @@
+import json
+import heapq
 import logging
+import time
 import concurrent.futures
 from pathlib import Path
+from typing import Iterator, Optional, Set
+import requests
 from fetchext.interface.console  import console
 from fetchext.downloaders  import ChromeDownloader, EdgeDownloader, FirefoxDownloader
-from fetchext.core.exceptions  import ConfigError
+from fetchext.core.exceptions  import ConfigError, NetworkError
 
 logger = logging.getLogger(__name__)
 
+JOURNAL_FILENAME = ".fext-batch.journal"
+
+# Submissions in flight per worker; bounds memory regardless of batch size
+IN_FLIGHT_PER_WORKER = 2
+
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0
+
+# Failures worth retrying; anything else is recorded as failed right away
+TRANSIENT_ERRORS = (NetworkError, requests.exceptions.RequestException)
+
+
+class BatchJournal:
+    """
+    Append-only JSON Lines record of finished batch items.
+
+    Each line is {"item": ..., "status": "done" | "failed"}; the last entry
+    for an item wins. Lines are flushed as they are written, so the journal
+    survives a crash of the batch run.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.done: Set[str] = self._load() if resume else set()
+        self._file = self.path.open("a" if resume else "w", buffering=1)
+
+    def _load(self) -> Set[str]:
+        done = set()
+        try:
+            with self.path.open("r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Partial last line after a crash
+                        continue
+                    if entry.get("status") == "done":
+                        done.add(entry["item"])
+                    else:
+                        done.discard(entry.get("item"))
+        except FileNotFoundError:
+            pass
+        return done
+
+    def record(self, item: str, status: str, error: Optional[str] = None):
+        entry = {"item": item, "status": status}
+        if error:
+            entry["error"] = error
+        self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class BatchProcessor:
-    def process(self, file_path, output_dir, max_workers=4, show_progress=True):
+    def __init__(self, max_retries: int = MAX_RETRIES, backoff: float = RETRY_BACKOFF):
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def process(
+        self,
+        file_path,
+        output_dir,
+        max_workers=4,
+        show_progress=True,
+        resume=False,
+        journal_path=None,
+    ):
+        """
+        Downloads every item of a batch file.
+
+        The file is streamed with a bounded number of downloads in flight.
+        Finished items are appended to a journal (by default in output_dir),
+        and with resume=True items already recorded as done are skipped.
+        """
         path = Path(file_path)
         if not path.exists():
             raise ConfigError(f"Batch file not found: {path}")
@@ -17,46 +100,106 @@ class BatchProcessor:
         if not output_dir.exists():
             output_dir.mkdir(parents=True, exist_ok=True)
 
+        journal_path = Path(journal_path or output_dir / JOURNAL_FILENAME)
+        with BatchJournal(journal_path, resume=resume) as journal:
+            if journal.done:
+                logger.info(f"Resuming: skipping {len(journal.done)} finished items")
+
+            logger.info(f"Processing {path} with {max_workers} workers...")
+
+            if show_progress:
+                with console.create_progress() as progress:
+                    # Counting is a cheap streaming pass; items stay on disk
+                    total = sum(1 for item in self._iter_items(path))
+                    task_id = progress.add_task("Batch Progress", total=total)
+                    self._run_threads(
+                        path, output_dir, max_workers, progress, task_id, journal
+                    )
+            else:
+                self._run_threads(path, output_dir, max_workers, None, None, journal)
+
+    @staticmethod
+    def _iter_items(path: Path) -> Iterator[str]:
         with path.open("r") as f:
-            lines = f.readlines()
-
-        # Filter valid lines first
-        valid_lines = [
-            line.strip()
-            for line in lines
-            if line.strip() and not line.strip().startswith("#")
-        ]
-
-        logger.info(
-            f"Processing {len(valid_lines)} items with {max_workers} workers..."
-        )
-
-        if show_progress:
-            with console.create_progress() as progress:
-                task_id = progress.add_task("Batch Progress", total=len(valid_lines))
-                self._run_threads(
-                    valid_lines, output_dir, max_workers, progress, task_id
-                )
-        else:
-            self._run_threads(valid_lines, output_dir, max_workers, None, None)
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+    def _run_threads(
+        self, path, output_dir, max_workers, progress, task_id, journal=None
+    ):
+        items = self._iter_items(path)
+        done = journal.done if journal else set()
+        limit = max(1, max_workers * IN_FLIGHT_PER_WORKER)
+        # Heap of (ready_at, attempt, item) waiting for another try
+        retries = []
+        futures = {}
 
-    def _run_threads(self, valid_lines, output_dir, max_workers, progress, task_id):
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            futures = [
-                executor.submit(self._process_line, line, output_dir)
-                for line in valid_lines
-            ]
-
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.error(f"Unexpected error in worker thread: {e}")
-                finally:
-                    if progress:
+            exhausted = False
+            while True:
+                # Refill the window, retries that are due first
+                now = time.monotonic()
+                while len(futures) < limit and retries and retries[0][0] <= now:
+                    _, attempt, item = heapq.heappop(retries)
+                    futures[executor.submit(self._process_line, item, output_dir)] = (
+                        item,
+                        attempt,
+                    )
+                while len(futures) < limit and not exhausted:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    elif item in done:
+                        if progress:
+                            progress.advance(task_id)
+                    else:
+                        futures[
+                            executor.submit(self._process_line, item, output_dir)
+                        ] = (item, 0)
+
+                if not futures:
+                    if not retries:
+                        break
+                    time.sleep(max(0.0, retries[0][0] - time.monotonic()))
+                    continue
+
+                timeout = None
+                if retries:
+                    timeout = max(0.0, retries[0][0] - time.monotonic())
+                finished, _ = concurrent.futures.wait(
+                    futures,
+                    timeout=timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+
+                for future in finished:
+                    item, attempt = futures.pop(future)
+                    retry_at = self._handle_result(future, item, attempt, journal)
+                    if retry_at is not None:
+                        heapq.heappush(retries, (retry_at, attempt + 1, item))
+                    elif progress:
                         progress.advance(task_id)
 
+    def _handle_result(self, future, item, attempt, journal) -> Optional[float]:
+        """Journals a finished item; returns when to retry it, if at all."""
+        try:
+            future.result()
+        except Exception as e:
+            if isinstance(e, TRANSIENT_ERRORS) and attempt < self.max_retries:
+                delay = self.backoff * (2**attempt)
+                logger.warning(f"Retrying '{item}' in {delay:.0f}s: {e}")
+                return time.monotonic() + delay
+            logger.error(f"Error downloading '{item}': {e}")
+            if journal:
+                journal.record(item, "failed", str(e))
+            return None
+
+        if journal:
+            journal.record(item, "done")
+        return None
+
     def _process_line(self, line, output_dir):
         # Format: <browser> <url_or_id>
         parts = line.split(maxsplit=1)
@@ -80,10 +223,8 @@ class BatchProcessor:
             logger.warning(f"Unsupported browser in batch file: '{browser}'")
             return
 
-        try:
-            extension_id = downloader.extract_id(url_or_id)
-            logger.info(f"Batch: Downloading {browser} extension {extension_id}...")
-            # Disable individual progress bars in batch mode
-            downloader.download(extension_id, output_dir, show_progress=False)
-        except Exception as e:
-            logger.error(f"Error downloading {browser} extension '{url_or_id}': {e}")
+        extension_id = downloader.extract_id(url_or_id)
+        logger.info(f"Batch: Downloading {browser} extension {extension_id}...")
+        # Disable individual progress bars in batch mode; errors propagate so
+        # the processor can retry and journal them
+        downloader.download(extension_id, output_dir, show_progress=False)
@@ -1,9 +1,11 @@
 import json
 import io
 import re
+import hashlib
+import concurrent.futures
 import jsbeautifier
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Set, Tuple, Optional
 from pathlib import Path
 from PIL import Image
 from fetchext.utils  import open_extension_archive
@@ -20,7 +22,116 @@ class DiffReport:
     image_changes: List[Dict[str, Any]] = field(default_factory=list)
 
 
+@dataclass
+class TimelineEvent:
+    version: str
+    change: str  # "added", "modified", "removed"
+    old: Any = None  # Manifest values only
+    new: Any = None
+
+
+@dataclass
+class TimelineReport:
+    versions: List[str]
+    # File path -> events, first appearance included
+    files: Dict[str, List[TimelineEvent]] = field(default_factory=dict)
+    # Manifest key -> changes between consecutive versions
+    manifest: Dict[str, List[TimelineEvent]] = field(default_factory=dict)
+
+
+# Below this many bytes of JS to beautify, a worker pool costs more than it saves
+PARALLEL_MIN_BYTES = 256 * 1024
+
+# Perceptual hashes are HASH_SIZE x HASH_SIZE bits. Images whose hashes
+# differ in more than PERCEPTUAL_THRESHOLD bits look different.
+HASH_SIZE = 8
+PERCEPTUAL_THRESHOLD = 10
+
+SINGLE_LINE_COMMENT = re.compile(r"//.*")
+MULTI_LINE_COMMENT = re.compile(r"/\*[\s\S]*?\*/")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def _strip_whitespace(text: str) -> str:
+    return "".join(text.split())
+
+
+def _normalize_js(text: str) -> str:
+    """Beautifies JS and strips comments and blank lines."""
+    opts = jsbeautifier.default_options()
+    opts.indent_size = 2
+    text = jsbeautifier.beautify(text, opts)
+
+    # Strip comments (simple regex approach)
+    text = SINGLE_LINE_COMMENT.sub("", text)
+    text = MULTI_LINE_COMMENT.sub("", text)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return "\n".join(lines)
+
+
+def _normalized_js_digest(text: str) -> str:
+    """Worker entry point; returns a digest so only hashes cross processes."""
+    return _digest(_normalize_js(text))
+
+
+def perceptual_hash(img: Image.Image) -> Optional[int]:
+    """
+    64-bit difference hash (dHash) of an image, or None if it can't be decoded.
+
+    JPEGs are decoded at reduced scale via draft mode, which changes the
+    size and mode of img in place; read its metadata first. Transparent
+    pixels are flattened onto white so icons hash by what is visible.
+    """
+    try:
+        img.draft("RGB", (HASH_SIZE * 4, HASH_SIZE * 4))
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            background = Image.new("RGBA", img.size, "white")
+            img = Image.alpha_composite(background, img.convert("RGBA"))
+        small = img.convert("L").resize(
+            (HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS
+        )
+        pixels = small.tobytes()
+
+        value = 0
+        for row in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1)
+            for col in range(HASH_SIZE):
+                value = value << 1 | (pixels[offset + col + 1] > pixels[offset + col])
+        return value
+    except Exception:
+        return None
+
+
+def _image_info(img: Image.Image) -> Dict[str, Any]:
+    """Header metadata of an image, as compared by the diff."""
+    return {"size": img.size, "mode": img.mode, "format": img.format}
+
+
+def _hash_distance(old: Optional[int], new: Optional[int]) -> Optional[int]:
+    if old is None or new is None:
+        return None
+    return (old ^ new).bit_count()
+
+
 class ExtensionDiffer:
+    """
+    Compares two extension versions.
+
+    Modified entries are read and decoded once. Normalized forms (whitespace
+    stripped, beautified JS) are cached by content hash for the lifetime of
+    the differ, so entries shared between comparisons (e.g. consecutive
+    version pairs) are normalized once. JS beautification runs on a process
+    pool when there is enough of it to pay for the workers.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        # (mode, content sha256) -> sha256 of normalized text
+        self._normalized: Dict[Tuple[str, str], str] = {}
+
     def diff(
         self,
         old_path: Path,
@@ -44,8 +155,7 @@ class ExtensionDiffer:
 
             added = []
             removed = []
-            modified = []
-            image_changes = []
+            changed = []
 
             all_files = set(old_files.keys()) | set(new_files.keys())
 
@@ -55,67 +165,25 @@ class ExtensionDiffer:
                 elif filename not in new_files:
                     removed.append(filename)
                 else:
-                    # Check modification
+                    # Compare CRC32
                     old_info = old_files[filename]
                     new_info = new_files[filename]
-
-                    # Compare CRC32
                     if (
                         old_info.CRC != new_info.CRC
                         or old_info.file_size != new_info.file_size
                     ):
-                        # Content changed
-                        is_modified = True
-
-                        # Check whitespace if requested
-                        if ignore_whitespace and self._is_text_file(filename):
-                            try:
-                                old_content = old_zf.read(filename).decode(
-                                    "utf-8", errors="ignore"
-                                )
-                                new_content = new_zf.read(filename).decode(
-                                    "utf-8", errors="ignore"
-                                )
-                                if self._compare_text_ignore_whitespace(
-                                    old_content, new_content
-                                ):
-                                    is_modified = False
-                            except Exception:
-                                pass  # Fallback to binary diff
-
-                        # Check AST diff if requested
-                        if (
-                            ast_diff
-                            and is_modified
-                            and filename.lower().endswith(".js")
-                        ):
-                            try:
-                                old_content = old_zf.read(filename).decode(
-                                    "utf-8", errors="ignore"
-                                )
-                                new_content = new_zf.read(filename).decode(
-                                    "utf-8", errors="ignore"
-                                )
-                                if self._compare_js_ast(old_content, new_content):
-                                    is_modified = False
-                            except Exception:
-                                pass
-
-                        # Check image changes
-                        if is_modified and self._is_image_file(filename):
-                            try:
-                                img_diff = self._compare_images(
-                                    old_zf.read(filename), new_zf.read(filename)
-                                )
-                                if img_diff:
-                                    image_changes.append(
-                                        {"file": filename, "diff": img_diff}
-                                    )
-                            except Exception:
-                                pass
-
-                        if is_modified:
-                            modified.append(filename)
+                        changed.append(filename)
+
+            # Content changed; drop entries whose normalized text is identical
+            unchanged = self._equivalent_texts(
+                old_zf, new_zf, changed, ignore_whitespace, ast_diff
+            )
+            modified = [name for name in changed if name not in unchanged]
+
+            # Check image changes
+            image_changes = self._compare_image_files(
+                old_zf, new_zf, [f for f in modified if self._is_image_file(f)]
+            )
 
             return DiffReport(
                 old_version=old_manifest.get("version", "unknown"),
@@ -127,6 +195,163 @@ class ExtensionDiffer:
                 image_changes=image_changes,
             )
 
+    def timeline(self, paths: List[Path]) -> TimelineReport:
+        """
+        Builds the change history of a sequence of versions, oldest first.
+
+        Each archive is opened once and only its central directory and
+        manifest are read. Every entry's (CRC32, size) chain is walked once
+        across all versions, so adjacent pairs share the work instead of
+        being diffed independently.
+        """
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            snapshots = list(executor.map(self._snapshot, paths))
+
+        labels = [
+            str(manifest.get("version") or path.stem)
+            for path, (manifest, _) in zip(paths, snapshots)
+        ]
+        # Rebuilds may share a version number
+        for i, label in enumerate(labels):
+            if labels.count(label) > 1:
+                labels[i] = f"{label} ({paths[i].name})"
+
+        report = TimelineReport(versions=labels)
+        files: Dict[str, List[TimelineEvent]] = {}
+        previous_manifest = None
+        previous_entries: Dict[str, Tuple[int, int]] = {}
+
+        for label, (manifest, entries) in zip(labels, snapshots):
+            for name, fingerprint in entries.items():
+                before = previous_entries.get(name)
+                if before is None:
+                    files.setdefault(name, []).append(TimelineEvent(label, "added"))
+                elif before != fingerprint:
+                    files[name].append(TimelineEvent(label, "modified"))
+            for name in previous_entries.keys() - entries.keys():
+                files[name].append(TimelineEvent(label, "removed"))
+
+            if previous_manifest is not None:
+                changes = self._diff_manifests(previous_manifest, manifest)
+                for key in sorted(changes):
+                    old, new = changes[key]
+                    if key not in previous_manifest:
+                        change = "added"
+                    elif key not in manifest:
+                        change = "removed"
+                    else:
+                        change = "modified"
+                    report.manifest.setdefault(key, []).append(
+                        TimelineEvent(label, change, old, new)
+                    )
+
+            previous_manifest = manifest
+            previous_entries = entries
+
+        report.files = {name: files[name] for name in sorted(files)}
+        return report
+
+    def _snapshot(self, path: Path) -> Tuple[Dict, Dict[str, Tuple[int, int]]]:
+        """Returns the manifest and entry name -> (CRC32, size) of an archive."""
+        with open_extension_archive(path) as zf:
+            entries = {
+                info.filename: (info.CRC, info.file_size)
+                for info in zf.infolist()
+                if not info.is_dir()
+            }
+            return self._read_manifest(zf), entries
+
+    def _equivalent_texts(
+        self,
+        old_zf,
+        new_zf,
+        changed: List[str],
+        ignore_whitespace: bool,
+        ast_diff: bool,
+    ) -> Set[str]:
+        """Returns the changed files whose contents are equivalent."""
+        equivalent = set()
+        # filename -> ((old digest, old text), (new digest, new text))
+        pending_ast = {}
+
+        for filename in changed:
+            check_whitespace = ignore_whitespace and self._is_text_file(filename)
+            check_ast = ast_diff and filename.lower().endswith(".js")
+            if not (check_whitespace or check_ast):
+                continue
+
+            try:
+                # Each entry is inflated and decoded once for all comparisons
+                pair = tuple(self._read_text(zf, filename) for zf in (old_zf, new_zf))
+            except Exception:
+                continue  # Fallback to binary diff
+
+            if check_whitespace and self._same_normalized(
+                "whitespace", pair, _strip_whitespace
+            ):
+                equivalent.add(filename)
+            elif check_ast:
+                pending_ast[filename] = pair
+
+        # Beautify each distinct content once, in parallel for large diffs
+        texts = {
+            digest: text
+            for pair in pending_ast.values()
+            for digest, text in pair
+            if ("js", digest) not in self._normalized
+        }
+        for digest, normalized in self._normalize_js_texts(texts).items():
+            self._normalized[("js", digest)] = normalized
+
+        for filename, ((old_digest, _), (new_digest, _)) in pending_ast.items():
+            old_js = self._normalized.get(("js", old_digest))
+            if old_js is not None and old_js == self._normalized.get(
+                ("js", new_digest)
+            ):
+                equivalent.add(filename)
+
+        return equivalent
+
+    def _read_text(self, zf, filename: str) -> Tuple[str, str]:
+        data = zf.read(filename)
+        return hashlib.sha256(data).hexdigest(), data.decode("utf-8", errors="ignore")
+
+    def _same_normalized(self, mode: str, pair, normalize) -> bool:
+        results = []
+        for digest, text in pair:
+            key = (mode, digest)
+            if key not in self._normalized:
+                self._normalized[key] = _digest(normalize(text))
+            results.append(self._normalized[key])
+        return results[0] == results[1]
+
+    def _normalize_js_texts(self, texts: Dict[str, str]) -> Dict[str, str]:
+        """Returns content digest -> normalized digest; failures are omitted."""
+        results = {}
+        if sum(len(text) for text in texts.values()) < PARALLEL_MIN_BYTES:
+            for digest, text in texts.items():
+                try:
+                    results[digest] = _normalized_js_digest(text)
+                except Exception:
+                    pass
+            return results
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            futures = {
+                executor.submit(_normalized_js_digest, text): digest
+                for digest, text in texts.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception:
+                    pass
+        return results
+
     def _read_manifest(self, zf) -> Dict:
         try:
             return json.loads(zf.read("manifest.json"))
@@ -159,31 +384,11 @@ class ExtensionDiffer:
 
     def _compare_text_ignore_whitespace(self, old: str, new: str) -> bool:
         """Returns True if texts are identical ignoring whitespace."""
-        return "".join(old.split()) == "".join(new.split())
+        return _strip_whitespace(old) == _strip_whitespace(new)
 
     def _compare_js_ast(self, old: str, new: str) -> bool:
         """Returns True if JS code is semantically identical (ignoring comments/formatting)."""
-        opts = jsbeautifier.default_options()
-        opts.indent_size = 2
-
-        # Beautify both
-        old_beautified = jsbeautifier.beautify(old, opts)
-        new_beautified = jsbeautifier.beautify(new, opts)
-
-        # Strip comments (simple regex approach)
-        def strip_comments(text):
-            # Remove single line comments
-            text = re.sub(r"//.*", "", text)
-            # Remove multi-line comments
-            text = re.sub(r"/\*[\s\S]*?\*/", "", text)
-            # Remove empty lines
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            return "\n".join(lines)
-
-        old_clean = strip_comments(old_beautified)
-        new_clean = strip_comments(new_beautified)
-
-        return old_clean == new_clean
+        return _normalize_js(old) == _normalize_js(new)
 
     def _compare_images(
         self, old_bytes: bytes, new_bytes: bytes
@@ -192,16 +397,71 @@ class ExtensionDiffer:
         try:
             old_img = Image.open(io.BytesIO(old_bytes))
             new_img = Image.open(io.BytesIO(new_bytes))
-
+        except Exception:
+            return None
+        # Metadata before hashing: draft mode shrinks the decoded image
+        old_info, new_info = _image_info(old_img), _image_info(new_img)
+        distance = _hash_distance(perceptual_hash(old_img), perceptual_hash(new_img))
+        return self._image_diff(old_info, new_info, distance)
+
+    def _compare_image_files(self, old_zf, new_zf, filenames: List[str]) -> List[Dict]:
+        """
+        Compares image metadata and perceptual hashes of modified images.
+
+        Images are opened lazily, so metadata only needs the header. Hashes
+        are computed on a thread pool (Pillow releases the GIL while decoding
+        and resampling) and cached by content hash.
+        """
+        # filename -> (old info, old digest, new info, new digest)
+        opened = {}
+        # Content digest -> image whose hash is not cached yet
+        to_hash = {}
+        for filename in filenames:
+            try:
+                pair = []
+                for zf in (old_zf, new_zf):
+                    data = zf.read(filename)
+                    digest = hashlib.sha256(data).hexdigest()
+                    img = Image.open(io.BytesIO(data))
+                    # Metadata before hashing: draft mode shrinks the image
+                    pair.extend((_image_info(img), digest))
+                    if ("phash", digest) not in self._normalized:
+                        to_hash.setdefault(digest, img)
+                opened[filename] = pair
+            except Exception:
+                continue
+
+        if to_hash:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers
+            ) as executor:
+                hashes = executor.map(perceptual_hash, to_hash.values())
+                for digest, value in zip(to_hash, hashes):
+                    self._normalized[("phash", digest)] = value
+
+        image_changes = []
+        for filename, (old_info, old_digest, new_info, new_digest) in opened.items():
+            distance = _hash_distance(
+                self._normalized[("phash", old_digest)],
+                self._normalized[("phash", new_digest)],
+            )
+            img_diff = self._image_diff(old_info, new_info, distance)
+            if img_diff:
+                image_changes.append({"file": filename, "diff": img_diff})
+        return image_changes
+
+    def _image_diff(
+        self, old_info: Dict, new_info: Dict, distance: Optional[int]
+    ) -> Optional[Dict]:
+        """Metadata differences, plus the perceptual distance if significant."""
+        try:
             diff = {}
-            if old_img.size != new_img.size:
-                diff["size"] = f"{old_img.size} -> {new_img.size}"
-
-            if old_img.mode != new_img.mode:
-                diff["mode"] = f"{old_img.mode} -> {new_img.mode}"
+            for key in ("size", "mode", "format"):
+                if old_info[key] != new_info[key]:
+                    diff[key] = f"{old_info[key]} -> {new_info[key]}"
 
-            if old_img.format != new_img.format:
-                diff["format"] = f"{old_img.format} -> {new_img.format}"
+            if distance is not None and distance > PERCEPTUAL_THRESHOLD:
+                diff["perceptual_distance"] = distance
 
             return diff if diff else None
         except Exception:
@@ -1,7 +1,8 @@
 import logging
 import concurrent.futures
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple, Set
+from typing import Dict, List, Optional, Tuple
 from rich.progress import (
     Progress,
     SpinnerColumn,
@@ -13,9 +14,16 @@ from rich.progress import (
 from fetchext.interface.console  import console
 from fetchext.downloaders  import ChromeDownloader, EdgeDownloader, FirefoxDownloader
 from fetchext.security.inspector  import ExtensionInspector
+from fetchext.data.mirror_state  import MirrorState, SyncRecord
+from fetchext.utils  import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
+BROWSER_ALIASES = {"c": "chrome", "e": "edge", "f": "firefox"}
+
+# Synced records are written to the state file in batches of this size
+STATE_BATCH = 32
+
 
 class MirrorManager:
     def sync(
@@ -25,7 +33,17 @@ class MirrorManager:
         prune: bool = False,
         workers: int = 4,
         show_progress: bool = True,
+        max_age: int = 0,
     ):
+        """
+        Syncs output_dir with the extensions in list_path.
+
+        Filenames, versions and hashes are kept in a state file inside
+        output_dir, so local archives are never opened to find their version.
+        The state is saved in batches as items complete, so an interrupted
+        sync keeps its progress. Items checked within the last max_age
+        seconds are not checked again.
+        """
         list_path = Path(list_path)
         output_dir = Path(output_dir)
 
@@ -39,27 +57,38 @@ class MirrorManager:
         items = self._parse_list(list_path)
         logger.info(f"Syncing {len(items)} items to {output_dir}...")
 
-        processed_ids = set()
-
-        if show_progress:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TimeRemainingColumn(),
-                console=console,
-                transient=True,
-            ) as progress:
-                task_id = progress.add_task("Syncing...", total=len(items))
-                processed_ids = self._run_sync(
-                    items, output_dir, workers, progress, task_id
+        with MirrorState(output_dir) as state:
+            records = state.load()
+
+            if show_progress:
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    TaskProgressColumn(),
+                    TimeRemainingColumn(),
+                    console=console,
+                    transient=True,
+                ) as progress:
+                    task_id = progress.add_task("Syncing...", total=len(items))
+                    synced = self._run_sync(
+                        items,
+                        output_dir,
+                        workers,
+                        progress,
+                        task_id,
+                        records,
+                        max_age,
+                        state,
+                    )
+            else:
+                synced = self._run_sync(
+                    items, output_dir, workers, None, None, records, max_age, state
                 )
-        else:
-            processed_ids = self._run_sync(items, output_dir, workers, None, None)
 
-        if prune:
-            self._prune(output_dir, processed_ids)
+            if prune:
+                self._prune(output_dir, synced)
+                state.remove(key for key in records if key not in synced)
 
     def _parse_list(self, list_path: Path) -> List[Tuple[str, str]]:
         items = []
@@ -70,80 +99,159 @@ class MirrorManager:
                     continue
                 parts = line.split(maxsplit=1)
                 if len(parts) == 2:
-                    items.append((parts[0].lower(), parts[1]))
+                    browser = parts[0].lower()
+                    items.append((BROWSER_ALIASES.get(browser, browser), parts[1]))
                 else:
                     logger.warning(f"Invalid line: {line}")
         return items
 
-    def _run_sync(self, items, output_dir, workers, progress, task_id) -> Set[str]:
-        processed_ids = set()
+    def _run_sync(
+        self,
+        items,
+        output_dir,
+        workers,
+        progress,
+        task_id,
+        records=None,
+        max_age=0,
+        state: Optional[MirrorState] = None,
+    ) -> Dict[Tuple[str, str], Optional[SyncRecord]]:
+        """
+        Returns (browser, id) -> current record of every synced item.
+        Records are saved to state in batches as they complete.
+        """
+        records = records or {}
+        synced = {}
+        batch = []
         with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
             futures = {
-                executor.submit(self._sync_item, browser, url, output_dir): (
+                executor.submit(
+                    self._sync_item, browser, url, output_dir, records, max_age
+                ): (
                     browser,
                     url,
                 )
                 for browser, url in items
             }
 
-            for future in concurrent.futures.as_completed(futures):
-                browser, url = futures[future]
-                try:
-                    ext_id = future.result()
-                    if ext_id:
-                        processed_ids.add(ext_id)
-                except Exception as e:
-                    logger.error(f"Error syncing {browser} {url}: {e}")
-                finally:
-                    if progress:
-                        progress.advance(task_id)
-        return processed_ids
-
-    def _sync_item(self, browser, url, output_dir):
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    browser, url = futures[future]
+                    try:
+                        result = future.result()
+                        if result:
+                            ext_id, record = result
+                            synced[(browser, ext_id)] = record
+                            if record is not None:
+                                batch.append(record)
+                    except Exception as e:
+                        logger.error(f"Error syncing {browser} {url}: {e}")
+                    finally:
+                        if progress:
+                            progress.advance(task_id)
+
+                    if state and len(batch) >= STATE_BATCH:
+                        state.save(batch)
+                        batch = []
+            finally:
+                # Also reached on interruption: completed items are kept
+                if state:
+                    state.save(batch)
+        return synced
+
+    def _sync_item(
+        self, browser, url, output_dir, records=None, max_age=0
+    ) -> Optional[Tuple[str, Optional[SyncRecord]]]:
         downloader = self._get_downloader(browser)
         if not downloader:
             return None
 
         ext_id = downloader.extract_id(url)
+        record = (records or {}).get((browser, ext_id))
+
+        if record and not (output_dir / record.filename).exists():
+            logger.debug(f"{ext_id}: {record.filename} missing locally.")
+            record = None
+        if record is None:
+            record = self._adopt_existing(browser, ext_id, output_dir)
+
+        if record is None:
+            logger.debug(f"{ext_id}: Missing locally.")
+            return ext_id, self._download(downloader, browser, ext_id, output_dir)
 
-        # Determine expected filename pattern
-        # This is a heuristic. Ideally we'd know the exact filename.
-        # But downloaders usually save as {id}.crx or {id}.xpi
-        suffix = ".xpi" if browser in ["firefox", "f"] else ".crx"
-        filename = f"{ext_id}{suffix}"
-        file_path = output_dir / filename
+        if record.is_fresh(max_age):
+            logger.debug(f"{ext_id}: Checked recently, skipping.")
+            return ext_id, record
 
-        should_download = False
+        try:
+            remote_version = downloader.get_latest_version(ext_id)
+        except Exception as e:
+            logger.warning(
+                f"Could not check update for {ext_id}: {e}. Skipping update check."
+            )
+            return ext_id, record
 
+        if remote_version and remote_version != record.version:
+            logger.info(
+                f"{ext_id}: Update available ({record.version} -> {remote_version})"
+            )
+            updated = self._download(
+                downloader, browser, ext_id, output_dir, remote_version
+            )
+            if updated.filename != record.filename:
+                # Versioned names (AMO) would otherwise pile up
+                (output_dir / record.filename).unlink(missing_ok=True)
+            return ext_id, updated
+
+        logger.debug(f"{ext_id}: Up to date.")
+        record.last_checked = _now()
+        return ext_id, record
+
+    def _adopt_existing(self, browser, ext_id, output_dir) -> Optional[SyncRecord]:
+        """
+        Builds a record for an archive mirrored before the state file existed.
+        Such archives are named after the extension ID.
+        """
+        suffix = ".xpi" if browser == "firefox" else ".crx"
+        file_path = output_dir / f"{ext_id}{suffix}"
         if not file_path.exists():
-            should_download = True
-            logger.debug(f"{ext_id}: Missing locally.")
-        else:
-            # Check for update
+            return None
+
+        version = None
+        try:
+            version = ExtensionInspector().get_manifest(file_path).get("version")
+        except Exception as e:
+            logger.debug(f"Could not read version of {file_path.name}: {e}")
+        return SyncRecord(
+            browser,
+            ext_id,
+            file_path.name,
+            version=version,
+            sha256=compute_file_hash(file_path),
+        )
+
+    def _download(
+        self, downloader, browser, ext_id, output_dir, version=None
+    ) -> SyncRecord:
+        file_path = Path(downloader.download(ext_id, output_dir, show_progress=False))
+        if version is None:
             try:
-                remote_version = downloader.get_latest_version(ext_id)
-                if remote_version:
-                    # Get local version
-                    inspector = ExtensionInspector()
-                    manifest = inspector.get_manifest(file_path)
-                    local_version = manifest.get("version")
-
-                    if local_version != remote_version:
-                        should_download = True
-                        logger.info(
-                            f"{ext_id}: Update available ({local_version} -> {remote_version})"
-                        )
-                    else:
-                        logger.debug(f"{ext_id}: Up to date.")
+                version = ExtensionInspector().get_manifest(file_path).get("version")
             except Exception as e:
-                logger.warning(
-                    f"Could not check update for {ext_id}: {e}. Skipping update check."
-                )
-
-        if should_download:
-            downloader.download(ext_id, output_dir, show_progress=False)
+                logger.debug(f"Could not read version of {file_path.name}: {e}")
 
-        return ext_id
+        validators = getattr(downloader.client, "last_validators", None)
+        if not isinstance(validators, dict):
+            validators = {}
+        return SyncRecord(
+            browser,
+            ext_id,
+            file_path.name,
+            version=version,
+            sha256=compute_file_hash(file_path),
+            etag=validators.get("etag"),
+            last_checked=_now(),
+        )
 
     def _get_downloader(self, browser):
         if browser in ["chrome", "c"]:
@@ -154,16 +262,23 @@ class MirrorManager:
             return FirefoxDownloader()
         return None
 
-    def _prune(self, output_dir, valid_ids):
+    def _prune(self, output_dir, synced):
+        """Removes archives that do not belong to a synced item."""
         logger.info("Pruning extraneous files...")
+        keep = {r.filename for r in synced.values() if r is not None}
+        valid_ids = {ext_id for _, ext_id in synced}
+
         count = 0
         for file_path in output_dir.iterdir():
             if file_path.suffix not in [".crx", ".xpi"]:
                 continue
 
-            file_id = file_path.stem
-            if file_id not in valid_ids:
+            if file_path.name not in keep and file_path.stem not in valid_ids:
                 logger.info(f"Pruning {file_path.name}")
                 file_path.unlink()
                 count += 1
         logger.info(f"Pruned {count} files.")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -1,9 +1,222 @@
+import io
+import os
+import math
+import hashlib
 import logging
+import sqlite3
+import time
+import concurrent.futures
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from fetchext.utils  import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+# Bump when the encoder settings change
+CACHE_VERSION = 1
+
+# Optimized outputs kept in the cache, least recently used evicted first
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+# Images larger than this many pixels are estimated from a center crop
+SAMPLE_PIXELS = 256 * 256
+
+STATUS_OPTIMIZED = "optimized"
+STATUS_NO_GAIN = "no_gain"
+
+
+def get_optimize_cache_path() -> Path:
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "fext" / "optimize.db"
+    return Path.home() / ".cache" / "fext" / "optimize.db"
+
+
+class OptimizeCache:
+    """
+    Optimization results keyed by input SHA-256 and encoder settings.
+
+    Stores the optimized bytes, or a "no gain" marker for images that cannot
+    be made smaller. Optimized outputs are also recorded as "no gain", so
+    files optimized once are skipped on later runs. Stored outputs are kept
+    under max_size bytes by evicting the least recently used ones.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_size: int = CACHE_MAX_SIZE):
+        self.db_path = db_path or get_optimize_cache_path()
+        self.max_size = max_size
+        self.conn = self._get_connection()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            self._init_db(conn)
+        except (OSError, sqlite3.Error) as e:
+            # Read-only or virtual filesystems: keep working without persistence
+            logger.debug(f"Optimize cache unavailable at {self.db_path}: {e}")
+            conn = sqlite3.connect(":memory:")
+            self._init_db(conn)
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    sha256 TEXT,
+                    settings TEXT,
+                    status TEXT,
+                    output BLOB,
+                    size INTEGER,
+                    used_at REAL,
+                    PRIMARY KEY (sha256, settings)
+                )
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(
+        self, digests: List[str], settings: str
+    ) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Returns digest -> (status, optimized size) without loading outputs."""
+        found = {}
+        # Stay below SQLite's bound parameter limit
+        for i in range(0, len(digests), 500):
+            batch = digests[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT sha256, status, size FROM results "
+                f"WHERE settings = ? AND sha256 IN ({placeholders})",
+                [settings, *batch],
+            )
+            for digest, status, size in rows:
+                found[digest] = (status, size)
+        return found
+
+    def get_output(self, digest: str, settings: str) -> Optional[bytes]:
+        """Returns the stored optimized bytes, or None if not (or no longer) cached."""
+        row = self.conn.execute(
+            "SELECT output FROM results WHERE sha256 = ? AND settings = ? "
+            "AND status = ?",
+            (digest, settings, STATUS_OPTIMIZED),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE results SET used_at = ? WHERE sha256 = ? AND settings = ?",
+                (time.time(), digest, settings),
+            )
+        return row[0]
+
+    def put(self, digest: str, output: Optional[bytes], settings: str):
+        """Records digest -> optimized bytes, or None for "no gain"."""
+        now = time.time()
+        rows = []
+        if output is None:
+            rows.append((digest, settings, STATUS_NO_GAIN, None, None, now))
+        else:
+            rows.append((digest, settings, STATUS_OPTIMIZED, output, len(output), now))
+            rows.append(
+                (
+                    hashlib.sha256(output).hexdigest(),
+                    settings,
+                    STATUS_NO_GAIN,
+                    None,
+                    None,
+                    now,
+                )
+            )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(sha256, settings, status, output, size, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        if output is not None:
+            self._evict()
+
+    def _evict(self):
+        (total,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results WHERE output IS NOT NULL"
+        ).fetchone()
+        excess = total - self.max_size
+        if excess <= 0:
+            return
+
+        evicted = []
+        for digest, settings, size in self.conn.execute(
+            "SELECT sha256, settings, size FROM results WHERE output IS NOT NULL "
+            "ORDER BY used_at, rowid"
+        ):
+            if excess <= 0:
+                break
+            evicted.append((digest, settings))
+            excess -= size
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM results WHERE sha256 = ? AND settings = ?", evicted
+            )
+
+
+def _image_format(img, path: Path) -> Optional[str]:
+    # Determine format from extension if not available
+    fmt = img.format
+    if not fmt:
+        suffix = path.suffix.lower()
+        if suffix in [".jpg", ".jpeg"]:
+            fmt = "JPEG"
+        elif suffix == ".png":
+            fmt = "PNG"
+    return fmt
+
+
+def _encode(img, fmt: str, quality: int) -> bytes:
+    # We just re-save in the same format with optimization
+    save_kwargs = {"optimize": True}
+    if fmt == "JPEG":
+        save_kwargs["quality"] = quality
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **save_kwargs)
+    return buffer.getvalue()
+
+
+def _encode_image(path: Path, quality: int) -> Optional[bytes]:
+    """Re-encodes an image in memory; None if the format is unsupported."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        fmt = _image_format(img, path)
+        if not fmt:
+            return None
+        return _encode(img, fmt, quality)
+
+
+def _optimize_task(path_str: str, quality: int) -> Optional[bytes]:
+    """Runs in a worker process; returns the smaller encoding, if any."""
+    path = Path(path_str)
+    data = _encode_image(path, quality)
+    if data is not None and len(data) < path.stat().st_size:
+        return data
+    return None
+
+
+def _replace_contents(path: Path, data: bytes):
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_bytes(data)
+    temp_path.replace(path)
+
 
 def optimize_image(path: Path, quality: int = 85) -> Tuple[bool, int, int]:
     """
@@ -20,63 +233,90 @@ def optimize_image(path: Path, quality: int = 85) -> Tuple[bool, int, int]:
         - int: New file size in bytes.
     """
     try:
-        from PIL import Image
-
         original_size = path.stat().st_size
 
-        # Open image
-        with Image.open(path) as img:
-            # Convert to RGB if necessary (e.g. for PNG to JPG conversion, though we keep format here)
-            # For now, we just re-save in the same format with optimization
-
-            # Determine format from extension if not available
-            fmt = img.format
-            if not fmt:
-                suffix = path.suffix.lower()
-                if suffix in [".jpg", ".jpeg"]:
-                    fmt = "JPEG"
-                elif suffix == ".png":
-                    fmt = "PNG"
-                else:
-                    return False, original_size, original_size
-
-            # Save to a temporary buffer or file to check size
-            # We'll overwrite directly for this tool as per requirements,
-            # but let's be safe and save to a temp path first
-            temp_path = path.with_suffix(path.suffix + ".tmp")
-
-            save_kwargs = {"optimize": True}
-            if fmt == "JPEG":
-                save_kwargs["quality"] = quality
-
-            img.save(temp_path, format=fmt, **save_kwargs)
-
-            new_size = temp_path.stat().st_size
-
-            if new_size < original_size:
-                temp_path.replace(path)
-                logger.debug(
-                    f"Optimized {path.name}: {original_size} -> {new_size} bytes"
-                )
-                return True, original_size, new_size
-            else:
-                # If no saving, remove temp file
-                temp_path.unlink()
-                logger.debug(f"Skipped {path.name}: No size reduction")
-                return False, original_size, original_size
+        # Encode in memory; the file is only written when it gets smaller
+        data = _encode_image(path, quality)
+        if data is not None and len(data) < original_size:
+            _replace_contents(path, data)
+            logger.debug(f"Optimized {path.name}: {original_size} -> {len(data)} bytes")
+            return True, original_size, len(data)
+
+        logger.debug(f"Skipped {path.name}: No size reduction")
+        return False, original_size, original_size
 
     except Exception as e:
         logger.error(f"Failed to optimize {path}: {e}")
         return False, 0, 0
 
 
-def optimize_extension(directory: Path, quality: int = 85) -> Dict[str, any]:
+def estimate_image(path: Path, quality: int = 85) -> Tuple[int, int]:
+    """
+    Estimates the optimized size of an image without writing anything.
+
+    Small images are re-encoded in full. Larger ones are estimated from the
+    encoded size of a center crop of about SAMPLE_PIXELS pixels, scaled to
+    the full image.
+
+    Returns (original_size, estimated_size).
+    """
+    from PIL import Image
+
+    original_size = path.stat().st_size
+    with Image.open(path) as img:
+        fmt = _image_format(img, path)
+        if not fmt:
+            return original_size, original_size
+
+        width, height = img.size
+        pixels = width * height
+        if pixels <= SAMPLE_PIXELS:
+            estimate = len(_encode(img, fmt, quality))
+        else:
+            scale = math.sqrt(SAMPLE_PIXELS / pixels)
+            crop_w = max(1, int(width * scale))
+            crop_h = max(1, int(height * scale))
+            left = (width - crop_w) // 2
+            top = (height - crop_h) // 2
+            sample = img.crop((left, top, left + crop_w, top + crop_h))
+            sample_size = len(_encode(sample, fmt, quality))
+            estimate = int(sample_size * pixels / (crop_w * crop_h))
+
+    return original_size, min(original_size, estimate)
+
+
+def _settings_key(quality: int) -> str:
+    try:
+        import PIL
+
+        pil_version = PIL.__version__
+    except ImportError:
+        pil_version = ""
+    return f"{CACHE_VERSION}:{quality}:{pil_version}"
+
+
+def optimize_extension(
+    directory: Path,
+    quality: int = 85,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    cache: Optional[OptimizeCache] = None,
+) -> Dict[str, any]:
     """
     Optimize all images in an extension directory.
 
+    Images are re-encoded on a process pool and each file is written as
+    soon as its result arrives. Results are cached by content hash, so
+    images optimized (or found incompressible) before are skipped without
+    decoding, and identical images are encoded once. Dry runs use cached
+    results where available and estimate the rest.
+
     Args:
         directory: Path to the extension directory (unpacked).
         quality: Quality setting for optimization.
+        dry_run: Only estimate the savings, without modifying files.
+        workers: Number of worker processes (default: CPU count).
+        cache: Result cache (default: the user cache).
 
     Returns:
         Dict containing statistics about the optimization run.
@@ -84,6 +324,7 @@ def optimize_extension(directory: Path, quality: int = 85) -> Dict[str, any]:
     stats = {
         "total_files": 0,
         "optimized_files": 0,
+        "cached_files": 0,
         "original_size": 0,
         "new_size": 0,
         "saved_bytes": 0,
@@ -93,19 +334,149 @@ def optimize_extension(directory: Path, quality: int = 85) -> Dict[str, any]:
         logger.error(f"Directory not found: {directory}")
         return stats
 
-    image_extensions = {".png", ".jpg", ".jpeg"}
+    files = sorted(
+        p
+        for p in directory.rglob("*")
+        if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file()
+    )
+    stats["total_files"] = len(files)
+    workers = workers or os.cpu_count() or 4
 
-    for file_path in directory.rglob("*"):
-        if file_path.is_file() and file_path.suffix.lower() in image_extensions:
-            stats["total_files"] += 1
-            success, orig, new = optimize_image(file_path, quality)
+    settings = _settings_key(quality)
+    paths_by_digest = {}
+    for path in files:
+        paths_by_digest.setdefault(compute_file_hash(path), []).append(path)
 
-            stats["original_size"] += orig
-            if success:
-                stats["optimized_files"] += 1
-                stats["new_size"] += new
-            else:
-                stats["new_size"] += orig
+    owns_cache = cache is None
+    cache = cache or OptimizeCache()
+    try:
+        known = cache.lookup(list(paths_by_digest), settings)
+        if dry_run:
+            stats["estimated"] = True
+            _estimate_cached(paths_by_digest, known, quality, workers, stats)
+        else:
+            _optimize_cached(paths_by_digest, known, settings, cache, stats)
+            missing = {
+                digest: paths[0]
+                for digest, paths in paths_by_digest.items()
+                if digest not in known
+            }
+            for digest, output, ok in _optimize_files(missing, quality, workers):
+                if ok:
+                    # Failures are not cached, so the file is retried next run
+                    cache.put(digest, output, settings)
+                _apply_output(paths_by_digest[digest], output, stats)
+    finally:
+        if owns_cache:
+            cache.close()
 
     stats["saved_bytes"] = stats["original_size"] - stats["new_size"]
     return stats
+
+
+def _optimize_cached(
+    paths_by_digest: Dict[str, List[Path]],
+    known: Dict[str, Tuple[str, Optional[int]]],
+    settings: str,
+    cache: OptimizeCache,
+    stats: Dict,
+):
+    """Applies cached results, loading one output at a time."""
+    for digest, (status, _) in list(known.items()):
+        output = None
+        if status == STATUS_OPTIMIZED:
+            output = cache.get_output(digest, settings)
+            if output is None:
+                # Evicted since the lookup: encode it again
+                del known[digest]
+                continue
+        stats["cached_files"] += len(paths_by_digest[digest])
+        _apply_output(paths_by_digest[digest], output, stats)
+
+
+def _apply_output(paths: List[Path], output: Optional[bytes], stats: Dict):
+    for path in paths:
+        original_size = path.stat().st_size
+        stats["original_size"] += original_size
+        if output is None:
+            stats["new_size"] += original_size
+            continue
+        try:
+            _replace_contents(path, output)
+        except OSError as e:
+            logger.error(f"Failed to write {path}: {e}")
+            stats["new_size"] += original_size
+            continue
+        stats["optimized_files"] += 1
+        stats["new_size"] += len(output)
+
+
+def _optimize_files(
+    files: Dict[str, Path], quality: int, workers: int
+) -> Iterator[Tuple[str, Optional[bytes], bool]]:
+    """
+    Encodes files on a process pool. Yields (digest, smaller bytes or None,
+    ok) as results complete; ok is False if encoding failed.
+    """
+    if not files:
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_optimize_task, str(path), quality): digest
+            for digest, path in files.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            # Drop the reference so each output is freed once written
+            digest = futures.pop(future)
+            try:
+                yield digest, future.result(), True
+            except Exception as e:
+                logger.error(f"Failed to optimize {files[digest]}: {e}")
+                yield digest, None, False
+
+
+def _estimate_cached(
+    paths_by_digest: Dict[str, List[Path]],
+    known: Dict[str, Tuple[str, Optional[int]]],
+    quality: int,
+    workers: int,
+    stats: Dict,
+):
+    """Counts cached results exactly and estimates the remaining images."""
+    to_estimate = []
+    for digest, paths in paths_by_digest.items():
+        if digest not in known:
+            to_estimate.extend(paths)
+            continue
+        status, size = known[digest]
+        for path in paths:
+            original_size = path.stat().st_size
+            stats["cached_files"] += 1
+            stats["original_size"] += original_size
+            if status == STATUS_OPTIMIZED and size < original_size:
+                stats["optimized_files"] += 1
+                stats["new_size"] += size
+            else:
+                stats["new_size"] += original_size
+    _estimate_files(to_estimate, quality, workers, stats)
+
+
+def _estimate_files(files: List[Path], quality: int, workers: int, stats: Dict):
+    if not files:
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(estimate_image, path, quality): path for path in files
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                original_size, estimate = future.result()
+            except Exception as e:
+                logger.error(f"Failed to estimate {futures[future]}: {e}")
+                continue
+            stats["original_size"] += original_size
+            stats["new_size"] += estimate
+            if estimate < original_size:
+                stats["optimized_files"] += 1
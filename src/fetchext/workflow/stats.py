@@ -1,11 +1,10 @@
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Counter
-import json
 from rich.console import Console
 from rich.table import Table
 from rich.progress import track
-from fetchext.utils  import open_extension_archive
+from fetchext.data.manifest_index  import ManifestIndex, ManifestRecord
 
 
 @dataclass
@@ -24,46 +23,49 @@ class RepoAnalyzer:
         stats = RepoStats()
         # Find all CRX and ZIP files
         files = list(directory.glob("*.crx")) + list(directory.glob("*.zip"))
+        if not files:
+            return stats
 
-        # Use track for progress bar
-        for file_path in track(files, description="Scanning repository..."):
-            stats.total_files += 1
-            stats.total_size_bytes += file_path.stat().st_size
-
-            try:
-                with open_extension_archive(file_path) as zf:
-                    try:
-                        manifest_data = zf.read("manifest.json")
-                        manifest = json.loads(manifest_data)
-
-                        mv = manifest.get("manifest_version", 0)
-                        if mv == 2:
-                            stats.mv2_count += 1
-                        elif mv == 3:
-                            stats.mv3_count += 1
-
-                        # Parse permissions
-                        for perm in manifest.get("permissions", []):
-                            # Heuristic: if it looks like a URL pattern, treat as host permission
-                            if "://" in perm or perm == "<all_urls>":
-                                stats.host_permissions[perm] += 1
-                            else:
-                                stats.permissions[perm] += 1
-
-                        # Parse host_permissions (MV3 specific)
-                        if "host_permissions" in manifest:
-                            for perm in manifest["host_permissions"]:
-                                stats.host_permissions[perm] += 1
-
-                    except (KeyError, json.JSONDecodeError):
-                        stats.errors.append(
-                            f"{file_path.name}: Invalid/Missing manifest"
-                        )
-            except Exception as e:
-                stats.errors.append(f"{file_path.name}: {str(e)}")
+        # Use track for progress bar; only archives changed since the last
+        # scan are opened, the rest come from the manifest index
+        with ManifestIndex(directory) as index:
+            records = index.refresh(track(files, description="Scanning repository..."))
+
+        for record in records:
+            self._add_record(stats, record)
 
         return stats
 
+    def _add_record(self, stats: RepoStats, record: ManifestRecord):
+        stats.total_files += 1
+        stats.total_size_bytes += record.size
+
+        if record.manifest is None:
+            stats.errors.append(f"{record.filename}: {record.error}")
+            return
+
+        self._add_manifest(stats, record.manifest)
+
+    def _add_manifest(self, stats: RepoStats, manifest: dict):
+        mv = manifest.get("manifest_version", 0)
+        if mv == 2:
+            stats.mv2_count += 1
+        elif mv == 3:
+            stats.mv3_count += 1
+
+        # Parse permissions
+        for perm in manifest.get("permissions", []):
+            # Heuristic: if it looks like a URL pattern, treat as host permission
+            if "://" in perm or perm == "<all_urls>":
+                stats.host_permissions[perm] += 1
+            else:
+                stats.permissions[perm] += 1
+
+        # Parse host_permissions (MV3 specific)
+        if "host_permissions" in manifest:
+            for perm in manifest["host_permissions"]:
+                stats.host_permissions[perm] += 1
+
 
 def print_stats(stats: RepoStats):
     console = Console()
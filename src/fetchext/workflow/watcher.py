@@ -1,6 +1,12 @@
+import os
 import time
 import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import Dict, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from fetchext.interface.console  import console
@@ -8,31 +14,186 @@ from fetchext.core.core  import extract_extension, generate_report, scan_extensi
 
 logger = logging.getLogger(__name__)
 
+EXTENSION_SUFFIXES = (".crx", ".xpi", ".zip")
+
+DEFAULT_WORKERS = 2
+# Seconds without events (and with unchanged size) before a file counts as
+# written when no close-write event arrives
+SETTLE_SECONDS = 1.0
+POLL_INTERVAL = 0.2
+
+
+@dataclass
+class _PendingFile:
+    deadline: float
+    closed: bool = False
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+
 
 class ExtensionEventHandler(FileSystemEventHandler):
     """
     Handles file system events for the directory watcher.
+
+    Events only mark a path as pending, so the observer thread never blocks.
+    A scheduler thread hands pending files to a worker pool once they are
+    completely written: on a close-write or move event, or once their size
+    and mtime stop changing. Repeated events for a path collapse into one
+    pending entry, and at most max_pending files are queued or running.
     """
 
-    def __init__(self, actions=None):
+    def __init__(
+        self,
+        actions=None,
+        workers=DEFAULT_WORKERS,
+        settle=SETTLE_SECONDS,
+        max_pending=None,
+    ):
         self.actions = actions or []
+        self.settle = settle
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="fext-watch"
+        )
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        self.lock = threading.Lock()
+        self.pending: Dict[Path, _PendingFile] = {}
+        self.active = set()
+        self._stopped = threading.Event()
+        self._scheduler = None
 
     def on_created(self, event):
+        self._queue(event)
+
+    def on_modified(self, event):
+        self._queue(event)
+
+    def on_closed(self, event):
+        self._queue(event, closed=True)
+
+    def on_moved(self, event):
+        # Writers commonly rename a finished temporary file into place
+        self._queue(event, path=event.dest_path, closed=True)
+
+    def _queue(self, event, path=None, closed=False):
         if event.is_directory:
             return
 
-        file_path = Path(event.src_path)
-        if file_path.suffix.lower() in [".crx", ".xpi", ".zip"]:
-            console.print_info(f"New extension detected: {file_path.name}")
-            self.process_file(file_path)
+        file_path = Path(path or event.src_path)
+        if file_path.suffix.lower() not in EXTENSION_SUFFIXES:
+            return
+
+        deadline = time.monotonic() + (0 if closed else self.settle)
+        with self.lock:
+            entry = self.pending.get(file_path)
+            if entry is None:
+                self.pending[file_path] = _PendingFile(deadline, closed)
+                console.print_info(f"New extension detected: {file_path.name}")
+            else:
+                entry.deadline = deadline
+                entry.closed = closed
+
+    def start(self):
+        self._stopped.clear()
+        self._scheduler = threading.Thread(
+            target=self._run_scheduler, name="fext-watch-scheduler", daemon=True
+        )
+        self._scheduler.start()
+
+    def stop(self, wait=True):
+        """
+        Stops scheduling. With wait, pending files that are completely
+        written are processed before returning; any others are logged as
+        dropped.
+        """
+        self._stopped.set()
+        if self._scheduler:
+            self._scheduler.join()
+        if wait:
+            self._drain()
+
+        with self.lock:
+            dropped = sorted(path.name for path in self.pending)
+            self.pending.clear()
+        if dropped:
+            logger.warning(
+                f"Watcher stopped with {len(dropped)} unprocessed files: "
+                f"{', '.join(dropped)}"
+            )
+        self.executor.shutdown(wait=wait)
+
+    def _drain(self):
+        """Submits every complete pending file, waiting for free slots."""
+        now = time.monotonic()
+        with self.lock:
+            paths = [path for path in self.pending if path not in self.active]
+
+        for path in paths:
+            if self._is_complete(path, now):
+                self.slots.acquire()
+                self._submit(path)
+
+    def _run_scheduler(self):
+        while not self._stopped.wait(POLL_INTERVAL):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Watcher scheduler error: {e}")
+
+    def poll(self):
+        """Submits pending files that are completely written, as slots allow."""
+        now = time.monotonic()
+        with self.lock:
+            due = [
+                path
+                for path, entry in self.pending.items()
+                if entry.deadline <= now and path not in self.active
+            ]
+
+        for path in due:
+            if not self._is_complete(path, now):
+                continue
+            # Backpressure: leave the rest pending until a worker frees up
+            if not self.slots.acquire(blocking=False):
+                break
+            self._submit(path)
+
+    def _submit(self, path):
+        with self.lock:
+            self.pending.pop(path, None)
+            self.active.add(path)
+        future = self.executor.submit(self.process_file, path)
+        future.add_done_callback(partial(self._finished, path))
+
+    def _is_complete(self, path, now) -> bool:
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Removed or renamed before it was processed
+            with self.lock:
+                self.pending.pop(path, None)
+            return False
+
+        with self.lock:
+            entry = self.pending.get(path)
+            if entry is None:
+                return False
+            stat = (st.st_size, st.st_mtime_ns)
+            if entry.closed or (entry.size, entry.mtime_ns) == stat:
+                return True
+            # Still growing, or first look: check again after another settle
+            entry.size, entry.mtime_ns = stat
+            entry.deadline = now + self.settle
+            return False
+
+    def _finished(self, path, future):
+        with self.lock:
+            self.active.discard(path)
+        self.slots.release()
 
     def process_file(self, file_path):
         """
         Process the new file based on configured actions.
         """
-        # Wait a brief moment for file write to complete
-        time.sleep(1.0)
-
         try:
             if "extract" in self.actions:
                 console.print_info(f"Extracting {file_path.name}...")
@@ -57,17 +218,25 @@ class DirectoryWatcher:
     Monitors a directory for new extensions.
     """
 
-    def __init__(self, directory, actions=None):
+    def __init__(
+        self, directory, actions=None, workers=DEFAULT_WORKERS, settle=SETTLE_SECONDS
+    ):
         self.directory = Path(directory)
         self.actions = actions or []
+        self.workers = workers
+        self.settle = settle
         self.observer = Observer()
+        self.event_handler = None
 
     def start(self):
         if not self.directory.exists():
             raise FileNotFoundError(f"Directory not found: {self.directory}")
 
-        event_handler = ExtensionEventHandler(self.actions)
-        self.observer.schedule(event_handler, str(self.directory), recursive=False)
+        self.event_handler = ExtensionEventHandler(
+            self.actions, workers=self.workers, settle=self.settle
+        )
+        self.event_handler.start()
+        self.observer.schedule(self.event_handler, str(self.directory), recursive=False)
         self.observer.start()
 
         console.print_success(f"Watching {self.directory} for new extensions...")
@@ -85,4 +254,6 @@ class DirectoryWatcher:
     def stop(self):
         self.observer.stop()
         self.observer.join()
+        if self.event_handler:
+            self.event_handler.stop()
         console.print_info("Watcher stopped.")
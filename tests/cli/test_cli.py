@@ -73,6 +73,7 @@ class TestCLI:
                 ast_diff=False,
                 visual=False,
                 output_path=None,
+                context=3,
             )
 
     def test_diff_visual_command(self):
@@ -103,6 +104,32 @@ class TestCLI:
             assert kwargs["visual"] is True
             assert str(kwargs["output_path"]) == "report.html"
 
+    def test_diff_timeline_command(self):
+        with (
+            patch.object(
+                sys,
+                "argv",
+                ["fext", "diff", "--timeline", "v1.crx", "v2.crx", "v3.crx"],
+            ),
+            patch("fetchext.core.core.diff_timeline") as mock_timeline,
+        ):
+            with pytest.raises(SystemExit) as excinfo:
+                main()
+            assert excinfo.value.code == 0
+            mock_timeline.assert_called_once_with(
+                ["v1.crx", "v2.crx", "v3.crx"], json_output=False
+            )
+
+    def test_diff_requires_two_files(self):
+        with (
+            patch.object(sys, "argv", ["fext", "diff", "old.crx"]),
+            patch("fetchext.core.core.diff_extensions") as mock_diff,
+        ):
+            with pytest.raises(SystemExit) as excinfo:
+                main()
+            assert excinfo.value.code == 1
+            mock_diff.assert_not_called()
+
     def test_risk_command(self):
         with (
             patch.object(sys, "argv", ["fext", "risk", "test.crx"]),
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from fetchext.commands.query import handle_query
@@ -9,28 +10,51 @@ def mock_history():
         yield mock.return_value
 
 
-def test_query_json(mock_history, capsys):
+def make_args(**kwargs):
     args = MagicMock()
     args.sql = "SELECT * FROM history"
-    args.json = True
+    args.json = False
+    args.jsonl = False
     args.csv = False
+    args.limit = None
+    args.offset = 0
+    args.write = False
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
 
-    mock_history.execute_query.return_value = [{"id": 1, "action": "download"}]
+def test_query_json(mock_history, capsys):
+    args = make_args(json=True)
+
+    mock_history.stream_query.return_value = (["id", "action"], iter([(1, "download")]))
 
     handle_query(args)
 
     captured = capsys.readouterr()
     assert '"id": 1' in captured.out
     assert '"action": "download"' in captured.out
+    assert json.loads(captured.out) == [{"id": 1, "action": "download"}]
+
+
+def test_query_jsonl(mock_history, capsys):
+    args = make_args(jsonl=True)
+
+    mock_history.stream_query.return_value = (
+        ["id", "action"],
+        iter([(1, "download"), (2, "extract")]),
+    )
+
+    handle_query(args)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["action"] for line in lines] == ["download", "extract"]
 
 
 def test_query_csv(mock_history, capsys):
-    args = MagicMock()
-    args.sql = "SELECT * FROM history"
-    args.json = False
-    args.csv = True
+    args = make_args(csv=True)
 
-    mock_history.execute_query.return_value = [{"id": 1, "action": "download"}]
+    mock_history.stream_query.return_value = (["id", "action"], iter([(1, "download")]))
 
     handle_query(args)
 
@@ -40,12 +64,9 @@ def test_query_csv(mock_history, capsys):
 
 
 def test_query_table(mock_history, capsys):
-    args = MagicMock()
-    args.sql = "SELECT * FROM history"
-    args.json = False
-    args.csv = False
+    args = make_args()
 
-    mock_history.execute_query.return_value = [{"id": 1, "action": "download"}]
+    mock_history.stream_query.return_value = (["id", "action"], iter([(1, "download")]))
 
     handle_query(args)
 
@@ -57,11 +78,21 @@ def test_query_table(mock_history, capsys):
     assert "1 rows returned" in captured.out
 
 
+def test_query_pagination_and_mode(mock_history):
+    args = make_args(limit=10, offset=20, write=True)
+    mock_history.stream_query.return_value = ([], iter(()))
+
+    handle_query(args)
+
+    mock_history.stream_query.assert_called_once_with(
+        "SELECT * FROM history", limit=10, offset=20, read_only=False
+    )
+
+
 def test_query_error(mock_history, capsys):
-    args = MagicMock()
-    args.sql = "SELECT * FROM invalid"
+    args = make_args(sql="SELECT * FROM invalid")
 
-    mock_history.execute_query.side_effect = Exception("Table not found")
+    mock_history.stream_query.side_effect = Exception("Table not found")
 
     with pytest.raises(SystemExit):
         handle_query(args)
@@ -1,5 +1,5 @@
 from pathlib import Path
-from fetchext.analysis.api_usage import analyze_api_usage
+from fetchext.analysis.api_usage import analyze_api_usage, iter_api_calls
 
 
 def test_analyze_api_usage_directory(fs):
@@ -76,3 +76,11 @@ def test_analyze_api_usage_archive(fs):
 
     assert results["total_calls"] == 1
     assert results["api_counts"]["chrome.tabs.query"] == 1
+
+
+def test_iter_api_calls():
+    data = b"chrome.runtime.id;\n\nbrowser.tabs.create({});\nxchrome.tabs"
+    assert list(iter_api_calls(data)) == [
+        (1, "chrome", "runtime", "id"),
+        (3, "browser", "tabs", "create"),
+    ]
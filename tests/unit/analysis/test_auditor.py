@@ -93,3 +93,28 @@ def test_audit_code_scan():
         messages = [i.message for i in report.issues]
         assert any("chrome.browserAction is deprecated" in m for m in messages)
         assert any("chrome.webRequest blocking is limited" in m for m in messages)
+
+
+def test_audit_code_scan_line_numbers():
+    zf = MagicMock()
+    manifest = {"manifest_version": 3}
+    code = (
+        b"// setup\n"
+        b"chrome.tabs.query({});\n"
+        b"chrome.pageAction.show(1); chrome.pageAction.hide(1);\n"
+        b"\n"
+        b"chrome.webRequest.onBeforeRequest.addListener();\n"
+        b"chrome.webRequestBlocking; chrome.actionX();"
+    )
+    zf.read.side_effect = (
+        lambda name: json.dumps(manifest).encode() if name == "manifest.json" else code
+    )
+    zf.namelist.return_value = ["manifest.json", "script.js"]
+
+    with patch("fetchext.security.auditor.open_extension_archive") as mock_open:
+        mock_open.return_value.__enter__.return_value = zf
+        report = ExtensionAuditor().audit("dummy.crx")
+
+    code_issues = [(i.line, i.severity) for i in report.issues if i.file == "script.js"]
+    # Prefixes match: webRequestBlocking is flagged like webRequest
+    assert code_issues == [(3, "warning"), (5, "info"), (6, "info")]
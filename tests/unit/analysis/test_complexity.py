@@ -1,9 +1,16 @@
 import pytest
+import hashlib
 import zipfile
 import concurrent.futures
 from unittest.mock import patch
 from pathlib import Path
-from fetchext.analysis.complexity import analyze_complexity
+from fetchext.analysis.complexity import (
+    ComplexityCache,
+    analyze_complexity,
+    balance_chunks,
+)
+from fetchext.security.fingerprints import FingerprintDB
+from fetchext.utils import is_minified
 
 
 def test_analyze_complexity_zip(fs):
@@ -63,3 +70,77 @@ def test_analyze_complexity_empty(fs):
 def test_analyze_complexity_not_found(fs):
     with pytest.raises(FileNotFoundError):
         analyze_complexity(Path("/nonexistent.zip"))
+
+
+def _minified_js(functions=200):
+    return ";".join(
+        f"function f{i}(a,b){{if(a){{return b}}return a+b}}" for i in range(functions)
+    )
+
+
+def test_is_minified():
+    assert is_minified(_minified_js().encode())
+    assert not is_minified(b"function foo() {\n    return 1;\n}\n" * 200)
+    # Small files are never treated as minified
+    assert not is_minified(b"function f(){return 1}")
+
+
+def test_analyze_complexity_skips_minified_and_vendor(fs):
+    vendor = b"/*! lib v1 */ function lib() { return 1; }"
+    zip_path = Path("/test.zip")
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("app.js", "function foo() { return 1; }")
+        zf.writestr("bundle.min.js", _minified_js())
+        zf.writestr("lib/vendor.js", vendor)
+
+    fingerprints = FingerprintDB(sources=[])
+    fingerprints.entries[hashlib.sha256(vendor).hexdigest()] = {
+        "name": "lib",
+        "version": "1",
+    }
+
+    with patch(
+        "fetchext.analysis.complexity.concurrent.futures.ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    ):
+        results = analyze_complexity(zip_path, fingerprints=fingerprints)
+        assert results["total_functions"] == 1
+        assert results["skipped_files"] == [
+            {"file": "bundle.min.js", "reason": "minified"},
+            {"file": "lib/vendor.js", "reason": "vendor (lib 1)"},
+        ]
+
+        results = analyze_complexity(
+            zip_path, fingerprints=fingerprints, include_minified=True
+        )
+        assert results["total_functions"] == 201
+
+
+def test_analyze_complexity_uses_cache(fs):
+    zip_path = Path("/test.zip")
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("a.js", "function foo() { return 1; }")
+        # Identical content is analyzed once and reported per file
+        zf.writestr("b.js", "function foo() { return 1; }")
+
+    cache = ComplexityCache(Path("/cache/complexity.db"))
+    with patch(
+        "fetchext.analysis.complexity.concurrent.futures.ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    ):
+        first = analyze_complexity(zip_path, cache=cache)
+        with patch("fetchext.analysis.complexity._analyze_chunk") as mock_chunk:
+            second = analyze_complexity(zip_path, cache=cache)
+        mock_chunk.assert_not_called()
+
+    assert first["total_functions"] == 2
+    assert second == first
+
+
+def test_balance_chunks():
+    sizes = {"a": 100, "b": 60, "c": 50, "d": 10}
+    chunks = balance_chunks(sizes, 2)
+    loads = sorted(sum(sizes[k] for k in chunk) for chunk in chunks)
+    assert loads == [110, 110]
+    assert sorted(k for chunk in chunks for k in chunk) == ["a", "b", "c", "d"]
+    assert balance_chunks({"a": 1}, 8) == [["a"]]
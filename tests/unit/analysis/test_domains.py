@@ -1,5 +1,11 @@
 from pathlib import Path
-from fetchext.analysis.domains import extract_domains_from_text, analyze_domains
+from fetchext.analysis.domains import (
+    analyze_domains,
+    extract_domains_from_text,
+    extract_urls,
+    group_by_registrable_domain,
+)
+from fetchext.analysis.public_suffix import PublicSuffixTrie
 from zipfile import ZipFile
 
 
@@ -40,3 +46,79 @@ def test_analyze_domains_zip(fs):
     assert "api.github.com" in results["domains"]
     assert "cdn.site.com" in results["domains"]
     assert "https://api.github.com/users" in results["urls"]
+
+
+def test_extract_urls_deduplicates_bytes():
+    data = b"a('https://x.com/a'); b('https://x.com/a'); c(\"wss://y.org\")"
+
+    assert extract_urls(data) == {b"https://x.com/a", b"wss://y.org"}
+
+
+def test_group_by_registrable_domain():
+    groups = group_by_registrable_domain(
+        [
+            "api.github.com",
+            "github.com",
+            "cdn.bbc.co.uk",
+            "user.github.io",
+            "localhost:8080",
+            "user:pw@www.bbc.co.uk",
+        ]
+    )
+
+    assert groups == {
+        "bbc.co.uk": ["cdn.bbc.co.uk", "user:pw@www.bbc.co.uk"],
+        "github.com": ["api.github.com", "github.com"],
+        "localhost": ["localhost:8080"],
+        "user.github.io": ["user.github.io"],
+    }
+
+
+def test_registrable_domain_rules():
+    trie = PublicSuffixTrie(["co.uk", "*.ck", "!www.ck"])
+
+    assert trie.registrable_domain("a.b.example.co.uk") == "example.co.uk"
+    assert trie.registrable_domain("co.uk") is None
+    assert trie.registrable_domain("shop.example.com") == "example.com"
+    assert trie.registrable_domain("a.b.foo.ck") == "b.foo.ck"
+    assert trie.registrable_domain("www.ck") == "www.ck"
+    assert trie.registrable_domain("10.0.0.1") == "10.0.0.1"
+
+
+def test_analyze_domains_groups(fs):
+    zip_path = Path("test.zip")
+    with ZipFile(zip_path, "w") as zf:
+        for i in range(10):
+            zf.writestr(f"s{i}.js", f"fetch('https://s{i}.example.com/x');")
+
+    results = analyze_domains(zip_path, show_progress=False)
+
+    assert len(results["domains"]) == 10
+    assert list(results["groups"]) == ["example.com"]
+
+
+def test_analyze_domains_process_pool(tmp_path):
+    import concurrent.futures
+    from unittest.mock import patch
+
+    zip_path = tmp_path / "test.zip"
+    with ZipFile(zip_path, "w") as zf:
+        for i in range(10):
+            zf.writestr(f"js/{i}.js", f"fetch('https://api{i}.example.com/v1');")
+        zf.writestr("skip.js", "fetch('https://vendor.example.com');")
+
+    # Worker processes cannot see patched modules; threads behave the same
+    with (
+        patch("fetchext.analysis.domains.PROCESS_POOL_MIN_BYTES", 0),
+        patch("fetchext.analysis.domains.CHUNK_BYTES", 100),
+        patch(
+            "fetchext.analysis.domains.ProcessPoolExecutor",
+            concurrent.futures.ThreadPoolExecutor,
+        ),
+    ):
+        results = analyze_domains(
+            zip_path, show_progress=False, max_workers=2, skip_paths={"skip.js"}
+        )
+
+    assert results["domains"] == [f"api{i}.example.com" for i in range(10)]
+    assert list(results["groups"]) == ["example.com"]
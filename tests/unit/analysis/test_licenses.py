@@ -1,5 +1,9 @@
 from pathlib import Path
-from fetchext.analysis.licenses import scan_licenses, _detect_license_from_text
+from fetchext.analysis.licenses import (
+    LicenseMatcher,
+    scan_licenses,
+    _detect_license_from_text,
+)
 
 
 def test_detect_license_mit():
@@ -63,3 +67,29 @@ def test_scan_licenses_package_json(fs):
 
     assert "MIT" in results
     assert "package.json" in results["MIT"]
+
+
+def test_detect_license_reflowed_comment():
+    text = """/*
+     * Permission is hereby granted, free of charge,
+     * to any person obtaining a copy of this software
+     */"""
+    assert _detect_license_from_text(text) == "MIT"
+
+
+def test_detect_license_prefers_most_matching_phrases():
+    text = (
+        "This program is free software; you can redistribute it under the terms of "
+        "the GNU General Public License as published by the Free Software "
+        "Foundation; either version 2 of the License, or (at your option) any "
+        "later version."
+    )
+    assert _detect_license_from_text(text) == "GPL-2.0"
+
+
+def test_license_matcher_custom_fingerprints():
+    matcher = LicenseMatcher({"Custom": ["Licensed under the Example Public License"]})
+    assert (
+        matcher.match(b"// licensed  under the\n// example public license") == "Custom"
+    )
+    assert matcher.match(b"no match here") is None
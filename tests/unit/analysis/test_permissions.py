@@ -9,7 +9,7 @@ def test_generate_permission_matrix(tmp_path):
 
     generator = PermissionMatrixGenerator()
 
-    with patch("fetchext.analysis.permissions.ExtensionInspector") as MockInspector:
+    with patch("fetchext.data.manifest_index.ExtensionInspector") as MockInspector:
         inspector = MockInspector.return_value
 
         def get_manifest_side_effect(path):
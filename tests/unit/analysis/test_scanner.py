@@ -1,5 +1,8 @@
+import hashlib
+import json
 import pytest
 from unittest.mock import Mock, MagicMock
+from fetchext.security.fingerprints import FingerprintDB
 from fetchext.security.scanner import DependencyScanner
 
 
@@ -84,3 +87,67 @@ def test_scan_filename_detection(tmp_path, mock_open_archive):
     assert lib.name == "jquery"
     assert lib.version == "3.4.1"
     assert lib.vulnerable is True
+
+
+def test_scan_fingerprint_match(tmp_path, mock_open_archive):
+    f = tmp_path / "ext.crx"
+    f.touch()
+
+    content = b"!function(e){/* minified, no banner */}(window);"
+    digest = hashlib.sha256(content).hexdigest()
+    fingerprints = FingerprintDB(sources=[])
+    fingerprints.entries = {
+        digest: {"name": "lodash", "version": "4.17.20", "file": "lodash.min.js"}
+    }
+
+    zf = MagicMock()
+    zf.namelist.return_value = ["vendor/l.js", "app.js"]
+    vendor_file = Mock()
+    vendor_file.read.return_value = content
+    app_file = Mock()
+    app_file.read.return_value = b"console.log('app');"
+    zf.open.return_value.__enter__.side_effect = [vendor_file, app_file]
+    mock_open_archive.return_value.__enter__.return_value = zf
+
+    report = DependencyScanner(fingerprints).scan(f)
+
+    assert len(report.libraries) == 1
+    lib = report.libraries[0]
+    assert (lib.name, lib.version, lib.path) == ("lodash", "4.17.20", "vendor/l.js")
+    assert lib.vulnerable is True
+    assert lib.known_vendor is True
+    assert report.vendor_paths == {"vendor/l.js"}
+
+
+def test_fingerprint_advisories_override():
+    content = b"lib"
+    fingerprints = FingerprintDB(sources=[])
+    fingerprints.entries = {
+        hashlib.sha256(content).hexdigest(): {
+            "name": "somelib",
+            "version": "9.9.9",
+            "advisories": ["CVE-2024-0001", "CVE-2024-0002"],
+        }
+    }
+
+    lib = DependencyScanner(fingerprints)._lookup_fingerprint("x.js", content)
+
+    assert lib.vulnerable is True
+    assert lib.advisory == "CVE-2024-0001; CVE-2024-0002"
+
+
+def test_fingerprint_db_sources(tmp_path):
+    first = tmp_path / "community.json"
+    first.write_text(
+        json.dumps({"fingerprints": {"AA": {"name": "a", "version": "1"}}})
+    )
+    second = tmp_path / "local.json"
+    second.write_text(
+        json.dumps({"fingerprints": {"aa": {"name": "a", "version": "2"}}})
+    )
+
+    db = FingerprintDB(sources=[first, second, tmp_path / "missing.json"])
+
+    assert db.lookup("aa") == {"name": "a", "version": "2"}
+    # Built-in entries are always present
+    assert len(db) > 1
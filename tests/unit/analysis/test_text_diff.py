@@ -0,0 +1,74 @@
+import difflib
+import random
+from fetchext.analysis.text_diff import diff_sequences, group_opcodes, tokenize
+
+
+def _apply(a, b, opcodes):
+    """Rebuilds b from a and opcodes, checking that they tile both sides."""
+    result = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        result.extend(b[j1:j2])
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+def test_diff_sequences_identical():
+    a = ["a", "b", "c"]
+    assert diff_sequences(a, list(a)) == [("equal", 0, 3, 0, 3)]
+
+
+def test_diff_sequences_opcodes():
+    a = ["a", "b", "c", "d"]
+    b = ["a", "x", "c", "d", "e"]
+    assert diff_sequences(a, b) == [
+        ("equal", 0, 1, 0, 1),
+        ("replace", 1, 2, 1, 2),
+        ("equal", 2, 4, 2, 4),
+        ("insert", 4, 4, 4, 5),
+    ]
+
+
+def test_diff_sequences_random_edits():
+    rng = random.Random(0)
+    for _ in range(500):
+        a = [rng.choice("abcde") for _ in range(rng.randint(0, 30))]
+        b = list(a)
+        for _ in range(rng.randint(0, 6)):
+            pos = rng.randint(0, len(b))
+            if rng.random() < 0.5 and b:
+                del b[min(pos, len(b) - 1)]
+            else:
+                b.insert(pos, rng.choice("abcxyz"))
+        assert _apply(a, b, diff_sequences(a, b)) == b
+        # Exceeding the edit budget degrades to a replace, never a wrong diff
+        assert _apply(a, b, diff_sequences(a, b, max_cost=1)) == b
+
+
+def test_diff_sequences_anchors_on_unique_lines():
+    a = ["}", "function a() {", "}", "function b() {", "}"]
+    b = ["}", "function b() {", "}", "function a() {", "}"]
+    opcodes = diff_sequences(a, b)
+    assert _apply(a, b, opcodes) == b
+    assert sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == "equal") == 3
+
+
+def test_group_opcodes_matches_difflib():
+    a = [f"line {i}" for i in range(50)]
+    b = list(a)
+    b[5] = "changed"
+    b[40:42] = ["new"]
+    expected = list(difflib.SequenceMatcher(None, a, b).get_grouped_opcodes(3))
+    assert list(group_opcodes(diff_sequences(a, b), 3)) == expected
+
+
+def test_group_opcodes_no_changes():
+    assert list(group_opcodes(diff_sequences(["a"], ["a"]))) == []
+
+
+def test_tokenize():
+    assert tokenize("a.b(1,  2)") == ["a", ".", "b", "(", "1", ",", "  ", "2", ")"]
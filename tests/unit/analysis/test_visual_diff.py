@@ -82,3 +82,105 @@ def test_is_text():
     assert generator._is_text("test.js")
     assert generator._is_text("test.json")
     assert not generator._is_text("test.png")
+
+
+def _write_zip(path, files):
+    import zipfile
+
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+
+
+def _report(modified):
+    return DiffReport(old_version="1.0", new_version="2.0", modified_files=modified)
+
+
+def test_text_diff_shows_hunks_with_context(tmp_path):
+    old = "\n".join(f"line {i}" for i in range(100))
+    new = old.replace("line 50", "line fifty")
+    _write_zip(tmp_path / "old.zip", {"a.js": old})
+    _write_zip(tmp_path / "new.zip", {"a.js": new})
+
+    output = tmp_path / "diff.html"
+    VisualDiffGenerator(context=2).generate(
+        _report(["a.js"]), tmp_path / "old.zip", tmp_path / "new.zip", output
+    )
+    content = output.read_text()
+
+    assert "@@ -49,5 +49,5 @@" in content
+    assert "line fifty" in content
+    assert "line 48" in content and "line 47" not in content
+    assert "line 52" in content and "line 53" not in content
+
+
+def test_minified_file_uses_token_diff(tmp_path):
+    old = ";".join(f"function f{i}(a,b){{return a+b}}" for i in range(500))
+    new = old.replace(
+        "function f250(a,b){return a+b}", "function f250(a,b){return a-b}"
+    )
+    _write_zip(tmp_path / "old.zip", {"app.min.js": old})
+    _write_zip(tmp_path / "new.zip", {"app.min.js": new})
+
+    output = tmp_path / "diff.html"
+    VisualDiffGenerator().generate(
+        _report(["app.min.js"]), tmp_path / "old.zip", tmp_path / "new.zip", output
+    )
+    content = output.read_text()
+
+    assert "<del>+</del><ins>-</ins>" in content
+    # Only the surroundings of the change are rendered, not the whole line
+    assert len(content) < len(old)
+
+
+def test_large_files_use_line_diff(tmp_path):
+    text = "\n".join(f"line {i}" for i in range(2000))
+    minified = ";".join(f"function f{i}(a,b){{return a+b}}" for i in range(500))
+    old_files = {"a.txt": text, "app.min.js": minified}
+    new_files = {
+        "a.txt": text.replace("line 1000", "line one thousand"),
+        "app.min.js": minified.replace(
+            "f250(a,b){return a+b}", "f250(a,b){return a-b}"
+        ),
+    }
+    _write_zip(tmp_path / "old.zip", old_files)
+    _write_zip(tmp_path / "new.zip", new_files)
+
+    output = tmp_path / "diff.html"
+    with patch("fetchext.analysis.visual_diff.MAX_DIFF_INPUT", 1024):
+        VisualDiffGenerator(context=1).generate(
+            _report(sorted(old_files)),
+            tmp_path / "old.zip",
+            tmp_path / "new.zip",
+            output,
+        )
+    content = output.read_text()
+
+    assert "too large" not in content
+    assert "line one thousand" in content and "line 1002" not in content
+    # Minified input is diffed statement by statement
+    assert "<td>+</td><td>function f250(a,b){return a-b}</td>" in content
+    assert "f100(" not in content
+
+
+def test_size_budgets(tmp_path):
+    old = "\n".join(f"line {i}" for i in range(2000))
+    new = "\n".join(f"changed {i}" for i in range(2000))
+    files = {f"f{i}.txt": old for i in range(3)}
+    _write_zip(tmp_path / "old.zip", files)
+    _write_zip(tmp_path / "new.zip", {name: new for name in files})
+
+    output = tmp_path / "diff.html"
+    generator = VisualDiffGenerator(max_file_size=10_000, max_report_size=15_000)
+    generator.generate(
+        _report(sorted(files)), tmp_path / "old.zip", tmp_path / "new.zip", output
+    )
+    content = output.read_text()
+
+    assert content.count("Diff truncated") == 2
+    assert "1 more modified files omitted" in content
+    assert content.rstrip().endswith("</html>")
+    # Truncated tables are closed before the note
+    assert content.count("<table") == content.count("</table>") == 2
+    for note in content.split("Diff truncated")[:-1]:
+        assert note.rindex("</table></div>") > note.rindex("<table")
@@ -91,3 +91,84 @@ def test_scan_archive(mock_yara_compile):
                     assert "malware.js" in results
                     assert len(results["malware.js"]) == 1
                     assert results["malware.js"][0]["rule"] == "TestRule"
+
+
+def test_compiled_rules_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    rules_path = tmp_path / "rules.yar"
+    rules_path.write_text("rule Test { condition: true }")
+
+    mock_yara = MagicMock()
+    mock_yara.Error = type("Error", (Exception,), {})
+    mock_yara.compile.return_value.save.side_effect = lambda path: Path(
+        path
+    ).write_bytes(b"compiled")
+
+    with patch.dict("sys.modules", {"yara": mock_yara}):
+        YaraScanner(rules_path)
+        mock_yara.compile.assert_called_once()
+        mock_yara.load.assert_not_called()
+
+        scanner = YaraScanner(rules_path)
+        mock_yara.compile.assert_called_once()
+        mock_yara.load.assert_called_once()
+        assert scanner.rules == mock_yara.load.return_value
+
+        # Editing the rules invalidates the cache
+        rules_path.write_text("rule Other { condition: false }")
+        YaraScanner(rules_path)
+        assert mock_yara.compile.call_count == 2
+
+    assert len(list((tmp_path / "cache" / "fext" / "yara").glob("*.yarc"))) == 2
+
+
+def test_scan_archive_scans_all_entries(mock_yara_compile, tmp_path):
+    import zipfile
+
+    archive = tmp_path / "ext.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for i in range(20):
+            zf.writestr(f"file{i}.js", f"content {i}")
+        zf.writestr("dir/", "")
+    rules_path = tmp_path / "rules.yar"
+    rules_path.write_text("rule Test { condition: true }")
+
+    with patch("fetchext.analysis.yara._rules_digest", return_value=None):
+        scanner = YaraScanner(rules_path, max_workers=4)
+
+    def match(data):
+        mock_match = MagicMock()
+        mock_match.rule = bytes(data).decode()
+        return [mock_match]
+
+    scanner.rules = MagicMock()
+    scanner.rules.match.side_effect = match
+
+    results = scanner.scan_archive(archive)
+
+    assert list(results) == [f"file{i}.js" for i in range(20)]
+    assert results["file7.js"][0]["rule"] == "content 7"
+
+
+def test_max_workers_capped(mock_yara_compile):
+    with patch("pathlib.Path.exists", return_value=True):
+        assert YaraScanner(Path("rules.yar"), max_workers=64).max_workers == 32
+        with patch("os.cpu_count", return_value=128):
+            assert YaraScanner(Path("rules.yar")).max_workers == 32
+
+
+def test_scan_archive_raises_scan_errors(mock_yara_compile, tmp_path):
+    import zipfile
+
+    archive = tmp_path / "ext.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.js", "content")
+
+    with patch("pathlib.Path.exists", return_value=True):
+        scanner = YaraScanner(Path("rules.yar"))
+    scanner.rules = MagicMock()
+    scanner.rules.match.side_effect = RuntimeError("could not lock thread slot")
+
+    # A failed scan is not a clean result
+    with pytest.raises(RuntimeError):
+        scanner.scan_archive(archive)
@@ -1,7 +1,11 @@
+import os
+import zipfile
 import pytest
 from unittest.mock import patch
 from pathlib import Path
+from fetchext.core import converter
 from fetchext.core.converter import FormatConverter
+from fetchext.core.exceptions import ExtensionError
 
 
 @pytest.fixture
@@ -50,3 +54,132 @@ def test_convert_dir_to_zip(fs):
 def test_convert_invalid_input(fs):
     with pytest.raises(FileNotFoundError):
         FormatConverter.convert_to_zip(Path("non_existent"))
+
+
+def test_convert_large_crx_uses_kernel_copy(tmp_path, mock_crx_decoder, mocker):
+    payload = os.urandom(256 * 1024)
+    crx_path = tmp_path / "test.crx"
+    crx_path.write_bytes(b"HEADER_" + payload)
+    mock_crx_decoder.get_zip_offset.return_value = 7
+    copyfileobj = mocker.spy(converter.shutil, "copyfileobj")
+
+    output_path = FormatConverter.convert_to_zip(crx_path)
+
+    assert output_path == tmp_path / "test.zip"
+    assert output_path.read_bytes() == payload
+    copyfileobj.assert_not_called()
+
+
+def test_convert_crx_falls_back_to_buffered_copy(tmp_path, mock_crx_decoder, mocker):
+    payload = os.urandom(256 * 1024)
+    crx_path = tmp_path / "test.crx"
+    crx_path.write_bytes(b"HEADER_" + payload)
+    mock_crx_decoder.get_zip_offset.return_value = 7
+    mocker.patch.object(
+        converter.os, "copy_file_range", side_effect=OSError(18, "EXDEV"), create=True
+    )
+    mocker.patch.object(converter.os, "sendfile", side_effect=OSError(22, "EINVAL"))
+
+    output_path = FormatConverter.convert_to_zip(crx_path)
+
+    assert output_path.read_bytes() == payload
+
+
+def test_convert_directory_batch(tmp_path, mock_crx_decoder):
+    mock_crx_decoder.get_zip_offset.return_value = 7
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.crx").write_bytes(b"HEADER_" + name.encode())
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    written = FormatConverter.convert_directory(tmp_path, tmp_path / "zips")
+
+    assert written == [tmp_path / "zips" / "a.zip", tmp_path / "zips" / "b.zip"]
+    assert (tmp_path / "zips" / "b.zip").read_bytes() == b"b"
+
+
+def test_convert_directory_batch_reports_failures(tmp_path, mock_crx_decoder):
+    def offset(path):
+        if Path(path).name == "bad.crx":
+            raise ValueError("Invalid CRX magic number")
+        return 7
+
+    mock_crx_decoder.get_zip_offset.side_effect = offset
+    for name in ("bad", "good"):
+        (tmp_path / f"{name}.crx").write_bytes(b"HEADER_" + name.encode())
+
+    with pytest.raises(ExtensionError, match="1 of 2 conversions failed: bad.crx"):
+        FormatConverter.convert_directory(tmp_path, tmp_path / "zips")
+
+    assert (tmp_path / "zips" / "good.zip").read_bytes() == b"good"
+
+
+def test_convert_dir_to_zip_parallel(tmp_path):
+    input_dir = tmp_path / "ext"
+    (input_dir / "js").mkdir(parents=True)
+    files = {
+        "manifest.json": b'{"name": "Test"}',
+        "js/app.js": b"console.log(1);\n" * 1000,
+        "js/random.bin": os.urandom(4096),
+        "empty.txt": b"",
+        "_locales/é.json": b"{}",
+    }
+    for name, data in files.items():
+        path = input_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    output_path = tmp_path / "ext.zip"
+    FormatConverter.convert_to_zip(input_dir, output_path, workers=2)
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.testzip() is None
+        assert sorted(zf.namelist()) == sorted(files)
+        for name, data in files.items():
+            assert zf.read(name) == data
+        assert zf.getinfo("js/app.js").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("js/random.bin").compress_type == zipfile.ZIP_STORED
+
+
+def test_convert_dir_to_zip_streams_large_files(tmp_path, mocker):
+    mocker.patch.object(converter, "STREAM_MIN_SIZE", 1024)
+    mocker.patch.object(converter, "STREAM_CHUNK_SIZE", 1000)
+    mocker.patch.object(converter, "PARALLEL_WINDOW_BYTES", 2048)
+    input_dir = tmp_path / "ext"
+    input_dir.mkdir()
+    files = {f"small{i}.js": b"var x = %d;\n" % i * 50 for i in range(5)}
+    files["big.js"] = b"function f() { return 1; }\n" * 500
+    files["big.bin"] = os.urandom(5000)
+    for name, data in files.items():
+        (input_dir / name).write_bytes(data)
+    deflate_file = mocker.spy(converter, "_deflate_file")
+
+    output_path = tmp_path / "ext.zip"
+    FormatConverter.convert_to_zip(input_dir, output_path, workers=2)
+
+    # Large files never go through the in-memory path
+    assert {c.args[0].name for c in deflate_file.call_args_list} == {
+        f"small{i}.js" for i in range(5)
+    }
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.testzip() is None
+        for name, data in files.items():
+            assert zf.read(name) == data
+
+
+def test_convert_dir_to_zip_falls_back_to_zip64(tmp_path, mocker):
+    input_dir = tmp_path / "ext"
+    input_dir.mkdir()
+    files = {f"file{i}.bin": os.urandom(100) for i in range(10)}
+    for name, data in files.items():
+        (input_dir / name).write_bytes(data)
+    # Below the limit by content size, above it once headers are added
+    mocker.patch.object(converter, "ZIP_MAX_SIZE", 1100)
+    write_zipfile = mocker.spy(converter, "_write_zipfile")
+
+    output_path = tmp_path / "ext.zip"
+    FormatConverter.convert_to_zip(input_dir, output_path)
+
+    write_zipfile.assert_called_once()
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.testzip() is None
+        assert sorted(zf.namelist()) == sorted(files)
@@ -51,3 +51,69 @@ def test_diff_extensions():
         assert len(report.removed_files) == 0
         assert "b.txt" in report.modified_files  # CRC changed
         assert "a.txt" not in report.modified_files  # CRC same
+
+
+def test_diff_timeline(fs):
+    import zipfile
+    from pathlib import Path
+    from fetchext.workflow.diff import TimelineEvent
+
+    versions = [
+        ({"version": "1.0", "name": "Test"}, {"a.js": "a", "b.js": "b"}),
+        ({"version": "1.1", "name": "Test"}, {"a.js": "a2", "b.js": "b"}),
+        ({"version": "1.2", "name": "Renamed"}, {"a.js": "a2", "c.js": "c"}),
+        ({"version": "1.3", "name": "Renamed"}, {"a.js": "a3", "c.js": "c"}),
+    ]
+    paths = []
+    for i, (manifest, files) in enumerate(versions):
+        path = Path(f"/v{i}.zip")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("manifest.json", json.dumps(manifest))
+            for name, content in files.items():
+                zf.writestr(name, content)
+        paths.append(path)
+
+    report = ExtensionDiffer().timeline(paths)
+
+    assert report.versions == ["1.0", "1.1", "1.2", "1.3"]
+    assert report.files["a.js"] == [
+        TimelineEvent("1.0", "added"),
+        TimelineEvent("1.1", "modified"),
+        TimelineEvent("1.3", "modified"),
+    ]
+    assert report.files["b.js"] == [
+        TimelineEvent("1.0", "added"),
+        TimelineEvent("1.2", "removed"),
+    ]
+    assert report.files["c.js"] == [TimelineEvent("1.2", "added")]
+    assert report.manifest["name"] == [
+        TimelineEvent("1.2", "modified", "Test", "Renamed")
+    ]
+    assert len(report.manifest["version"]) == 3
+
+
+def test_diff_timeline_escapes_markup(tmp_path):
+    import zipfile
+    from fetchext.core.core import diff_timeline
+    from fetchext.interface.console import console
+
+    versions = [
+        ({"version": "1.0", "name": "[red]a"}, {"[b]x.js": "1"}),
+        ({"version": "1.1[/]", "name": "[bold]b"}, {"[b]x.js": "2"}),
+    ]
+    paths = []
+    for i, (manifest, files) in enumerate(versions):
+        path = tmp_path / f"v{i}.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("manifest.json", json.dumps(manifest))
+            for name, content in files.items():
+                zf.writestr(name, content)
+        paths.append(path)
+
+    with console.capture() as capture:
+        diff_timeline(paths)
+    output = capture.get()
+
+    assert "1.0 -> 1.1[/]" in output
+    assert "1.1[/]: [red]a -> [bold]b" in output
+    assert "[b]x.js" in output
@@ -1,4 +1,6 @@
 import zipfile
+import concurrent.futures
+from unittest.mock import patch
 from pathlib import Path
 from fetchext.workflow.diff import ExtensionDiffer
 
@@ -92,3 +94,38 @@ def test_ast_diff_detects_real_changes(fs):
     # Should be different in both cases
     report = differ.diff(old_path, new_path, ast_diff=True)
     assert "script.js" in report.modified_files
+
+
+def test_ast_diff_parallel_and_cached(fs):
+    if not fs.exists("/tmp"):
+        fs.create_dir("/tmp")
+    old_path = Path("/tmp/old.zip")
+    new_path = Path("/tmp/new.zip")
+
+    files_old = {"manifest.json": '{"version": "1.0"}'}
+    files_new = {"manifest.json": '{"version": "1.0"}'}
+    for i in range(5):
+        files_old[f"f{i}.js"] = f"function f{i}() {{\n  return {i};\n}}"
+        files_new[f"f{i}.js"] = f"function f{i}(){{return {i};}}"
+    # A real change
+    files_new["f4.js"] = "function f4(){return 5;}"
+
+    create_zip(old_path, files_old)
+    create_zip(new_path, files_new)
+
+    differ = ExtensionDiffer()
+    with (
+        patch(
+            "fetchext.workflow.diff.concurrent.futures.ProcessPoolExecutor",
+            concurrent.futures.ThreadPoolExecutor,
+        ),
+        patch("fetchext.workflow.diff.PARALLEL_MIN_BYTES", 0),
+    ):
+        report = differ.diff(old_path, new_path, ast_diff=True)
+    assert report.modified_files == ["f4.js"]
+
+    # Normalized forms are cached by content hash
+    with patch("fetchext.workflow.diff.jsbeautifier.beautify") as mock_beautify:
+        report = differ.diff(old_path, new_path, ast_diff=True)
+    mock_beautify.assert_not_called()
+    assert report.modified_files == ["f4.js"]
@@ -1,4 +1,5 @@
 import pytest
+from fetchext.data.mirror_state import MirrorState, STATE_FILENAME
 from fetchext.workflow.mirror import MirrorManager
 
 
@@ -11,6 +12,13 @@ def mock_downloader(mocker):
         lambda url: url if len(url) == 32 else "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
     )
     instance.get_latest_version.return_value = "2.0"
+
+    def download(ext_id, output_dir, show_progress=True):
+        path = output_dir / f"{ext_id}.crx"
+        path.write_bytes(b"crx")
+        return path
+
+    instance.download.side_effect = download
     return instance
 
 
@@ -96,3 +104,100 @@ def test_prune(tmp_path, mock_downloader):
 
     assert (output_dir / "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa.crx").exists()
     assert not (output_dir / "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb.crx").exists()
+
+
+def test_sync_records_state(tmp_path, mock_downloader, mock_inspector):
+    mock_inspector.return_value.get_manifest.return_value = {"version": "2.0"}
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("c aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+    output_dir = tmp_path / "extensions"
+
+    # Store-assigned filename that cannot be derived from the ID
+    def download(ext_id, output_dir, show_progress=True):
+        path = output_dir / "extension-2.0.crx"
+        path.write_bytes(b"crx")
+        return path
+
+    mock_downloader.download.side_effect = download
+    mock_downloader.client.last_validators = {"etag": '"v2"', "last_modified": None}
+
+    MirrorManager().sync(list_file, output_dir, show_progress=False)
+
+    assert (output_dir / STATE_FILENAME).exists()
+    with MirrorState(output_dir) as state:
+        record = state.load()[("chrome", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")]
+    assert record.filename == "extension-2.0.crx"
+    assert record.version == "2.0"
+    assert len(record.sha256) == 64
+    assert record.etag == '"v2"'
+    assert record.last_checked
+
+
+def test_sync_uses_state_without_reading_archives(
+    tmp_path, mock_downloader, mock_inspector
+):
+    mock_inspector.return_value.get_manifest.return_value = {"version": "2.0"}
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("chrome aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+    output_dir = tmp_path / "extensions"
+
+    manager = MirrorManager()
+    manager.sync(list_file, output_dir, show_progress=False)
+    mock_downloader.download.reset_mock()
+    mock_inspector.reset_mock()
+
+    # Second run: version check only, no archive reads
+    manager.sync(list_file, output_dir, show_progress=False)
+    mock_downloader.download.assert_not_called()
+    mock_inspector.return_value.get_manifest.assert_not_called()
+
+    # Within the staleness budget: no network either
+    mock_downloader.get_latest_version.reset_mock()
+    manager.sync(list_file, output_dir, show_progress=False, max_age=3600)
+    mock_downloader.get_latest_version.assert_not_called()
+    mock_downloader.download.assert_not_called()
+
+
+def test_sync_replaces_renamed_archive(tmp_path, mock_downloader):
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("chrome aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+    output_dir = tmp_path / "extensions"
+
+    def download(ext_id, output_dir, show_progress=True):
+        version = mock_downloader.get_latest_version.return_value
+        path = output_dir / f"extension-{version}.crx"
+        path.write_bytes(version.encode())
+        return path
+
+    mock_downloader.download.side_effect = download
+
+    manager = MirrorManager()
+    manager.sync(list_file, output_dir, show_progress=False)
+    mock_downloader.get_latest_version.return_value = "3.0"
+    manager.sync(list_file, output_dir, prune=True, show_progress=False)
+
+    assert not (output_dir / "extension-2.0.crx").exists()
+    assert (output_dir / "extension-3.0.crx").exists()
+
+
+def test_sync_saves_state_incrementally(tmp_path, mock_downloader, mocker):
+    mocker.patch("fetchext.workflow.mirror.STATE_BATCH", 1)
+    list_file = tmp_path / "list.txt"
+    list_file.write_text(f"chrome {'a' * 32}\nchrome {'b' * 32}\n")
+    output_dir = tmp_path / "extensions"
+
+    def download(ext_id, output_dir, show_progress=True):
+        if ext_id == "b" * 32:
+            raise KeyboardInterrupt
+        path = output_dir / f"{ext_id}.crx"
+        path.write_bytes(b"crx")
+        return path
+
+    mock_downloader.download.side_effect = download
+
+    with pytest.raises(KeyboardInterrupt):
+        MirrorManager().sync(list_file, output_dir, workers=1, show_progress=False)
+
+    # The item completed before the interruption is not fetched again
+    with MirrorState(output_dir) as state:
+        assert list(state.load()) == [("chrome", "a" * 32)]
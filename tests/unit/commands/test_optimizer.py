@@ -1,124 +1,178 @@
-import unittest
-from unittest.mock import MagicMock, patch
-from pathlib import Path
-from fetchext.workflow.optimizer import optimize_image, optimize_extension
-
-
-class TestOptimizer(unittest.TestCase):
-    @patch("PIL.Image.open")
-    @patch("pathlib.Path.stat")
-    def test_optimize_image_success(self, mock_stat, mock_open):
-        # Setup
-        mock_path = MagicMock(spec=Path)
-        mock_path.suffix = ".png"
-        mock_path.name = "test.png"
-        mock_path.with_suffix.return_value = MagicMock()
-
-        # Mock original size
-        mock_stat.return_value.st_size = 1000
-
-        # Mock image context manager
-        mock_img = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_img
-        mock_img.format = "PNG"
-
-        # Mock save behavior - we need to simulate the temp file being smaller
-        # The optimize_image function calls stat() on the temp path to check size
-        # So we need to handle the stat call for the temp path
-
-        # We need to distinguish between calls to stat() on original path and temp path
-        # But since we are mocking Path.stat globally, it's tricky.
-        # Let's mock the path object's stat method instead if possible, but optimize_image calls path.stat()
-
-        # Let's use side_effect for stat
-        def stat_side_effect():
-            m = MagicMock()
-            # If it's the temp path (which we can't easily identify by instance identity in this setup)
-            # Let's assume the second call is for the temp path
-            return m
-
-        # Actually, let's just mock the path instances passed to the function
-        # The function receives 'path'.
-
-        path_mock = MagicMock(spec=Path)
-        path_mock.suffix = ".png"
-        path_mock.name = "test.png"
-        path_mock.stat.return_value.st_size = 1000
-
-        temp_mock = MagicMock(spec=Path)
-        temp_mock.stat.return_value.st_size = 500  # Smaller size
-
-        path_mock.with_suffix.return_value = temp_mock
-
-        # Run
-        success, orig, new = optimize_image(path_mock)
-
-        # Verify
-        self.assertTrue(success)
-        self.assertEqual(orig, 1000)
-        self.assertEqual(new, 500)
-        temp_mock.replace.assert_called_with(path_mock)
-        mock_img.save.assert_called()
-
-    @patch("PIL.Image.open")
-    def test_optimize_image_no_reduction(self, mock_open):
-        # Setup
-        path_mock = MagicMock(spec=Path)
-        path_mock.suffix = ".jpg"
-        path_mock.name = "test.jpg"
-        path_mock.stat.return_value.st_size = 1000
-
-        temp_mock = MagicMock(spec=Path)
-        temp_mock.stat.return_value.st_size = 1200  # Larger size
-
-        path_mock.with_suffix.return_value = temp_mock
-
-        mock_img = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_img
-        mock_img.format = "JPEG"
-
-        # Run
-        success, orig, new = optimize_image(path_mock)
-
-        # Verify
-        self.assertFalse(success)
-        self.assertEqual(orig, 1000)
-        self.assertEqual(new, 1000)
-        temp_mock.replace.assert_not_called()
-        temp_mock.unlink.assert_called()
-
-    @patch("fetchext.workflow.optimizer.optimize_image")
-    def test_optimize_extension(self, mock_optimize):
-        # Setup
-        mock_dir = MagicMock(spec=Path)
-        mock_dir.exists.return_value = True
-        mock_dir.is_dir.return_value = True
-
-        file1 = MagicMock(spec=Path)
-        file1.is_file.return_value = True
-        file1.suffix = ".png"
-
-        file2 = MagicMock(spec=Path)
-        file2.is_file.return_value = True
-        file2.suffix = ".txt"  # Should be ignored
-
-        file3 = MagicMock(spec=Path)
-        file3.is_file.return_value = True
-        file3.suffix = ".jpg"
-
-        mock_dir.rglob.return_value = [file1, file2, file3]
-
-        # Mock optimize results
-        # file1: success
-        # file3: fail
-        mock_optimize.side_effect = [(True, 1000, 500), (False, 800, 800)]
-
-        # Run
-        stats = optimize_extension(mock_dir)
-
-        # Verify
-        self.assertEqual(stats["total_files"], 2)
-        self.assertEqual(stats["optimized_files"], 1)
-        self.assertEqual(stats["original_size"], 1800)
-        self.assertEqual(stats["new_size"], 1300)
-        self.assertEqual(stats["saved_bytes"], 500)
+import concurrent.futures
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from fetchext.utils import compute_file_hash
+from fetchext.workflow.optimizer import (
+    OptimizeCache,
+    _settings_key,
+    estimate_image,
+    optimize_extension,
+    optimize_image,
+)
+
+
+@pytest.fixture
+def thread_pool():
+    # Worker processes cannot see patched modules; threads behave the same
+    with patch(
+        "fetchext.workflow.optimizer.concurrent.futures.ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    ):
+        yield
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with OptimizeCache(tmp_path / "cache" / "optimize.db") as cache:
+        yield cache
+
+
+def make_png(path, size=(64, 64)):
+    # Uncompressed PNG of a flat color: re-encoding always shrinks it
+    Image.new("RGB", size, (200, 30, 30)).save(path, format="PNG", compress_level=0)
+    return path
+
+
+def test_optimize_image_success(tmp_path):
+    path = make_png(tmp_path / "test.png")
+    original_size = path.stat().st_size
+
+    success, orig, new = optimize_image(path)
+
+    assert success
+    assert orig == original_size
+    assert new == path.stat().st_size
+    assert new < orig
+    assert not (tmp_path / "test.png.tmp").exists()
+
+
+def test_optimize_image_no_reduction(tmp_path):
+    path = make_png(tmp_path / "test.png")
+    optimize_image(path)
+    optimized = path.read_bytes()
+    mtime = path.stat().st_mtime_ns
+
+    success, orig, new = optimize_image(path)
+
+    assert not success
+    assert orig == new == len(optimized)
+    # Nothing is written when there is no gain
+    assert path.stat().st_mtime_ns == mtime
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_optimize_extension(tmp_path, thread_pool, cache):
+    make_png(tmp_path / "icon.png")
+    (tmp_path / "img").mkdir()
+    make_png(tmp_path / "img" / "copy.png")
+    (tmp_path / "script.js").write_text("ignored")
+
+    stats = optimize_extension(tmp_path, cache=cache)
+
+    assert stats["total_files"] == 2
+    assert stats["optimized_files"] == 2
+    assert stats["cached_files"] == 0
+    assert stats["saved_bytes"] == stats["original_size"] - stats["new_size"] > 0
+
+
+def test_optimize_extension_uses_cache(tmp_path, thread_pool, cache):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    make_png(first / "icon.png")
+    make_png(second / "icon.png")
+
+    optimize_extension(first, cache=cache)
+
+    with patch("fetchext.workflow.optimizer._encode_image") as encode:
+        # Same image in another extension: served from the cache
+        stats = optimize_extension(second, cache=cache)
+        assert stats["optimized_files"] == 1
+        assert stats["cached_files"] == 1
+        assert (second / "icon.png").read_bytes() == (first / "icon.png").read_bytes()
+
+        # Already optimized: known as "no gain"
+        stats = optimize_extension(first, cache=cache)
+        assert stats["optimized_files"] == 0
+        assert stats["cached_files"] == 1
+
+        encode.assert_not_called()
+
+
+def test_optimize_extension_dry_run(tmp_path, thread_pool, cache):
+    path = make_png(tmp_path / "icon.png")
+    content = path.read_bytes()
+
+    stats = optimize_extension(tmp_path, dry_run=True, cache=cache)
+
+    assert stats["estimated"] is True
+    assert stats["optimized_files"] == 1
+    assert stats["saved_bytes"] > 0
+    assert path.read_bytes() == content
+
+
+def test_estimate_image_samples_large_images(tmp_path):
+    path = make_png(tmp_path / "large.png", size=(1024, 1024))
+
+    with patch("fetchext.workflow.optimizer._encode", return_value=b"x" * 100) as enc:
+        original_size, estimate = estimate_image(path)
+
+    sample = enc.call_args.args[0]
+    assert sample.size[0] * sample.size[1] <= 256 * 256
+    assert original_size == path.stat().st_size
+    # Scaled from the sample to the whole image
+    assert estimate == 100 * 16
+
+
+def test_optimize_extension_dry_run_uses_cache(tmp_path, thread_pool, cache):
+    make_png(tmp_path / "icon.png")
+    optimize_extension(tmp_path, cache=cache)
+
+    with patch("fetchext.workflow.optimizer.estimate_image") as estimate:
+        stats = optimize_extension(tmp_path, dry_run=True, cache=cache)
+
+    # Known as "no gain": nothing left to save, nothing to estimate
+    estimate.assert_not_called()
+    assert stats["cached_files"] == 1
+    assert stats["optimized_files"] == 0
+    assert stats["saved_bytes"] == 0
+
+
+def test_optimize_extension_writes_results_as_they_complete(tmp_path, cache):
+    first = make_png(tmp_path / "a.png")
+    second = make_png(tmp_path / "b.png", size=(32, 32))
+    original = second.read_bytes()
+
+    def interrupted(files, quality, workers):
+        digest, path = next(iter(files.items()))
+        yield digest, b"small", True
+        raise KeyboardInterrupt
+
+    with patch("fetchext.workflow.optimizer._optimize_files", interrupted):
+        with pytest.raises(KeyboardInterrupt):
+            optimize_extension(tmp_path, cache=cache)
+
+    # The completed result is on disk and cached; the other file is untouched
+    assert first.read_bytes() == b"small"
+    assert second.read_bytes() == original
+    assert len(cache.lookup([compute_file_hash(first)], _settings_key(85))) == 1
+
+
+def test_optimize_cache_evicts_least_recently_used(tmp_path):
+    with OptimizeCache(tmp_path / "optimize.db", max_size=10) as cache:
+        cache.put("a", b"x" * 6, "s")
+        cache.put("b", b"y" * 6, "s")
+
+        assert cache.get_output("a", "s") is None
+        assert cache.get_output("b", "s") == b"y" * 6
+        # "No gain" markers are kept
+        assert cache.lookup(["a"], "s") == {}
+        assert len(cache.lookup([_hash(b"x" * 6)], "s")) == 1
+
+
+def _hash(data):
+    import hashlib
+
+    return hashlib.sha256(data).hexdigest()
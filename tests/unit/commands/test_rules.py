@@ -79,3 +79,28 @@ def test_git_not_installed(fs):
             handle_sync(args)
 
     assert exc.value.code == ExitCode.DEPENDENCY
+
+
+def test_fingerprint_adds_local_entries(tmp_path, monkeypatch):
+    from fetchext.commands.rules import handle_fingerprint
+    from fetchext.security.fingerprints import FingerprintDB
+
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    lib = tmp_path / "lib.min.js"
+    lib.write_bytes(b"!function(){}();")
+
+    args = MagicMock()
+    args.files = [lib]
+    args.name = "lib"
+    args.version = "1.2.3"
+    args.advisory = ["CVE-2024-0001"]
+
+    handle_fingerprint(args)
+
+    entry = FingerprintDB().lookup_content(b"!function(){}();")
+    assert entry == {
+        "name": "lib",
+        "version": "1.2.3",
+        "file": "lib.min.js",
+        "advisories": ["CVE-2024-0001"],
+    }
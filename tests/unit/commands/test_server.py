@@ -5,12 +5,12 @@ from fetchext.network.server import generate_update_manifest
 
 @pytest.fixture
 def mock_inspector(mocker):
-    return mocker.patch("fetchext.network.server.ExtensionInspector")
+    return mocker.patch("fetchext.data.manifest_index.ExtensionInspector")
 
 
 @pytest.fixture
 def mock_crx_decoder(mocker):
-    return mocker.patch("fetchext.network.server.CrxDecoder")
+    return mocker.patch("fetchext.data.manifest_index.CrxDecoder")
 
 
 def test_generate_update_manifest_chrome(tmp_path, mock_inspector, mock_crx_decoder):
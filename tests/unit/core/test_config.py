@@ -113,3 +113,28 @@ def test_load_config_invalid_section(fs, mocker):
 
     with pytest.raises(ConfigError, match="Section 'general' must be a dictionary"):
         load_config()
+
+
+def test_load_config_cached_until_file_changes(fs, mocker):
+    import os
+    from fetchext.data import config as config_module
+
+    config_module.clear_config_cache()
+    mocker.patch.dict("os.environ", {"XDG_CONFIG_HOME": "/config"})
+    path = Path("/config/fext/config.toml")
+    fs.create_file(path, contents=b"[batch]\nworkers = 8\n")
+    read_spy = mocker.spy(config_module, "_read_config")
+
+    first = load_config()
+    first["batch"]["workers"] = 99  # Callers cannot mutate the snapshot
+    assert load_config()["batch"]["workers"] == 8
+    assert read_spy.call_count == 1
+
+    path.write_bytes(b"[batch]\nworkers = 16\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_config()["batch"]["workers"] == 16
+    assert read_spy.call_count == 2
+
+    config_module.reload_config()
+    assert read_spy.call_count == 3
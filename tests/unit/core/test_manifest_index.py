@@ -0,0 +1,88 @@
+import json
+import os
+import zipfile
+from fetchext.data.manifest_index import ManifestIndex, INDEX_FILENAME
+
+
+def create_extension(path, manifest):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", json.dumps(manifest))
+
+
+def test_refresh_reads_and_persists(tmp_path):
+    ext = tmp_path / "ext.zip"
+    create_extension(ext, {"name": "Ext", "version": "1.0", "permissions": ["tabs"]})
+
+    with ManifestIndex(tmp_path) as index:
+        records = index.refresh([ext])
+
+    assert (tmp_path / INDEX_FILENAME).exists()
+    assert len(records) == 1
+    assert records[0].manifest == {
+        "name": "Ext",
+        "version": "1.0",
+        "permissions": ["tabs"],
+    }
+    assert len(records[0].sha256) == 64
+    assert records[0].error is None
+
+
+def test_refresh_skips_unchanged_files(tmp_path, mocker):
+    ext = tmp_path / "ext.zip"
+    create_extension(ext, {"version": "1.0"})
+
+    with ManifestIndex(tmp_path) as index:
+        index.refresh([ext])
+
+    with ManifestIndex(tmp_path) as index:
+        spy = mocker.spy(index.inspector, "get_manifest")
+        records = index.refresh([ext])
+
+    spy.assert_not_called()
+    assert records[0].manifest["version"] == "1.0"
+
+
+def test_refresh_rereads_changed_files(tmp_path):
+    ext = tmp_path / "ext.zip"
+    create_extension(ext, {"version": "1.0"})
+
+    with ManifestIndex(tmp_path) as index:
+        index.refresh([ext])
+
+    create_extension(ext, {"version": "2.0", "name": "Updated"})
+    st = ext.stat()
+    os.utime(ext, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    with ManifestIndex(tmp_path) as index:
+        records = index.refresh([ext])
+
+    assert records[0].manifest["version"] == "2.0"
+
+
+def test_refresh_records_errors_and_prunes(tmp_path):
+    broken = tmp_path / "broken.zip"
+    broken.write_bytes(b"not a zip")
+    ext = tmp_path / "ext.zip"
+    create_extension(ext, {"version": "1.0"})
+
+    with ManifestIndex(tmp_path) as index:
+        records = index.refresh([broken, ext])
+        assert records[0].manifest is None
+        assert records[0].error
+
+        ext.unlink()
+        index.refresh([broken])
+        rows = index.conn.execute("SELECT filename FROM manifests").fetchall()
+
+    assert rows == [("broken.zip",)]
+
+
+def test_unwritable_directory_falls_back_to_memory(tmp_path):
+    ext = tmp_path / "ext.zip"
+    create_extension(ext, {"version": "1.0"})
+
+    index = ManifestIndex(tmp_path / "missing")
+    records = index.refresh([ext])
+    index.close()
+
+    assert records[0].manifest == {"version": "1.0"}
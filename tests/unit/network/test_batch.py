@@ -1,6 +1,9 @@
+import json
+import concurrent.futures
 from unittest.mock import MagicMock, patch
 from pathlib import Path
-from fetchext.workflow.batch import BatchProcessor
+from fetchext.core.exceptions import NetworkError
+from fetchext.workflow.batch import BatchProcessor, JOURNAL_FILENAME
 
 
 class TestBatchProcessor:
@@ -13,10 +16,10 @@ class TestBatchProcessor:
 
         processor = BatchProcessor()
 
-        # Mock ThreadPoolExecutor AND as_completed
+        # Mock ThreadPoolExecutor AND wait
         with (
             patch("concurrent.futures.ThreadPoolExecutor") as MockExecutor,
-            patch("concurrent.futures.as_completed") as mock_as_completed,
+            patch("concurrent.futures.wait") as mock_wait,
         ):
             mock_executor_instance = MockExecutor.return_value
             mock_executor_instance.__enter__.return_value = mock_executor_instance
@@ -25,8 +28,8 @@ class TestBatchProcessor:
             mock_future = MagicMock()
             mock_executor_instance.submit.return_value = mock_future
 
-            # Make as_completed yield the mock futures immediately
-            mock_as_completed.return_value = [mock_future, mock_future]
+            # Make wait report the mock future as finished immediately
+            mock_wait.return_value = ({mock_future}, set())
 
             processor.process(batch_file, tmp_path, max_workers=2)
 
@@ -73,3 +76,71 @@ class TestBatchProcessor:
         processor = BatchProcessor()
         processor._process_line("safari abc", tmp_path)
         assert "Unsupported browser" in caplog.text
+
+
+class TestBatchJournal:
+    def _mock_downloader(self, mocker):
+        mock = mocker.patch("fetchext.workflow.batch.ChromeDownloader")
+        instance = mock.return_value
+        instance.extract_id.side_effect = lambda x: x
+        return instance
+
+    def test_resume_skips_done_items(self, tmp_path, mocker):
+        batch_file = tmp_path / "batch.txt"
+        batch_file.write_text("chrome a\n# comment\nchrome b\nchrome c\n")
+        downloader = self._mock_downloader(mocker)
+
+        def download(ext_id, output_dir, show_progress=True):
+            if ext_id == "b":
+                raise ValueError("boom")
+
+        downloader.download.side_effect = download
+
+        processor = BatchProcessor()
+        processor.process(batch_file, tmp_path, max_workers=2, show_progress=False)
+
+        journal = (tmp_path / JOURNAL_FILENAME).read_text().splitlines()
+        statuses = {
+            json.loads(line)["item"]: json.loads(line)["status"] for line in journal
+        }
+        assert statuses == {
+            "chrome a": "done",
+            "chrome b": "failed",
+            "chrome c": "done",
+        }
+
+        downloader.download.reset_mock()
+        downloader.download.side_effect = None
+        processor.process(
+            batch_file, tmp_path, max_workers=2, show_progress=False, resume=True
+        )
+
+        # Only the failed item is attempted again
+        downloader.download.assert_called_once_with("b", tmp_path, show_progress=False)
+
+    def test_transient_errors_are_retried(self, tmp_path, mocker):
+        batch_file = tmp_path / "batch.txt"
+        batch_file.write_text("chrome a\n")
+        downloader = self._mock_downloader(mocker)
+        downloader.download.side_effect = [NetworkError("timeout"), None]
+
+        processor = BatchProcessor(backoff=0)
+        processor.process(batch_file, tmp_path, show_progress=False)
+
+        assert downloader.download.call_count == 2
+        entry = json.loads((tmp_path / JOURNAL_FILENAME).read_text())
+        assert entry == {"item": "chrome a", "status": "done"}
+
+    def test_bounded_in_flight(self, tmp_path, mocker):
+        batch_file = tmp_path / "batch.txt"
+        batch_file.write_text("\n".join(f"chrome id_{i}" for i in range(50)))
+        self._mock_downloader(mocker)
+        submit = mocker.spy(BatchProcessor, "_process_line")
+        wait = mocker.spy(concurrent.futures, "wait")
+
+        BatchProcessor().process(
+            batch_file, tmp_path, max_workers=2, show_progress=False
+        )
+
+        assert submit.call_count == 50
+        assert max(len(call.args[0]) for call in wait.call_args_list) <= 4
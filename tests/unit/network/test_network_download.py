@@ -145,3 +145,27 @@ def test_download_file_empty_cleanup(fs, mock_session):
         )
 
     assert not output_path.exists()
+
+
+def test_client_download_records_validators(tmp_path, mock_session):
+    from unittest.mock import patch
+    from fetchext.network.client import NetworkClient
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {
+        "content-length": "5",
+        "ETag": '"abc"',
+        "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT",
+    }
+    mock_response.iter_content.return_value = [b"12345"]
+    mock_session.get.return_value = mock_response
+
+    with patch.object(NetworkClient, "_create_session", return_value=mock_session):
+        client = NetworkClient()
+    client.download_file("http://example.com/a.crx", tmp_path / "a.crx", False)
+
+    assert client.last_validators == {
+        "etag": '"abc"',
+        "last_modified": "Mon, 19 Oct 2026 00:00:00 GMT",
+    }
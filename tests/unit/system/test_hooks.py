@@ -1,5 +1,12 @@
+import importlib.util
+import os
 import pytest
-from fetchext.plugins.hooks import HookManager, HookContext
+from fetchext.plugins.hooks import (
+    BackgroundHookRunner,
+    HookManager,
+    HookContext,
+    get_background_runner,
+)
 
 
 @pytest.fixture
@@ -63,3 +70,120 @@ def pre_download(ctx):
 """)
     manager = HookManager(hooks_dir)
     assert len(manager.hooks["pre_download"]) == 0
+
+
+def test_hook_modules_loaded_once_per_process(hooks_dir, mocker):
+    hook_file = hooks_dir / "once_hook.py"
+    hook_file.write_text("""
+def pre_download(ctx):
+    ctx.version = "1"
+""")
+
+    HookManager(hooks_dir)
+    exec_spy = mocker.spy(importlib.util, "module_from_spec")
+    manager = HookManager(hooks_dir)
+
+    exec_spy.assert_not_called()
+    assert len(manager.hooks["pre_download"]) == 1
+
+
+def test_hook_modules_reloaded_when_changed(hooks_dir):
+    hook_file = hooks_dir / "changing_hook.py"
+    hook_file.write_text("""
+def pre_download(ctx):
+    ctx.version = "1"
+""")
+    HookManager(hooks_dir)
+
+    hook_file.write_text("""
+def pre_download(ctx):
+    ctx.version = "2.0"
+""")
+    st = hook_file.stat()
+    os.utime(hook_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    ctx = HookContext(extension_id="abc", browser="chrome")
+    HookManager(hooks_dir).run_hook("pre_download", ctx)
+    assert ctx.version == "2.0"
+
+
+def test_background_post_hooks(hooks_dir):
+    hook_file = hooks_dir / "bg_hook.py"
+    hook_file.write_text("""
+import threading
+
+def post_download(ctx):
+    ctx.metadata = {"thread": threading.current_thread().name}
+
+def pre_download(ctx):
+    ctx.metadata = {"thread": threading.current_thread().name}
+""")
+
+    manager = HookManager(hooks_dir, background_hooks=["post_download", "pre_download"])
+    assert manager.background_hooks == {"post_download"}
+
+    ctx = HookContext(extension_id="abc", browser="chrome")
+    manager.run_hook("post_download", ctx)
+    assert get_background_runner().wait(timeout=5)
+    assert ctx.metadata["thread"].startswith("fext-hooks-")
+
+    # pre_* hooks always run inline
+    manager.run_hook("pre_download", ctx)
+    assert not ctx.metadata["thread"].startswith("fext-hooks-")
+
+
+def test_background_hook_timeout():
+    import threading
+
+    release = threading.Event()
+    calls = []
+    runner = BackgroundHookRunner(workers=1, timeout=0.1)
+    ctx = HookContext(extension_id="abc", browser="chrome")
+
+    runner.submit("post_download", [lambda c: release.wait(10)], ctx)
+    runner.submit("post_download", [lambda c: calls.append(c)], ctx)
+
+    # The stuck hook is abandoned and does not hold its worker
+    try:
+        assert runner.wait(timeout=5)
+        assert calls == [ctx]
+    finally:
+        release.set()
+
+
+def test_background_hook_abandoned_cap():
+    import threading
+    from unittest.mock import patch
+
+    release = threading.Event()
+    runner = BackgroundHookRunner(workers=1, timeout=0.1, max_abandoned=1)
+    ctx = HookContext(extension_id="abc", browser="chrome")
+
+    try:
+        assert runner.submit("post_download", [lambda c: release.wait(10)], ctx)
+        assert runner.wait(timeout=5)
+        # One hung hook is alive: further hooks are skipped, not piled up
+        with patch("fetchext.plugins.hooks.logger") as logger:
+            assert not runner.submit("post_extract", [lambda c: None], ctx)
+        assert "Skipping background hook post_extract" in str(logger.warning.call_args)
+    finally:
+        release.set()
+
+
+def test_background_hook_wait_names_pending():
+    import threading
+    from unittest.mock import patch
+
+    release = threading.Event()
+    runner = BackgroundHookRunner(workers=1, timeout=30)
+    ctx = HookContext(extension_id="abc", browser="chrome")
+
+    try:
+        runner.submit("post_download", [lambda c: release.wait(10)], ctx)
+        runner.submit("post_pack", [lambda c: None], ctx)
+        with patch("fetchext.plugins.hooks.logger") as logger:
+            assert not runner.wait(timeout=0.1)
+        message = str(logger.warning.call_args)
+        assert "Running: post_download; not started: post_pack" in message
+    finally:
+        release.set()
@@ -1,6 +1,13 @@
 import concurrent.futures
+import zipfile
 from unittest.mock import patch
-from fetchext.analysis.grep import GrepSearcher, search_directory
+from fetchext.analysis.grep import (
+    GrepSearcher,
+    iter_chunks,
+    iter_files,
+    iter_search_directory,
+    search_directory,
+)
 
 
 def test_grep_searcher_text(tmp_path):
@@ -48,3 +55,139 @@ def test_search_directory(tmp_path):
         results = search_directory(tmp_path, "me")
     assert len(results) == 1
     assert results[0]["file"] == str(tmp_path / "d1/f1.txt")
+
+
+def test_grep_searcher_one_result_per_line(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("foo foo foo\nbar\nfoo", encoding="utf-8")
+
+    results = GrepSearcher("foo").search_file(f)
+
+    assert [r["line"] for r in results] == [1, 3]
+
+
+def test_grep_searcher_anchors_match_lines(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("a start\nstart b\n", encoding="utf-8")
+
+    results = GrepSearcher("^start").search_file(f)
+
+    assert [r["line"] for r in results] == [2]
+
+
+def test_grep_searcher_matches_within_lines(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("foo\nbar foo\nbaz\n", encoding="utf-8")
+
+    # Would span "foo\nbar" in the whole buffer
+    assert GrepSearcher(r"foo\sbar").search_file(f) == []
+    results = GrepSearcher(r"foo\s*\w*").search_file(f)
+    assert [(r["line"], r["content"]) for r in results] == [
+        (1, "foo"),
+        (2, "bar foo"),
+    ]
+
+
+def test_grep_searcher_matches_line_newline(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("foo\nbar\nfoo end\n", encoding="utf-8")
+
+    # Each line is searched with its newline, as when iterating the file
+    assert [r["line"] for r in GrepSearcher(r"foo\s+").search_file(f)] == [1, 3]
+    assert [r["line"] for r in GrepSearcher("foo\n").search_file(f)] == [1]
+
+
+def test_grep_searcher_no_line_after_trailing_newline(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("one\n\nthree\n", encoding="utf-8")
+
+    results = GrepSearcher("^").search_file(f)
+
+    assert [r["line"] for r in results] == [1, 2, 3]
+
+
+def test_grep_searcher_max_count(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("hit\n" * 10, encoding="utf-8")
+
+    results = GrepSearcher("hit", max_count=3).search_file(f)
+
+    assert [r["line"] for r in results] == [1, 2, 3]
+
+
+def test_grep_searcher_files_with_matches(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("hit\nhit\n", encoding="utf-8")
+
+    results = GrepSearcher("hit", files_with_matches=True).search_file(f)
+
+    assert results == [{"file": str(f)}]
+
+
+def test_grep_searcher_context(tmp_path):
+    f = tmp_path / "test.txt"
+    f.write_text("one\ntwo\nthree\nfour\nfive", encoding="utf-8")
+
+    results = GrepSearcher("three", context=1).search_file(f)
+
+    assert results[0]["line"] == 3
+    assert results[0]["before"] == ["two"]
+    assert results[0]["after"] == ["four"]
+
+
+def test_grep_searcher_minified_line_window(tmp_path):
+    f = tmp_path / "bundle.min.js"
+    f.write_text("a" * 5000 + "needle" + "b" * 5000, encoding="utf-8")
+
+    results = GrepSearcher("needle").search_file(f)
+
+    assert len(results) == 1
+    content = results[0]["content"]
+    assert "needle" in content
+    assert content.startswith("...") and content.endswith("...")
+
+
+def test_grep_searcher_archive(tmp_path):
+    archive = tmp_path / "ext.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.js", "x\nfetch(url)\n")
+        zf.writestr("b.js", "nothing")
+
+    results = GrepSearcher("fetch").search_file(archive)
+
+    assert results == [{"file": "ext.zip:a.js", "line": 2, "content": "fetch(url)"}]
+
+
+def test_iter_files_prunes_hidden(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a/f1.txt").write_text("x", encoding="utf-8")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git/config").write_text("x", encoding="utf-8")
+    (tmp_path / ".hidden.txt").write_text("x", encoding="utf-8")
+
+    files = list(iter_files(tmp_path))
+
+    assert files == [(str(tmp_path / "a/f1.txt"), 1)]
+
+
+def test_iter_chunks_batches_by_count_and_size():
+    files = [("a", 10), ("b", 10), ("c", 10), ("big", 1000), ("d", 10)]
+
+    chunks = list(iter_chunks(files, max_files=2, max_bytes=500))
+
+    assert chunks == [["a", "b"], ["c", "big"], ["d"]]
+
+
+def test_iter_search_directory_streams(tmp_path):
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text("match", encoding="utf-8")
+
+    with patch(
+        "fetchext.analysis.grep.ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    ):
+        results = iter_search_directory(tmp_path, "match", max_workers=1)
+        first = next(results)
+        results.close()
+
+    assert first["line"] == 1
@@ -53,8 +53,112 @@ def test_history_migration(mock_base_dir):
     assert not json_path.exists()
 
 
+def test_history_migration_backfills_tracked(mock_base_dir):
+    (mock_base_dir / "history.json").write_text(
+        json.dumps(
+            [
+                {
+                    "timestamp": "2023-01-01",
+                    "action": "download",
+                    "id": "abc",
+                    "browser": "chrome",
+                    "version": "1.0",
+                    "status": "success",
+                }
+            ]
+        )
+    )
+
+    HistoryManager()
+    tracked = HistoryManager().get_tracked_extensions()
+
+    assert [(e["id"], e["version"]) for e in tracked] == [("abc", "1.0")]
+
+
 def test_history_clear(mock_base_dir):
     manager = HistoryManager()
     manager.add_entry("test", "1", "c")
     manager.clear()
     assert len(manager.get_entries()) == 0
+
+
+def test_history_stream_query(mock_base_dir):
+    manager = HistoryManager()
+    for i in range(5):
+        manager.add_entry("download", f"ext{i}", "chrome")
+
+    columns, rows = manager.stream_query(
+        "SELECT extension_id FROM history ORDER BY id;", limit=2, offset=1, batch_size=1
+    )
+    assert columns == ["extension_id"]
+    assert list(rows) == [("ext1",), ("ext2",)]
+
+    assert [e["id"] for e in manager.iter_all_entries(batch_size=2)][-1] == "ext0"
+
+
+def test_history_stream_query_write_returning(mock_base_dir):
+    manager = HistoryManager()
+    manager.add_entry("download", "ext1", "chrome")
+
+    columns, rows = manager.stream_query(
+        "UPDATE history SET status = 'done' RETURNING extension_id", read_only=False
+    )
+
+    assert columns == ["extension_id"]
+    assert list(rows) == [("ext1",)]
+    assert manager.get_entries()[0]["status"] == "done"
+
+
+def test_history_stream_query_read_only(mock_base_dir):
+    import sqlite3
+
+    manager = HistoryManager()
+    with pytest.raises(sqlite3.OperationalError):
+        manager.stream_query("DELETE FROM history")
+
+    columns, rows = manager.stream_query("DELETE FROM history", read_only=False)
+    assert columns == []
+    assert list(rows) == []
+
+
+def test_history_tracked_extensions(mock_base_dir):
+    manager = HistoryManager()
+    manager.track_extension("abc", "chrome", version="1.0", sha256="aa", path="abc.crx")
+    manager.track_extension("abc", "chrome", version="2.0", source_url="http://x")
+    manager.track_extension("def", "firefox", version="3.0")
+
+    tracked = {e["id"]: e for e in manager.get_tracked_extensions()}
+    assert tracked["abc"]["version"] == "2.0"
+    assert tracked["abc"]["sha256"] == "aa"
+    assert tracked["abc"]["source"] == "http://x"
+    assert len(tracked) == 2
+
+    manager.mark_checked([("chrome", "abc")])
+    checked_before = tracked["def"]["last_checked"]
+    stale = manager.get_tracked_extensions(checked_before=checked_before + "1")
+    assert [e["id"] for e in stale] == ["def"]
+
+
+def test_history_tracked_keeps_validators(mock_base_dir):
+    manager = HistoryManager()
+    manager.track_extension("abc", "chrome", version="1.0", etag='"v1"')
+    manager.track_extension(
+        "abc", "chrome", version="1.1", last_modified="Mon, 19 Oct 2026"
+    )
+
+    (tracked,) = manager.get_tracked_extensions()
+    # A download without an ETag does not erase the known one
+    assert tracked["etag"] == '"v1"'
+    assert tracked["last_modified"] == "Mon, 19 Oct 2026"
+
+
+def test_history_tracked_backfilled_from_history(mock_base_dir):
+    import sqlite3
+
+    HistoryManager().add_entry("download", "abc", "chrome", "1.0")
+    with sqlite3.connect(mock_base_dir / "history.db") as conn:
+        conn.execute("DROP TABLE tracked_extensions")
+
+    tracked = HistoryManager().get_tracked_extensions()
+    assert tracked[0]["id"] == "abc"
+    assert tracked[0]["version"] == "1.0"
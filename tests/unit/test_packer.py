@@ -1,5 +1,9 @@
+import io
+import os
+import zipfile
 from fetchext.core.packer import ExtensionPacker
 from fetchext.core.crx import CrxDecoder
+from fetchext.core.verifier import CrxVerifier
 
 
 def test_pack_extension(tmp_path):
@@ -48,3 +52,46 @@ def test_pack_with_existing_key(tmp_path):
     # Verify ID matches key
     ext_id = CrxDecoder.get_id(output_crx)
     assert len(ext_id) == 32
+
+
+def test_pack_signature_verifies(tmp_path):
+    source_dir = tmp_path / "extension"
+    (source_dir / "js").mkdir(parents=True)
+    (source_dir / "manifest.json").write_text('{"name": "Test", "version": "1.0"}')
+    (source_dir / "js" / "app.js").write_bytes(os.urandom(256 * 1024))
+
+    output_crx = tmp_path / "test.crx"
+    ExtensionPacker().pack(source_dir, output_crx)
+
+    assert CrxVerifier().verify(output_crx)
+    assert not (tmp_path / "test.crx.tmp").exists()
+
+    offset = CrxDecoder.get_zip_offset(output_crx)
+    with open(output_crx, "rb") as f:
+        f.seek(offset)
+        with zipfile.ZipFile(io.BytesIO(f.read())) as zf:
+            assert sorted(zf.namelist()) == ["js/app.js", "manifest.json"]
+            assert zf.testzip() is None
+
+
+def test_pack_payload_is_standalone_zip(tmp_path):
+    import struct
+    from fetchext.core.converter import FormatConverter
+
+    source_dir = tmp_path / "extension"
+    source_dir.mkdir()
+    (source_dir / "manifest.json").write_text('{"name": "Test", "version": "1.0"}')
+    (source_dir / "script.js").write_text('console.log("Hello");' * 100)
+    output_crx = tmp_path / "test.crx"
+    ExtensionPacker().pack(source_dir, output_crx)
+
+    payload = FormatConverter.convert_to_zip(output_crx)
+
+    # Offsets are relative to the ZIP, not to the CRX it was packed in
+    data = payload.read_bytes()
+    cd_size, cd_offset = struct.unpack("<II", data[-10:-2])
+    assert cd_offset + cd_size == len(data) - 22
+    with zipfile.ZipFile(payload) as zf:
+        assert zf.testzip() is None
+        assert [i.header_offset for i in zf.infolist()][0] == 0
+        assert zf.read("script.js") == b'console.log("Hello");' * 100
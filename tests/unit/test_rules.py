@@ -1,4 +1,11 @@
-from fetchext.analysis.rules import RuleEngine
+import pytest
+import yaml
+from fetchext.analysis.rules import RuleEngine, extract_literals
+
+
+@pytest.fixture(autouse=True)
+def rules_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
 
 
 def test_rule_engine_load(tmp_path):
@@ -36,3 +43,79 @@ rules:
     assert len(matches) == 1
     assert matches[0].rule_id == "test-rule"
     assert matches[0].match == "this is a secret message"
+
+
+def test_extract_literals():
+    assert extract_literals("secret") == ["secret"]
+    assert extract_literals(r"chrome\.tabs\.(query|get)") == ["chrome.tabs."]
+    assert extract_literals("(Foo|BarBaz)qq") == ["barbaz", "foo"]
+    # Nothing long enough to index
+    assert extract_literals("a.b") is None
+    assert extract_literals("foo|ba") is None
+
+
+def test_extract_literals_without_parser(mocker):
+    # A changed or missing private parser disables the prefilter only
+    mocker.patch(
+        "fetchext.analysis.rules.sre_parse.parse", side_effect=AttributeError("gone")
+    )
+    assert extract_literals("secret") is None
+
+    mocker.patch("fetchext.analysis.rules.sre_parse", None)
+    assert extract_literals("secret") is None
+
+
+def test_rule_engine_prefilter(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("""
+rules:
+  - id: eval
+    pattern: "eval\\\\("
+  - id: short
+    pattern: "a.b"
+""")
+
+    engine = RuleEngine(rules_file, cache_dir=tmp_path / "cache")
+
+    assert [r["id"] for r in engine.candidate_rules("var x = 1;")] == ["short"]
+    assert [r["id"] for r in engine.candidate_rules("EVAL(code)")] == [
+        "eval",
+        "short",
+    ]
+
+
+def test_rule_engine_scan_line_numbers(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("""
+rules:
+  - id: eval
+    pattern: "eval\\\\("
+""")
+
+    engine = RuleEngine(rules_file, cache_dir=tmp_path / "cache")
+    matches = engine._scan_content("a.js", b"var a;\nvar b;\n  eval(x);\n")
+
+    assert [(m.line, m.match) for m in matches] == [(3, "eval(x);")]
+
+
+def test_rule_engine_uses_disk_cache(tmp_path, mocker):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("""
+rules:
+  - id: test-rule
+    severity: high
+    pattern: "secret"
+""")
+    cache_dir = tmp_path / "cache"
+
+    RuleEngine(rules_file, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    spy = mocker.spy(yaml, "safe_load")
+    engine = RuleEngine(rules_file, cache_dir=cache_dir)
+
+    spy.assert_not_called()
+    assert engine.rules[0]["id"] == "test-rule"
+    assert engine.rules[0]["severity"] == "high"
+    # The cache is written through a temporary file that is moved into place
+    assert not list(cache_dir.glob("*.tmp"))
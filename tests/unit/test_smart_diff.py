@@ -115,3 +115,86 @@ def test_diff_images(mock_img_open, mock_open, differ):
     assert len(report.image_changes) == 1
     assert report.image_changes[0]["file"] == "icon.png"
     assert report.image_changes[0]["diff"]["size"] == "(100, 100) -> (200, 200)"
+
+
+def _png(draw, mode="RGB", compress_level=6):
+    import io
+    from PIL import Image, ImageDraw
+
+    img = Image.new(mode, (64, 64), "white")
+    draw(ImageDraw.Draw(img))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", compress_level=compress_level)
+    return buf.getvalue()
+
+
+def _write_zip(path, files):
+    import zipfile
+
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", '{"version": "1.0"}')
+        for name, content in files.items():
+            zf.writestr(name, content)
+
+
+def test_diff_images_perceptual(tmp_path, differ):
+    def circle(draw):
+        draw.ellipse((8, 8, 56, 56), fill="red")
+
+    def square(draw):
+        draw.rectangle((0, 0, 31, 63), fill="blue")
+
+    _write_zip(
+        tmp_path / "old.zip",
+        {"same.png": _png(circle), "swapped.png": _png(circle)},
+    )
+    _write_zip(
+        tmp_path / "new.zip",
+        {
+            # Re-encoded but visually identical
+            "same.png": _png(circle, compress_level=1),
+            "swapped.png": _png(square),
+        },
+    )
+
+    report = differ.diff(tmp_path / "old.zip", tmp_path / "new.zip")
+
+    assert sorted(report.modified_files) == ["same.png", "swapped.png"]
+    assert [c["file"] for c in report.image_changes] == ["swapped.png"]
+    assert report.image_changes[0]["diff"]["perceptual_distance"] > 10
+
+
+def test_perceptual_hash_jpeg_draft():
+    import io
+    from PIL import Image
+    from fetchext.workflow.diff import perceptual_hash
+
+    img = Image.new("RGB", (512, 512), "white")
+    img.paste((0, 0, 0), (0, 0, 256, 512))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+
+    value = perceptual_hash(Image.open(io.BytesIO(buf.getvalue())))
+    assert value is not None
+    assert perceptual_hash(MagicMock()) is None
+
+
+def test_diff_images_jpeg_resized(tmp_path, differ):
+    import io
+    from PIL import Image
+
+    def jpeg(size):
+        img = Image.new("RGB", (size, size), "white")
+        img.paste((0, 0, 0), (0, 0, size // 2, size))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG")
+        return buf.getvalue()
+
+    _write_zip(tmp_path / "old.zip", {"logo.jpg": jpeg(256)})
+    _write_zip(tmp_path / "new.zip", {"logo.jpg": jpeg(128)})
+
+    report = differ.diff(tmp_path / "old.zip", tmp_path / "new.zip")
+
+    # Draft decoding for the hash must not hide the resize
+    assert [c["file"] for c in report.image_changes] == ["logo.jpg"]
+    assert report.image_changes[0]["diff"]["size"] == "(256, 256) -> (128, 128)"
@@ -27,10 +27,11 @@ def mock_downloader():
 
 
 def test_update_all_no_history(mock_history):
-    mock_history.return_value.get_entries.return_value = []
+    mock_history.return_value.get_tracked_extensions.return_value = []
 
     args = MagicMock()
     args.all = True
+    args.max_age = 0
 
     handle_update(args)
     # Should just print "No download history found" and return
@@ -46,11 +47,12 @@ def test_update_all_up_to_date(mock_history, mock_downloader):
         "source": "http://example.com",
         "filename": "abc.crx",
     }
-    mock_history.return_value.get_entries.return_value = [entry]
+    mock_history.return_value.get_tracked_extensions.return_value = [entry]
     mock_downloader.get_latest_version.return_value = "1.0.0"
 
     args = MagicMock()
     args.all = True
+    args.max_age = 0
     args.dry_run = False
 
     handle_update(args)
@@ -70,11 +72,12 @@ def test_update_all_found_update(
         "source": "http://example.com",
         "filename": "abc.crx",
     }
-    mock_history.return_value.get_entries.return_value = [entry]
+    mock_history.return_value.get_tracked_extensions.return_value = [entry]
     mock_downloader.get_latest_version.return_value = "2.0.0"
 
     args = MagicMock()
     args.all = True
+    args.max_age = 0
     args.dry_run = False
 
     handle_update(args)
@@ -95,11 +98,12 @@ def test_update_dry_run(mock_history, mock_downloader, mock_download_extension):
         "source": "http://example.com",
         "filename": "abc.crx",
     }
-    mock_history.return_value.get_entries.return_value = [entry]
+    mock_history.return_value.get_tracked_extensions.return_value = [entry]
     mock_downloader.get_latest_version.return_value = "2.0.0"
 
     args = MagicMock()
     args.all = True
+    args.max_age = 0
     args.dry_run = True
 
     handle_update(args)
@@ -114,3 +118,22 @@ def test_update_requires_all_flag():
     with pytest.raises(SystemExit) as exc:
         handle_update(args)
     assert exc.value.code == ExitCode.USAGE
+
+
+def test_update_marks_checked_and_respects_max_age(mock_history, mock_downloader):
+    entry = {"id": "abc", "version": "1.0.0", "browser": "chrome", "source": None}
+    mock_history.return_value.get_tracked_extensions.return_value = [entry]
+    mock_downloader.get_latest_version.return_value = "1.0.0"
+
+    args = MagicMock()
+    args.all = True
+    args.max_age = 3600
+    args.dry_run = False
+
+    handle_update(args)
+
+    checked_before = mock_history.return_value.get_tracked_extensions.call_args[1][
+        "checked_before"
+    ]
+    assert checked_before is not None
+    mock_history.return_value.mark_checked.assert_called_once_with([("chrome", "abc")])
@@ -1,3 +1,4 @@
+import threading
 import pytest
 from unittest.mock import Mock, patch
 from fetchext.workflow.watcher import DirectoryWatcher, ExtensionEventHandler
@@ -19,22 +20,118 @@ def mock_core():
         yield mock_extract, mock_report, mock_scan
 
 
-def test_event_handler_created_crx(mock_core):
-    mock_extract, mock_report, mock_scan = mock_core
-    handler = ExtensionEventHandler(actions=["extract", "report"])
-
+def make_event(path, dest_path=None):
     event = Mock()
     event.is_directory = False
-    event.src_path = "/tmp/test.crx"
+    event.src_path = str(path)
+    event.dest_path = str(dest_path) if dest_path else None
+    return event
 
-    with patch("time.sleep"):
-        handler.on_created(event)
 
-    mock_extract.assert_called_once()
+def test_event_handler_created_crx(mock_core, tmp_path):
+    mock_extract, mock_report, mock_scan = mock_core
+    handler = ExtensionEventHandler(actions=["extract", "report"], settle=0)
+    crx = tmp_path / "test.crx"
+    crx.write_bytes(b"crx")
+
+    handler.on_created(make_event(crx))
+    handler.poll()  # first look records the size
+    mock_extract.assert_not_called()
+    handler.poll()  # unchanged size: written completely
+    handler.stop()
+
+    mock_extract.assert_called_once_with(crx, show_progress=False)
     mock_report.assert_called_once()
     mock_scan.assert_not_called()
 
 
+def test_event_handler_deduplicates_events(mock_core, tmp_path):
+    mock_extract, _, _ = mock_core
+    handler = ExtensionEventHandler(actions=["extract"])
+    crx = tmp_path / "test.crx"
+    crx.write_bytes(b"crx")
+
+    handler.on_created(make_event(crx))
+    for _ in range(5):
+        handler.on_modified(make_event(crx))
+    assert len(handler.pending) == 1
+
+    # Close-write marks the file complete without waiting to settle
+    handler.on_closed(make_event(crx))
+    handler.poll()
+    handler.stop()
+
+    mock_extract.assert_called_once()
+
+
+def test_event_handler_waits_for_growing_file(mock_core, tmp_path):
+    mock_extract, _, _ = mock_core
+    handler = ExtensionEventHandler(actions=["extract"], settle=0)
+    crx = tmp_path / "test.crx"
+    crx.write_bytes(b"c")
+
+    handler.on_created(make_event(crx))
+    handler.poll()
+    crx.write_bytes(b"crx")
+    handler.poll()
+    mock_extract.assert_not_called()
+
+    handler.poll()
+    handler.stop()
+    mock_extract.assert_called_once()
+
+
+def test_event_handler_moved_into_place(mock_core, tmp_path):
+    mock_extract, _, _ = mock_core
+    handler = ExtensionEventHandler(actions=["extract"])
+    crx = tmp_path / "test.crx"
+    crx.write_bytes(b"crx")
+
+    handler.on_moved(make_event(tmp_path / "test.crx.part", dest_path=crx))
+    handler.poll()
+    handler.stop()
+
+    mock_extract.assert_called_once_with(crx, show_progress=False)
+
+
+def test_event_handler_backpressure(mock_core, tmp_path):
+    mock_extract, _, _ = mock_core
+    release = threading.Event()
+    mock_extract.side_effect = lambda *a, **k: release.wait(5)
+    handler = ExtensionEventHandler(actions=["extract"], workers=1, max_pending=1)
+
+    files = [tmp_path / f"ext{i}.crx" for i in range(3)]
+    for path in files:
+        path.write_bytes(b"crx")
+        handler.on_closed(make_event(path))
+
+    handler.poll()
+    assert len(handler.active) == 1
+    assert len(handler.pending) == 2
+
+    release.set()
+    handler.stop()
+    # Files still queued at stop are drained, not dropped
+    assert mock_extract.call_count == 3
+    assert not handler.pending
+
+
+def test_event_handler_stop_logs_unfinished_files(mock_core, tmp_path):
+    mock_extract, _, _ = mock_core
+    handler = ExtensionEventHandler(actions=["extract"])
+    crx = tmp_path / "partial.crx"
+    crx.write_bytes(b"c")
+
+    # Never closed or seen settled: it may still be being written
+    handler.on_created(make_event(crx))
+    with patch("fetchext.workflow.watcher.logger") as mock_logger:
+        handler.stop()
+
+    mock_extract.assert_not_called()
+    assert not handler.pending
+    assert "partial.crx" in mock_logger.warning.call_args[0][0]
+
+
 def test_event_handler_ignored_file(mock_core):
     mock_extract, _, _ = mock_core
     handler = ExtensionEventHandler(actions=["extract"])
@@ -45,6 +142,7 @@ def test_event_handler_ignored_file(mock_core):
 
     handler.on_created(event)
 
+    assert not handler.pending
     mock_extract.assert_not_called()
 
 